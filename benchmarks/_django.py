@@ -0,0 +1,61 @@
+"""Shared bootstrap for the benchmark scripts.
+
+Each benchmark runs against a throwaway test database so it never touches ``db.sqlite3``.
+"""
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task2.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+
+
+@contextlib.contextmanager
+def test_database():
+    """Set up Django with a fresh test database and tear it down afterwards."""
+
+    import django
+    from django.db import connections
+    from django.test.utils import setup_test_environment, teardown_test_environment, setup_databases, teardown_databases
+
+    django.setup()
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False, aliases=set(connections))
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def timer(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name.ljust(width)}  {value}")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return float('nan')
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    """Format p50/p95/p99 of a list of latencies in seconds."""
+
+    return "  ".join(f"p{pct}={percentile(samples, pct) * 1000:7.2f}ms" for pct in (50, 95, 99)) + f"  n={len(samples)}"
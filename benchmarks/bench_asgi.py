@@ -0,0 +1,93 @@
+"""Throughput and latency of the read endpoints: sync views under WSGI vs async views under ASGI.
+
+Both deployments are driven in-process: WSGI with a pool of worker threads, ASGI with
+``--clients`` concurrent tasks on one event loop.
+
+    python benchmarks/bench_asgi.py --clients 1000 --requests 20000 --threads 16
+"""
+import argparse
+import asyncio
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from _django import test_database, latency_summary, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=16, help="WSGI worker threads")
+    args = parser.parse_args()
+
+    with test_database():
+        from django.db import connection
+        from django.test import Client, AsyncClient, override_settings
+        from django.urls import include, path, reverse
+        from rest_framework_simplejwt.tokens import AccessToken
+        from task.users.models import User, Organisation
+
+        user = User.objects.create_user(email='reader@example.com', password='benchpassword123', firstName='Reader', lastName='Bench')
+        peer = User.objects.create_user(email='peer@example.com', password='benchpassword123', firstName='Peer', lastName='Bench')
+        organisation = Organisation.objects.create(name='Bench Organisation')
+        user.organisations.add(organisation)
+        peer.organisations.add(organisation)
+        auth = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        urls = [
+            reverse('get_user_record', kwargs={'id': peer.pk}),
+            reverse('get_or_create_organisations'),
+            reverse('get_organisation', kwargs={'orgId': organisation.pk}),
+        ]
+
+        def wsgi():
+            latencies = []
+
+            def worker(n):
+                client = Client()
+                start = time.perf_counter()
+                response = client.get(urls[n % len(urls)], headers=auth)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.content
+                return n
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.threads) as pool:
+                list(pool.map(worker, range(args.requests)))
+            connection.close()
+            return time.perf_counter() - start, latencies
+
+        # task2/urls.py routing with settings.ASYNC_VIEWS on.
+        asgi_urls = types.ModuleType('bench_asgi_urls')
+        asgi_urls.urlpatterns = [path('', include('task.async_urls')), path('', include('task.urls'))]
+        sys.modules['bench_asgi_urls'] = asgi_urls
+
+        async def asgi():
+            latencies = []
+            slots = asyncio.Semaphore(args.clients)
+            client = AsyncClient()
+
+            async def one(n):
+                async with slots:
+                    start = time.perf_counter()
+                    response = await client.get(urls[n % len(urls)], headers=auth)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.content
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(n) for n in range(args.requests)))
+            return time.perf_counter() - start, latencies
+
+        wsgi_seconds, wsgi_latencies = wsgi()
+        with override_settings(ROOT_URLCONF='bench_asgi_urls'):
+            asgi_seconds, asgi_latencies = asyncio.run(asgi())
+
+        report(f"{args.requests} reads", [
+            (f"WSGI ({args.threads} threads)", f"{args.requests / wsgi_seconds:8.1f} req/s  {latency_summary(wsgi_latencies)}"),
+            (f"ASGI ({args.clients} clients)", f"{args.requests / asgi_seconds:8.1f} req/s  {latency_summary(asgi_latencies)}"),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Per-request database cost with and without the connection pool.
+
+Each simulated request connects, runs one query and closes, like a Django request with
+CONN_MAX_AGE=0. Defaults to a SQLite file; point it at Postgres with --engine postgresql
+and the usual HOST/NAME/USER/PASSWORD/PORT environment variables.
+
+    python benchmarks/bench_db_pool.py --requests 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import _django  # noqa: F401  (sets up sys.path and settings)
+from _django import latency_summary, report
+
+
+def run(settings_dict, requests):
+    from django.db.utils import ConnectionHandler
+
+    wrapper = ConnectionHandler({'default': settings_dict})['default']
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        wrapper.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--engine', choices=('sqlite3', 'postgresql'), default='sqlite3')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from task.db.pool import pool_stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.engine == 'sqlite3':
+            base = {'NAME': str(Path(tmp) / 'bench.sqlite3')}
+        else:
+            base = {key: os.getenv(key) for key in ('HOST', 'NAME', 'USER', 'PASSWORD', 'PORT')}
+
+        plain = run({**base, 'ENGINE': f'django.db.backends.{args.engine}'}, args.requests)
+        pooled = run({**base, 'ENGINE': f'task.db.backends.{args.engine}', 'POOL': {'MAX_SIZE': 1}}, args.requests)
+
+        report(f"{args.requests} requests on {args.engine}", [
+            ("new connection", latency_summary(plain)),
+            ("pooled", latency_summary(pooled)),
+            ("pool stats", pool_stats()),
+        ])
+
+
+if __name__ == '__main__':
+    main()
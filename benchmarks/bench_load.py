@@ -0,0 +1,225 @@
+"""Load-test the API in-process: seed a dataset, drive every endpoint, save the results as JSON.
+
+Datasets are seeded with ``manage.py seed``: every user owns a default organisation, as
+registration does, and joins a few more, skewed towards a popular few. Each endpoint is
+then driven through the WSGI handler (``django.test.Client``), once per ``--workers``
+value, and reported as throughput and p50/p95/p99.
+
+    python benchmarks/bench_load.py --dataset 10k --workers 1 8
+    python benchmarks/bench_load.py --dataset 100k --output benchmarks/results/100k.json \
+        --compare benchmarks/results/base.json
+
+Login and register are bound by PBKDF2, so they get ``--hash-requests`` instead of
+``--requests``. A SQLite file (WAL, see task.db.sqlite) is used unless ``--database`` names
+one to keep.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from _django import ROOT, percentile, report
+
+
+DATASETS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+PASSWORD = 'benchmark-password'
+
+
+def seed(users, random_seed):
+    """Seed ``users`` users with ``manage.py seed``; returns all user and organisation ids."""
+
+    from django.core.management import call_command
+    from task.users.models import User, Organisation
+
+    call_command('seed', users=users, tag='load', password=PASSWORD, seed=random_seed, processes=1, stdout=sys.stdout)
+    return list(User.objects.values_list('pk', flat=True)), list(Organisation.objects.values_list('pk', flat=True))
+
+
+def endpoints(user_ids, org_ids, rng):
+    """Endpoint name -> function building one request's ``(method, path, data, user_id)``."""
+
+    from django.urls import reverse
+
+    counter = iter(range(10 ** 12))
+
+    def register():
+        return 'post', reverse('register'), {
+            'email': f'new{next(counter)}-{rng.random()}@example.com', 'password': PASSWORD,
+            'firstName': 'New', 'lastName': 'User', 'phone': '1234567890'}, None
+
+    def login():
+        return 'post', reverse('login'), {
+            'email': f'load{rng.randrange(len(user_ids))}@example.com', 'password': PASSWORD}, None
+
+    def user_lookup():
+        user_id = rng.choice(user_ids)
+        return 'get', reverse('get_user_record', kwargs={'id': user_id}), None, user_id
+
+    def organisation_list():
+        return 'get', reverse('get_or_create_organisations'), None, rng.choice(user_ids)
+
+    def organisation_detail():
+        return 'get', reverse('get_organisation', kwargs={'orgId': rng.choice(org_ids)}), None, rng.choice(user_ids)
+
+    def add_user():
+        return 'post', reverse('add_user', kwargs={'orgId': rng.choice(org_ids)}), {
+            'userId': str(rng.choice(user_ids))}, rng.choice(user_ids)
+
+    return {
+        'register': register,
+        'login': login,
+        'user_lookup': user_lookup,
+        'organisation_list': organisation_list,
+        'organisation_detail': organisation_detail,
+        'add_user': add_user,
+    }
+
+
+def drive(build, requests, workers, tokens):
+    """Send ``requests`` requests from ``workers`` threads; return the endpoint's results."""
+
+    from django.db import connections
+    from django.test import Client
+
+    # Built up front so request construction stays out of the timings.
+    planned = [build() for _ in range(requests)]
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def worker(offset):
+        client = Client(HTTP_HOST='localhost')
+        mine, codes = [], Counter()
+        try:
+            for method, path, data, user_id in planned[offset::workers]:
+                headers = {'Authorization': f'Bearer {tokens[user_id]}'} if user_id else {}
+                start = time.perf_counter()
+                if method == 'post':
+                    response = client.post(path, data, content_type='application/json', headers=headers)
+                else:
+                    response = client.get(path, headers=headers)
+                mine.append(time.perf_counter() - start)
+                codes[response.status_code] += 1
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(mine)
+            statuses.update(codes)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': requests,
+        'errors': sum(count for code, count in statuses.items() if code >= 400),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'seconds': elapsed,
+        'throughput': requests / elapsed,
+        **{f'p{pct}_ms': percentile(latencies, pct) * 1000 for pct in (50, 95, 99)},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for workers, by_endpoint in results['runs'].items():
+        rows = []
+        for endpoint, result in by_endpoint.items():
+            line = (f"{result['throughput']:8.1f} req/s  p50={result['p50_ms']:8.2f}ms  "
+                    f"p95={result['p95_ms']:8.2f}ms  p99={result['p99_ms']:8.2f}ms  errors={result['errors']}")
+            before = (baseline or {}).get('runs', {}).get(workers, {}).get(endpoint)
+            if before:
+                line += f"  ({(result['throughput'] / before['throughput'] - 1) * 100:+.1f}% req/s vs baseline)"
+            rows.append((endpoint, line))
+        report(f"{results['users']} users, {workers} worker(s)", rows)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', choices=DATASETS, default='10k')
+    parser.add_argument('--users', type=int, help="overrides --dataset")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--requests', type=int, default=1000, help="requests per read/add-user endpoint")
+    parser.add_argument('--hash-requests', type=int, default=20, help="requests for login and register")
+    parser.add_argument('--endpoint', action='append', help="only drive these endpoints (repeatable)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help="SQLite file to seed into (default: a temporary file)")
+    parser.add_argument('--output', help="write the results as JSON here")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    import django
+    from django.db import connections
+
+    django.setup()
+    tmp = tempfile.TemporaryDirectory()
+    connections.databases['default']['TEST']['NAME'] = args.database or str(Path(tmp.name) / 'load.sqlite3')
+
+    from _django import test_database
+
+    users = args.users or DATASETS[args.dataset]
+    rng = random.Random(args.seed)
+    with tmp, test_database():
+        from django.test import override_settings
+        from task.tokens import access_token_for
+        from task.users.models import User
+
+        start = time.perf_counter()
+        user_ids, org_ids = seed(users, args.seed)
+        seeded = time.perf_counter() - start
+        print(f"seeded {users} users and {User.organisations.through.objects.count()} memberships in {seeded:.1f}s\n")
+
+        # Tokens for the users the read endpoints act as; minted outside the timings.
+        sample = rng.sample(user_ids, min(len(user_ids), 2000))
+        tokens = {user_id: access_token_for(User(pk=user_id)) for user_id in sample}
+        user_ids = sample
+        builders = endpoints(user_ids, org_ids, rng)
+
+        results = {
+            'users': users,
+            'seed_seconds': seeded,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'runs': {},
+        }
+        # Every request comes from one client IP; with the login throttle on, login would
+        # measure 429s rather than hashing (benchmarks/bench_login_throttle.py covers it).
+        with override_settings(LOGIN_THROTTLE=False):
+            for workers in args.workers:
+                results['runs'][str(workers)] = {
+                    name: drive(build, args.hash_requests if name in ('login', 'register') else args.requests,
+                                workers, tokens)
+                    for name, build in builders.items() if not args.endpoint or name in args.endpoint
+                }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Latency of authenticated reads while a login storm is running.
+
+Readers poll the user record and organisation list; stormers hammer the login endpoint.
+Run once without and once with the storm to see how much hashing starves everything else.
+
+    python benchmarks/bench_login_storm.py --readers 4 --stormers 16 --seconds 10
+"""
+import argparse
+import threading
+import time
+
+from _django import test_database, latency_summary, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--stormers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--login-url', default='login', help="url name of the login view (login or async_login)")
+    args = parser.parse_args()
+
+    with test_database():
+        from django.db import connection
+        from django.test import override_settings
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        from task.users.models import User, Organisation
+
+        user = User.objects.create_user(email='reader@example.com', password='benchpassword123', firstName='Reader', lastName='Bench')
+        user.organisations.add(Organisation.objects.create(name='Bench Organisation'))
+        token = str(AccessToken.for_user(user))
+        read_urls = [reverse('get_user_record', kwargs={'id': user.pk}), reverse('get_or_create_organisations')]
+        login_url = reverse(args.login_url)
+
+        def run(storm):
+            stop = threading.Event()
+            latencies, statuses = [], {}
+            lock = threading.Lock()
+
+            def reader():
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+                n = 0
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    client.get(read_urls[n % len(read_urls)])
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                    n += 1
+                connection.close()
+
+            def stormer():
+                client = APIClient()
+                while not stop.is_set():
+                    response = client.post(login_url, {'email': 'reader@example.com', 'password': 'benchpassword123'}, format='json')
+                    with lock:
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                connection.close()
+
+            threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+            if storm:
+                threads += [threading.Thread(target=stormer) for _ in range(args.stormers)]
+            for thread in threads:
+                thread.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            return latencies, statuses
+
+        # The storm is one email from one client IP; the login throttle would turn it into
+        # 429s, and this measures hashing (benchmarks/bench_login_throttle.py covers the throttle).
+        with override_settings(LOGIN_THROTTLE=False):
+            quiet, _ = run(storm=False)
+            stormy, statuses = run(storm=True)
+        report(f"authenticated reads, {args.readers} readers", [
+            ("quiet", latency_summary(quiet)),
+            (f"{args.stormers} stormers", latency_summary(stormy)),
+            ("login statuses", statuses),
+        ])
+
+
+if __name__ == '__main__':
+    main()
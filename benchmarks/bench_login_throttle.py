@@ -0,0 +1,89 @@
+"""Per-request cost of the login throttle, next to the password hash it saves.
+
+Times ``login_throttle.check`` on its own, for each backend and outcome, then whole login
+requests: one that is throttled and one that runs PBKDF2 for a wrong password.
+
+    python benchmarks/bench_login_throttle.py --checks 200000
+"""
+import argparse
+import logging
+import time
+
+from _django import test_database, latency_summary, report
+
+
+def per_check(check, calls):
+    """Mean seconds per call of ``check(n)`` over ``calls`` calls."""
+
+    start = time.perf_counter()
+    for n in range(calls):
+        check(n)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--checks', type=int, default=200000, help="calls per check scenario")
+    parser.add_argument('--requests', type=int, default=200, help="requests per login scenario")
+    args = parser.parse_args()
+
+    with test_database():
+        from django.test import Client, override_settings
+        from django.urls import reverse
+        from task.throttling import login_throttle
+        from task.users.models import User
+
+        caches = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+        }
+        scenarios = [
+            ("local, allowed", {}, lambda n: login_throttle.check(f'user{n % 1000}@example.com', '10.0.0.1')),
+            ("local, rejected", {'LOGIN_THROTTLE_EMAIL_LIMIT': 0},
+             lambda n: login_throttle.check('victim@example.com', '10.0.0.1')),
+            ("local, evicting", {'LOGIN_THROTTLE_MAX_KEYS': 1000},
+             lambda n: login_throttle.check(f'user{n}@example.com', f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}')),
+            ("locmem cache, allowed", {'LOGIN_THROTTLE_CACHE_ALIAS': 'throttle', 'CACHES': caches},
+             lambda n: login_throttle.check(f'user{n % 1000}@example.com', '10.0.0.1')),
+        ]
+        rows = []
+        for name, overrides, check in scenarios:
+            unlimited = {'LOGIN_THROTTLE_EMAIL_LIMIT': 10 ** 9, 'LOGIN_THROTTLE_IP_LIMIT': 10 ** 9}
+            with override_settings(**{**unlimited, **overrides}):
+                login_throttle.clear()
+                check(0)
+                calls = args.checks // 10 if 'cache' in name else args.checks
+                rows.append((name, f"{per_check(check, calls) * 1e6:7.2f}us per check"))
+                login_throttle.clear()
+        report("login_throttle.check", rows)
+        print()
+
+        User.objects.create_user(email='victim@example.com', password='benchpassword123',
+                                 firstName='Victim', lastName='Bench')
+        # Every request below is a 401 or 429; django.request would log each one.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        client = Client(HTTP_HOST='localhost')
+        url = reverse('login')
+        body = {'email': 'victim@example.com', 'password': 'wrong-password'}
+
+        def logins(limit):
+            latencies = []
+            with override_settings(LOGIN_THROTTLE_EMAIL_LIMIT=limit, LOGIN_THROTTLE_IP_LIMIT=10 ** 9):
+                login_throttle.clear()
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    response = client.post(url, body, content_type='application/json')
+                    latencies.append(time.perf_counter() - start)
+            login_throttle.clear()
+            return latencies, response.status_code
+
+        throttled, throttled_status = logins(limit=0)
+        hashed, hashed_status = logins(limit=10 ** 9)
+        report("POST /auth/login", [
+            (f"throttled ({throttled_status})", latency_summary(throttled)),
+            (f"wrong password ({hashed_status})", latency_summary(hashed)),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Per-middleware cost of the stock Django stack versus the API-scoped one.
+
+A timing probe sits in front of every middleware and one more in front of the view, so
+each middleware's self time is the gap between its probe and the next one, on the way in
+and on the way out. The innermost gap (URL resolution, view middleware such as CSRF's
+process_view, and a no-op view) is reported on its own line.
+
+    python benchmarks/bench_middleware.py --requests 20000
+"""
+import argparse
+import sys
+import time
+
+from _django import report
+
+
+STOCK_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+PROBE = '__main__.Probe'
+
+urlpatterns = []
+
+
+class Probe:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.probe_in.append(time.perf_counter())
+        response = self.get_response(request)
+        request.probe_out.append(time.perf_counter())
+        return response
+
+
+def ping(request):
+    from django.http import HttpResponse
+
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+def self_times(middleware, path, requests, repeat):
+    """Best mean self time in seconds for each middleware, plus the innermost gap."""
+
+    from django.core.handlers.base import BaseHandler
+    from django.test import RequestFactory, override_settings
+
+    probed = [entry for name in middleware for entry in (PROBE, name)] + [PROBE]
+    factory = RequestFactory(HTTP_HOST='localhost')
+    best = [float('inf')] * (len(middleware) + 1)
+    with override_settings(MIDDLEWARE=probed, ROOT_URLCONF=sys.modules[__name__]):
+        handler = BaseHandler()
+        handler.load_middleware()
+        for _ in range(repeat):
+            totals = [0.0] * len(best)
+            for _ in range(requests):
+                request = factory.get(path)
+                request.probe_in, request.probe_out = [], []
+                handler.get_response(request)
+                ins, outs = request.probe_in, request.probe_out[::-1]
+                for index in range(len(middleware)):
+                    totals[index] += (ins[index + 1] - ins[index]) + (outs[index] - outs[index + 1])
+                totals[-1] += outs[-1] - ins[-1]
+            best = [min(b, total / requests) for b, total in zip(best, totals)]
+    return best
+
+
+def bench(name, middleware, path, args):
+    times = self_times(middleware, path, args.requests, args.repeat)
+    rows = [(entry.rsplit('.', 1)[-1], f"{seconds * 1e6:7.2f} us") for entry, seconds in zip(middleware, times)]
+    rows.append(('total middleware', f"{sum(times[:-1]) * 1e6:7.2f} us"))
+    rows.append(('resolve + view hooks + view', f"{times[-1] * 1e6:7.2f} us"))
+    report(f"{name}, GET {path}", rows)
+    print()
+    return sum(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import django
+    from django.urls import path
+
+    django.setup()
+    from django.conf import settings
+
+    urlpatterns.extend([path('api/ping', ping), path('admin/ping', ping)])
+
+    results = {}
+    for name, middleware in (('stock', STOCK_MIDDLEWARE), ('scoped', settings.MIDDLEWARE)):
+        for url in ('/api/ping', '/admin/ping'):
+            results[name, url] = bench(name, middleware, url, args)
+
+    report("middleware + view per request", [
+        (f"{name} {url}", f"{seconds * 1e6:7.2f} us") for (name, url), seconds in results.items()
+    ])
+
+
+if __name__ == '__main__':
+    main()
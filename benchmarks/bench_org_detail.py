@@ -0,0 +1,90 @@
+"""Latency of GET /api/organisations/<orgId> with and without the response cache, and an expiry stampede.
+
+The first part requests one organisation ``--requests`` times through the full stack:
+uncached, cached, and cached with a matching If-None-Match. The second part lets
+``--threads`` requests miss the same entry together and counts how many rebuilt it.
+
+    python benchmarks/bench_org_detail.py --requests 2000 --threads 16
+"""
+import argparse
+import threading
+import time
+
+from _django import test_database, latency_summary, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    with test_database():
+        from django.core.cache import cache
+        from django.test import Client, override_settings
+        from django.urls import reverse
+        from task.response_cache import organisation_responses
+        from task.tokens import access_token_for
+        from task.users.models import User, Organisation
+
+        user = User.objects.create_user(email='bench@example.com', password='benchpassword123',
+                                        firstName='Bench', lastName='User')
+        organisation = Organisation.objects.create(name="Bench's Organisation", description='Benchmarks')
+        client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}')
+        url = reverse('get_organisation', args=[organisation.pk])
+
+        def latencies(**headers):
+            client.get(url, headers=headers)
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                timings.append(time.perf_counter() - start)
+            return timings, response.status_code
+
+        with override_settings(ORGANISATION_RESPONSE_CACHE=False):
+            uncached, uncached_status = latencies()
+        cached, cached_status = latencies()
+        etag = client.get(url)['ETag']
+        conditional, conditional_status = latencies(If_None_Match=etag)
+        report(f"GET /api/organisations/<orgId>, {args.requests} requests", [
+            (f"uncached ({uncached_status})", latency_summary(uncached)),
+            (f"cached ({cached_status})", latency_summary(cached)),
+            (f"cached, If-None-Match ({conditional_status})", latency_summary(conditional)),
+        ])
+        print()
+
+        # Every thread misses the same entry at once, as when a hot entry is dropped.
+        rows = []
+        for label, overrides in (("single-flight", {}), ("no cache", {'ORGANISATION_RESPONSE_CACHE': False})):
+            with override_settings(**overrides):
+                cache.clear()
+                before = organisation_responses.stats()
+                barrier = threading.Barrier(args.threads)
+                renders = []
+                render = organisation_responses.render
+
+                def counted(org_id):
+                    renders.append(org_id)
+                    return render(org_id)
+
+                organisation_responses.render = counted
+
+                def get():
+                    barrier.wait()
+                    organisation_responses.get(organisation.pk)
+
+                threads = [threading.Thread(target=get) for _ in range(args.threads)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                organisation_responses.render = render
+                after = organisation_responses.stats()
+                rows.append((label, f"{len(renders)} renders, {after['coalesced'] - before['coalesced']} waited "
+                                    f"for one, {after['hits'] - before['hits']} arrived after it was cached"))
+        report(f"{args.threads} concurrent requests for a missing entry", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare registering N users one request at a time against the bulk endpoint.
+
+    python benchmarks/bench_register.py --count 10000 --batch 1000
+"""
+import argparse
+
+from _django import test_database, timer, report
+
+
+def payload(prefix, n):
+    return {
+        'email': f'{prefix}{n}@example.com',
+        'password': 'benchpassword123',
+        'firstName': f'{prefix}{n}'[:15],
+        'lastName': 'bench',
+        'phone': '1234567890',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    with test_database():
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from task.users.models import User
+
+        client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', password='benchpassword123',
+                                              firstName='Admin', lastName='Bench')
+        timings = {}
+
+        with timer(timings, 'single'):
+            for n in range(args.count):
+                response = client.post(reverse('register'), payload('s', n), format='json')
+                assert response.status_code == 201, response.data
+
+        # The bulk endpoint is staff only.
+        client.force_authenticate(user=admin)
+        with timer(timings, 'bulk'):
+            for start in range(0, args.count, args.batch):
+                batch = [payload('b', n) for n in range(start, min(args.count, start + args.batch))]
+                response = client.post(reverse('register_bulk'), batch, format='json')
+                assert response.status_code == 201, response.data
+
+        report(f"{args.count} registrations", [
+            (name, f"{seconds:8.2f}s  {args.count / seconds:8.1f} users/s") for name, seconds in timings.items()
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Latency of GET /api/organisations/search on a large organisation table.
+
+Seeds ``--organisations`` organisations (1M by default). Most are named like registration
+names them ("<First>'s Organisation"); the rest are made-up company names. Each query is
+then sent ``--requests`` times through the full stack, as a staff user searching every
+organisation and as a member searching their own ~``--memberships`` organisations.
+First pages and a page ``--deep`` cursors in are timed separately.
+
+    python benchmarks/bench_search.py --organisations 1000000 --target-p95-ms 50
+
+``--target-p95-ms`` makes the run exit non-zero when any query's p95 is over the target.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _django import latency_summary, percentile, report
+
+
+SYLLABLES = ['al', 'an', 'ar', 'be', 'bo', 'ca', 'da', 'de', 'el', 'fa', 'go', 'ha', 'ja', 'ka', 'ke', 'la',
+             'li', 'ma', 'mi', 'na', 'ni', 'no', 'ol', 'ra', 're', 'ri', 'sa', 'se', 'ta', 'to', 'vi', 'ya', 'zu']
+WORDS = ['Acme', 'Blue', 'Cedar', 'Delta', 'Echo', 'Falcon', 'Granite', 'Harbor', 'Iron', 'Juniper', 'Kite',
+         'Lumen', 'Maple', 'Nova', 'Orbit', 'Pine', 'Quartz', 'River', 'Summit', 'Tidal', 'Umber', 'Vertex']
+SUFFIXES = ['Labs', 'Systems', 'Works', 'Partners', 'Group', 'Studio', 'Collective', 'Holdings']
+
+
+def make_name(rng):
+    if rng.random() < 0.8:
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        return f"{first}'s Organisation"
+    return f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(SUFFIXES)}"
+
+
+def seed(count, rng, batch_size=10000):
+    from django.db import transaction
+    from task.users.models import Organisation
+
+    for start in range(0, count, batch_size):
+        with transaction.atomic():
+            Organisation.objects.bulk_create(
+                [Organisation(name=make_name(rng), description='') for _ in range(min(batch_size, count - start))],
+                batch_size=batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--organisations', type=int, default=1_000_000)
+    parser.add_argument('--memberships', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=50, help="requests per query")
+    parser.add_argument('--deep', type=int, default=10, help="pages to follow before timing a deep page")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--target-p95-ms', type=float)
+    args = parser.parse_args()
+
+    import django
+    from django.db import connections
+
+    django.setup()
+    tmp = tempfile.TemporaryDirectory()
+    connections.databases['default']['TEST']['NAME'] = str(Path(tmp.name) / 'search.sqlite3')
+
+    from _django import test_database
+
+    rng = random.Random(args.seed)
+    with tmp, test_database():
+        from django.test import Client
+        from django.urls import reverse
+        from task.tokens import access_token_for
+        from task.users.models import User, Organisation
+
+        start = time.perf_counter()
+        seed(args.organisations, rng)
+        print(f"seeded {args.organisations} organisations in {time.perf_counter() - start:.1f}s\n")
+
+        staff = User.objects.create_user(email='staff@example.com', password='x', firstName='Staff',
+                                         lastName='Bench', is_staff=True)
+        member = User.objects.create_user(email='member@example.com', password='x', firstName='Member',
+                                          lastName='Bench')
+        member.organisations.add(*Organisation.objects.order_by('?').values_list('pk', flat=True)[:args.memberships])
+
+        client = Client(HTTP_HOST='localhost')
+        url = reverse('search_organisations')
+        headers = {user: {'Authorization': f'Bearer {access_token_for(user)}'} for user in (staff, member)}
+
+        def page(user, params):
+            started = time.perf_counter()
+            response = client.get(url, {**params, 'limit': args.limit}, headers=headers[user])
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.content
+            return elapsed, response.json()['data']
+
+        def deep_cursor(user, params):
+            cursor = None
+            for _ in range(args.deep):
+                _, data = page(user, {**params, **({'cursor': cursor} if cursor else {})})
+                cursor = data['nextCursor']
+                if cursor is None:
+                    break
+            return cursor
+
+        queries = [
+            (staff, 'all', 'prefix', 'ka'),
+            (staff, 'all', 'prefix', 'kalima'),
+            (staff, 'all', 'prefix', 'granite'),
+            (staff, 'all', 'prefix', 'qqq'),
+            (staff, 'all', 'substring', 'ganis'),
+            (staff, 'all', 'substring', 'tidal'),
+            (staff, 'all', 'substring', 'zuyaal'),
+            (member, 'mine', 'prefix', 'ka'),
+            (member, 'mine', 'substring', 'org'),
+        ]
+        rows, worst = [], 0.0
+        for user, scope, match, term in queries:
+            params = {'q': term, 'scope': scope, 'match': match}
+            cursor = deep_cursor(user, params)
+            variants = [('first page', params)]
+            if cursor:
+                variants.append((f'page {args.deep + 1}', {**params, 'cursor': cursor}))
+            for label, variant in variants:
+                page(user, variant)
+                latencies = [page(user, variant)[0] for _ in range(args.requests)]
+                worst = max(worst, percentile(latencies, 95))
+                rows.append((f"{scope:4} {match:9} {term!r:10} {label}", latency_summary(latencies)))
+        report(f"search, {args.organisations} organisations, limit {args.limit}", rows)
+
+    if args.target_p95_ms is not None and worst * 1000 > args.target_p95_ms:
+        print(f"\nworst p95 {worst * 1000:.1f}ms is over the {args.target_p95_ms:.0f}ms target")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Compare the DRF ModelSerializers with the values()-based read serializers on large listings.
+
+    python benchmarks/bench_serializers.py --rows 100000
+"""
+import argparse
+import time
+
+from _django import test_database, report
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with test_database():
+        from rest_framework.renderers import JSONRenderer
+        from task.serializers import UserSerializer, OrganisationSerializer, user_reader, organisation_reader
+        from task.users.models import User, Organisation
+
+        User.objects.bulk_create(
+            (User(email=f'user{n}@example.com', firstName='Bench', lastName=str(n), phone='1234567890', password='!')
+             for n in range(args.rows)), batch_size=5000)
+        Organisation.objects.bulk_create(
+            (Organisation(name=f"Bench{n}'s Organisation", description='') for n in range(args.rows)), batch_size=5000)
+
+        rows = []
+        for name, serializer_class, reader, model in (
+            ('users', UserSerializer, user_reader, User),
+            ('organisations', OrganisationSerializer, organisation_reader, Organisation),
+        ):
+            queryset = model.objects.all()
+            assert JSONRenderer().render(serializer_class(queryset, many=True).data) == JSONRenderer().render(reader.many(queryset))
+            drf = best_of(args.repeat, lambda: serializer_class(model.objects.all(), many=True).data)
+            fast = best_of(args.repeat, lambda: reader.many(model.objects.all()))
+            rows.append((f"{name} ModelSerializer", f"{drf:7.3f}s"))
+            rows.append((f"{name} values reader", f"{fast:7.3f}s  ({drf / fast:.1f}x)"))
+
+        report(f"{args.rows} rows, best of {args.repeat}", rows)
+
+
+if __name__ == '__main__':
+    main()
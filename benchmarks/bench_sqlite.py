@@ -0,0 +1,143 @@
+"""Concurrent writes and reads on a SQLite file, with and without the SQLite tuning.
+
+Worker threads mix three operations against the real models:
+
+* register: ``create_registered_user`` (three INSERTs in one transaction),
+* join: add the user to another organisation (``users.add`` reads, then writes),
+* read: list the user's organisations and fetch their record.
+
+Each mode runs in its own interpreter so ``SQLITE_TUNING`` is read at settings import.
+
+    python benchmarks/bench_sqlite.py --threads 8 --seconds 10
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _django import ROOT, latency_summary, report
+
+
+def worker(args, deadline, users, organisations, password, results, seed):
+    from django.db import OperationalError, connection
+    from task.users.membership import user_organisations
+    from task.users.models import User
+    from task.users.registration import create_registered_user
+
+    rng = random.Random(seed)
+    latencies = {'register': [], 'join': [], 'read': []}
+    errors = 0
+    count = 0
+    try:
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            user_id = rng.choice(users)
+            start = time.perf_counter()
+            try:
+                if roll < args.register_ratio:
+                    operation = 'register'
+                    count += 1
+                    create_registered_user({
+                        'firstName': 'Bench', 'lastName': str(seed),
+                        'email': f'bench-{seed}-{count}@example.com', 'phone': None,
+                    }, password)
+                elif roll < args.register_ratio + args.join_ratio:
+                    operation = 'join'
+                    User.objects.get(pk=user_id).organisations.add(rng.choice(organisations))
+                else:
+                    operation = 'read'
+                    list(user_organisations(User(pk=user_id)).values_list('pk', flat=True))
+                    User.objects.get(pk=user_id)
+            except OperationalError:
+                errors += 1
+                continue
+            latencies[operation].append(time.perf_counter() - start)
+    finally:
+        connection.close()
+    results.append((latencies, errors))
+
+
+def child(args):
+    import django
+    from django.db import connections
+
+    django.setup()
+    # A file rather than SQLite's default in-memory test database, so locking is real.
+    connections.databases['default']['TEST']['NAME'] = args.database
+
+    from _django import test_database
+
+    with test_database():
+        from django.contrib.auth.hashers import make_password
+        from task.users.models import Organisation
+        from task.users.registration import create_registered_user
+
+        password = make_password('benchmark-password')
+        users = [create_registered_user({
+            'firstName': 'Seed', 'lastName': str(n), 'email': f'seed{n}@example.com', 'phone': None,
+        }, password).pk for n in range(args.seed_users)]
+        organisations = list(Organisation.objects.values_list('pk', flat=True))
+        connections.close_all()
+
+        results = []
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=worker, args=(args, deadline, users, organisations, password, results, n))
+                   for n in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    merged = {'register': [], 'join': [], 'read': []}
+    for latencies, _ in results:
+        for operation, samples in latencies.items():
+            merged[operation].extend(samples)
+    print(json.dumps({'latencies': merged, 'errors': sum(errors for _, errors in results)}))
+
+
+def run_mode(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SQLITE_TUNING=str(tuned), ENVIRONMENT='DEVELOPMENT')
+        command = [sys.executable, __file__, '--child', '--database', str(Path(tmp) / 'bench.sqlite3'),
+                   '--threads', str(args.threads), '--seconds', str(args.seconds),
+                   '--seed-users', str(args.seed_users),
+                   '--register-ratio', str(args.register_ratio), '--join-ratio', str(args.join_ratio)]
+        output = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-users', type=int, default=200)
+    parser.add_argument('--register-ratio', type=float, default=0.2)
+    parser.add_argument('--join-ratio', type=float, default=0.2)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    for name, tuned in (('default pragmas, deferred BEGIN', False), ('tuned: WAL + BEGIN IMMEDIATE', True)):
+        result = run_mode(tuned, args)
+        latencies = result['latencies']
+        completed = sum(len(samples) for samples in latencies.values())
+        rows = [(operation, latency_summary(samples)) for operation, samples in latencies.items()]
+        rows += [
+            ('throughput', f"{completed / args.seconds:.0f} ops/s"),
+            ('"database is locked"', result['errors']),
+        ]
+        report(f"{name}, {args.threads} threads for {args.seconds:g}s", rows)
+        print()
+
+
+if __name__ == '__main__':
+    main()
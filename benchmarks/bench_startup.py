@@ -0,0 +1,117 @@
+"""Cold-start cost of the WSGI entry point, per settings profile.
+
+Every sample runs in a fresh interpreter, like a new Vercel lambda: it imports
+``task2.wsgi`` and serves one unauthenticated request through ``application``. The import
+breakdown comes from ``python -X importtime`` and is grouped by top-level package so a
+new heavy dependency shows up by name.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --profile task2.settings_api --max-cold-start-ms 400
+
+``--max-cold-start-ms`` makes the script exit non-zero when the median import plus first
+response exceeds the budget, so it can guard against regressions in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from _django import ROOT, report
+
+
+PROFILES = ('task2.settings', 'task2.settings_api')
+
+# Runs inside the child interpreter; prints its timings as JSON on the last line.
+CHILD = r"""
+import io, json, sys, time
+start = time.perf_counter()
+from task2.wsgi import application
+imported = time.perf_counter()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': %(path)r, 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr,
+}
+statuses = []
+body = b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+responded = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_response_ms': (responded - imported) * 1000,
+    'status': statuses[0],
+    'modules': len(sys.modules),
+}))
+"""
+
+
+def run_child(profile, path, importtime=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile, PYTHONDONTWRITEBYTECODE='1')
+    env.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', CHILD % {'path': path}]
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_breakdown(stderr):
+    """Self time per top-level package, in ms, from ``-X importtime`` output."""
+
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _cumulative, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def bench(profile, args):
+    samples = [run_child(profile, args.path)[0] for _ in range(args.runs)]
+    _, stderr = run_child(profile, args.path, importtime=True)
+
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    first_ms = statistics.median(s['first_response_ms'] for s in samples)
+    report(f"{profile}: {args.runs} cold starts, GET {args.path} -> {samples[0]['status']}", [
+        ('import task2.wsgi (p50)', f"{import_ms:.1f} ms"),
+        ('first response (p50)', f"{first_ms:.1f} ms"),
+        ('cold start (p50)', f"{import_ms + first_ms:.1f} ms"),
+        ('modules loaded', samples[0]['modules']),
+    ])
+    report(f"  top {args.top} packages by import self time", [
+        (name, f"{ms:.1f} ms") for name, ms in import_breakdown(stderr)[:args.top]
+    ])
+    print()
+    return import_ms + first_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profile', action='append', choices=PROFILES,
+                        help="settings module to measure (repeatable, default: all)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--path', default='/api/organisations',
+                        help="path of the first request; the default answers 401 without touching the database")
+    parser.add_argument('--max-cold-start-ms', type=float,
+                        help="fail when any profile's median cold start exceeds this budget")
+    args = parser.parse_args()
+
+    over_budget = []
+    for profile in args.profile or PROFILES:
+        cold_start = bench(profile, args)
+        if args.max_cold_start_ms is not None and cold_start > args.max_cold_start_ms:
+            over_budget.append(f"{profile}: {cold_start:.1f} ms > {args.max_cold_start_ms:.1f} ms")
+
+    if over_budget:
+        print("cold start over budget:\n  " + "\n  ".join(over_budget))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
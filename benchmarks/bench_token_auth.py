@@ -0,0 +1,60 @@
+"""Per-request cost of bearer-token authentication with and without the verified-token cache.
+
+Each scenario authenticates the same request again and again, the way a client reuses its
+access token. "verify" only validates the token. "authenticate" also resolves the user:
+from membership claims (a cache read), or with plain tokens from the user row.
+
+    python benchmarks/bench_token_auth.py --calls 20000
+"""
+import argparse
+import time
+
+from _django import test_database, report
+
+
+def per_call(call, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with test_database():
+        from django.test import RequestFactory, override_settings
+        from task.authentication import CachedMembershipJWTAuthentication, MembershipJWTAuthentication
+        from task.tokens import access_token_for
+        from task.users.models import User, Organisation
+
+        user = User.objects.create_user(email='bench@example.com', password='benchpassword123',
+                                        firstName='Bench', lastName='User')
+        user.organisations.add(Organisation.objects.create(name='Bench Organisation'))
+        # Adding the organisation bumped the membership version the claims must carry.
+        user.refresh_from_db()
+        with override_settings(JWT_MEMBERSHIP_CLAIMS=True):
+            claims_token = access_token_for(user)
+        plain_token = access_token_for(user)
+
+        factory = RequestFactory()
+        rows = []
+        for label, token in (("claims token", claims_token), ("plain token", plain_token)):
+            request = factory.get('/api/organisations', HTTP_AUTHORIZATION=f'Bearer {token}')
+            raw = token.encode()
+            for name, authenticator in (("uncached", MembershipJWTAuthentication()),
+                                        ("cached", CachedMembershipJWTAuthentication())):
+                authenticator.authenticate(request)
+                verify = min(per_call(lambda: authenticator.get_validated_token(raw), args.calls)
+                             for _ in range(args.repeat))
+                full = min(per_call(lambda: authenticator.authenticate(request), args.calls // 4)
+                           for _ in range(args.repeat))
+                rows.append((f"{label}, {name}", f"verify {verify * 1e6:6.1f}us  authenticate {full * 1e6:6.1f}us"))
+        report("bearer authentication per request", rows)
+
+
+if __name__ == '__main__':
+    main()
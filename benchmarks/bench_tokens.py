@@ -0,0 +1,59 @@
+"""Tokens minted per second by the register/login paths, before and after task.tokens.
+
+"before" is what the views used to do, ``RefreshToken.for_user(user).access_token``; with a
+refresh token, both are also serialized. No database is involved: membership claims are off.
+
+    python benchmarks/bench_tokens.py --tokens 20000
+"""
+import argparse
+import time
+import uuid
+
+from _django import report
+
+
+def rate(mint, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        mint()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=20000, help="responses minted per scenario")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from task.tokens import issue_tokens
+    from task.users.models import User
+
+    user = User(pk=uuid.uuid4(), email='bench@example.com')
+
+    def before():
+        return str(RefreshToken.for_user(user).access_token)
+
+    def before_with_refresh():
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token), str(refresh)
+
+    scenarios = [
+        ("access only, before", before),
+        ("access only, after", lambda: issue_tokens(user)),
+        ("with refresh, before", before_with_refresh),
+        ("with refresh, after", lambda: issue_tokens(user, refresh=True)),
+    ]
+    rows = []
+    for name, mint in scenarios:
+        mint()
+        best = max(rate(mint, args.tokens) for _ in range(args.repeat))
+        rows.append((name, f"{best:10,.0f} responses/s  {1e6 / best:6.1f}us each"))
+    report("token minting", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TaskConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import metrics  # noqa: F401
+        from .db import sqlite  # noqa: F401
@@ -0,0 +1,15 @@
+from django.urls import path
+from . import async_views, views
+
+
+# Served ahead of task.urls when running under ASGI (settings.ASYNC_VIEWS); anything
+# not listed here falls through to the sync views. Login and register stay on the DRF
+# views, which parse form and multipart bodies too; their async versions only take JSON
+# and are served at auth/async/ (task.urls).
+urlpatterns = [
+    path('api/users/<str:id>', async_views.get_user_record, name='get_user_record'),
+    path('api/organisations', async_views.get_or_create_organisations, name='get_or_create_organisations'),
+    # Ahead of <orgId>, which would swallow it; the search view itself is sync.
+    path('api/organisations/search', views.search_organisations, name='search_organisations'),
+    path('api/organisations/<str:orgId>', async_views.get_organisation, name='get_organisation'),
+]
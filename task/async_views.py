@@ -0,0 +1,302 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+
+from . import views
+from .authentication import CachedMembershipJWTAuthentication
+from .etags import make_etag, etag_matches
+from .renderers import JSONRenderer
+from .response_cache import organisation_responses
+from .pagination import page_params, wants_stream, apaginate_queryset, astream_list_response, paginate_ids
+from .serializers import UserSerializer, RegisterSerializer, user_reader, organisation_reader
+from .tokens import issue_tokens, wants_refresh_token
+from .users.authentication import aauthenticate_user
+from .users.hashing import HashingOverloaded
+from .users.membership import (
+    annotate_co_membership, current_membership_version, current_organisation_ids, is_same_user,
+    user_organisations,
+)
+from .users.models import User, Organisation
+from .users.registration import aregister_user
+from .throttling import client_ip, login_throttle
+from .views import OVERLOADED_RESPONSE, THROTTLED_RESPONSE
+
+
+def csrf_exempt(view):
+    # django's csrf_exempt wraps the view in a sync function, which hides the coroutine.
+    view.csrf_exempt = True
+    return view
+
+
+def _json(data, response_status, headers=None):
+    # Same renderer as the DRF views so both deployments return identical bytes.
+    return HttpResponse(JSONRenderer().render(data), status=response_status,
+                        content_type='application/json', headers=headers)
+
+
+def _not_modified(etag):
+    return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def _overloaded():
+    return _json(OVERLOADED_RESPONSE, status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
+
+
+def _throttled(retry_after):
+    return _json(THROTTLED_RESPONSE, status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": str(retry_after)})
+
+
+def _method_not_allowed():
+    return _json({
+        "status": "Method not allowed",
+        "message": "This request method is not allow.",
+        "statusCode": 405
+    }, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+def _not_found():
+    return _json("Error 404!! Not found.", status.HTTP_404_NOT_FOUND)
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _bad_request():
+    return _json({
+        "status": "Bad request",
+        "message": "Request body must be a JSON object.",
+        "statusCode": 400
+    }, status.HTTP_400_BAD_REQUEST)
+
+
+def _bad_page_params():
+    return _json({
+        "status": "Bad Request",
+        "message": "cursor must be an orgId and limit a positive integer.",
+        "statusCode": 400
+    }, status.HTTP_400_BAD_REQUEST)
+
+
+async def _authenticate(request):
+    """Authenticate a bearer token like the DRF views do.
+
+    Returns ``(user, None)`` or ``(None, response)`` carrying the same 401 DRF would send.
+    """
+
+    authenticator = CachedMembershipJWTAuthentication()
+    try:
+        result = await sync_to_async(authenticator.authenticate)(request)
+    except exceptions.APIException as exc:
+        detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+        error = exc
+    else:
+        if result is not None:
+            return result[0], None
+        error = exceptions.NotAuthenticated()
+        detail = {"detail": error.detail}
+    headers = {"WWW-Authenticate": authenticator.authenticate_header(request)}
+    return None, _json(detail, error.status_code, headers=headers)
+
+
+async def _tokens_response(request, user, message, response_status):
+    # Minting may read memberships for the token claims.
+    tokens = await sync_to_async(issue_tokens)(user, refresh=wants_refresh_token(request))
+    return _json({
+        "status": "success",
+        "message": message,
+        "data": {
+            **tokens,
+            "user": UserSerializer(user).data
+        }
+    }, response_status)
+
+
+@csrf_exempt
+async def register(request):
+    """Registers a user off the request thread; hashing runs on the bounded hashing executor."""
+
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    data = _json_body(request)
+    if data is None:
+        return _bad_request()
+
+    serializer = RegisterSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        field = list(serializer.errors.keys())[0]
+        return _json({
+            "errors": [{"field": field, "message": serializer.errors[field][0]}]
+        }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    try:
+        user = await aregister_user(serializer.validated_data)
+    except IntegrityError:
+        return _json({
+            "errors": [{"field": "email", "message": "user with this email already exists."}]
+        }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+    except HashingOverloaded:
+        return _overloaded()
+
+    return await _tokens_response(request, user, "Registration successful", status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+async def login(request):
+    """Logs in a user without holding a worker thread for the password check."""
+
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    data = _json_body(request)
+    if data is None:
+        return _bad_request()
+
+    retry_after = await login_throttle.acheck(data.get('email'), client_ip(request))
+    if retry_after is not None:
+        return _throttled(retry_after)
+
+    try:
+        user = await aauthenticate_user(data.get('email'), data.get('password'), request)
+    except HashingOverloaded:
+        return _overloaded()
+
+    if user is None:
+        return _json({
+            "status": "Bad request",
+            "message": "Authentication failed",
+            "statusCode": 401
+        }, status.HTTP_401_UNAUTHORIZED)
+
+    return await _tokens_response(request, user, "Login successful", status.HTTP_200_OK)
+
+
+@csrf_exempt
+async def get_user_record(request, id: str = None):
+    """Get a user record, natively async."""
+
+    if request.method != 'GET':
+        return await sync_to_async(views.get_user_record)(request, id=id)
+
+    user, denied = await _authenticate(request)
+    if denied is not None:
+        return denied
+
+    try:
+        target_user = await annotate_co_membership(User.objects.only(*user_reader.fields, 'updatedAt'), user).aget(pk=id)
+    except User.DoesNotExist:
+        return _not_found()
+
+    if not (is_same_user(user, target_user) or target_user.shares_organisation):
+        return _json({"status": "error", "message": "You do not have permission to view this user."},
+                     status.HTTP_403_FORBIDDEN)
+
+    etag = make_etag('user', target_user.pk, target_user.updatedAt.isoformat())
+    if etag_matches(request, etag):
+        return _not_modified(etag)
+
+    return _json({
+        "status": "success",
+        "message": "User record found",
+        "data": UserSerializer(target_user).data
+    }, status.HTTP_200_OK, headers={'ETag': etag})
+
+
+@csrf_exempt
+async def get_or_create_organisations(request):
+    """List the user's organisations natively async; creation still goes through the sync view."""
+
+    if request.method != 'GET':
+        return await sync_to_async(views.get_or_create_organisations)(request)
+
+    user, denied = await _authenticate(request)
+    if denied is not None:
+        return denied
+
+    try:
+        cursor, limit = page_params(request)
+    except ValueError:
+        return _bad_page_params()
+
+    if wants_stream(request):
+        organisations = user_organisations(user)
+        if cursor is not None:
+            organisations = organisations.filter(pk__gt=cursor)
+        return astream_list_response(
+            {"status": "success", "message": "User organisations"}, "organisations",
+            organisation_reader.values(organisations.order_by('orgId')), organisation_reader.row)
+
+    # From the primary, as in views.get_or_create_organisations.
+    version = await sync_to_async(current_membership_version)(user.pk)
+    etag = make_etag('organisations', user.pk, version, cursor, limit)
+    if etag_matches(request, etag):
+        return _not_modified(etag)
+
+    page_ids, next_cursor = paginate_ids(await sync_to_async(current_organisation_ids)(user.pk), cursor, limit)
+    organisations = organisation_reader.values(Organisation.objects.filter(pk__in=page_ids).order_by('orgId'))
+    return _json({
+        "status": "success",
+        "message": "User organisations",
+        "data": {
+            "organisations": [organisation_reader.row(row) async for row in organisations],
+            "nextCursor": next_cursor
+        }
+    }, status.HTTP_200_OK, headers={'ETag': etag})
+
+
+@csrf_exempt
+async def get_organisation(request, orgId: str = None):
+    """Get an organisation with a giving orgId, natively async."""
+
+    if request.method != 'GET':
+        return await sync_to_async(views.get_organisation)(request, orgId=orgId)
+
+    user, denied = await _authenticate(request)
+    if denied is not None:
+        return denied
+
+    if orgId:
+        try:
+            cached = await sync_to_async(organisation_responses.get)(orgId)
+        except ValueError:
+            return _not_found()
+        if cached is None:
+            return _not_found()
+
+        etag, body = cached
+        if etag_matches(request, etag):
+            return _not_modified(etag)
+        return HttpResponse(body, content_type='application/json', headers={'ETag': etag})
+
+    try:
+        cursor, limit = page_params(request)
+    except ValueError:
+        return _bad_page_params()
+
+    if wants_stream(request):
+        organisations = Organisation.objects.order_by('orgId')
+        if cursor is not None:
+            organisations = organisations.filter(pk__gt=cursor)
+        return astream_list_response(
+            {"status": "success", "message": "Organisations"}, "organisations",
+            organisation_reader.values(organisations), organisation_reader.row)
+
+    rows, next_cursor = await apaginate_queryset(
+        organisation_reader.values(Organisation.objects.all()), cursor, limit,
+        key='orgId', cursor_of=lambda row: row[0])
+    return _json({
+        "status": "success",
+        "message": "Organisations",
+        "data": {
+            "organisations": [organisation_reader.row(row) for row in rows],
+            "nextCursor": next_cursor
+        }
+    }, status.HTTP_200_OK)
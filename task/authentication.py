@@ -0,0 +1,120 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import ORGANISATIONS_CLAIM, MEMBERSHIP_VERSION_CLAIM
+from .users.membership import membership_version
+
+
+class MembershipTokenUser(TokenUser):
+    """Request user backed only by a token's claims, including its organisation memberships."""
+
+    @cached_property
+    def organisation_ids(self):
+        return frozenset(uuid.UUID(org_id) for org_id in self.token[ORGANISATIONS_CLAIM])
+
+
+class MembershipJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that trusts membership claims while they are current.
+
+    Tokens minted with ``JWT_MEMBERSHIP_CLAIMS`` carry the user's organisation ids and
+    membership version. As long as that version matches the user's current one (a cache
+    read) the request is authenticated without loading the user row. Anything else falls
+    back to the regular database lookup. Saving a user as inactive bumps their membership
+    version (``task.signals``), so outstanding claim tokens stop being trusted.
+    """
+
+    def get_user(self, validated_token):
+        if ORGANISATIONS_CLAIM in validated_token and MEMBERSHIP_VERSION_CLAIM in validated_token:
+            user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+            if user_id is not None and membership_version(user_id) == validated_token[MEMBERSHIP_VERSION_CLAIM]:
+                return MembershipTokenUser(validated_token)
+        return super().get_user(validated_token)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of tokens that already passed signature and claim checks.
+
+    Keyed by a digest of the raw token. An entry is used until the token's ``exp``, or for
+    at most ``JWT_VERIFIED_TOKEN_CACHE_TTL`` seconds, whichever is sooner. Invalid tokens
+    are never cached, so they are checked in full every time.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _key(self, raw_token):
+        return hashlib.blake2b(raw_token, digest_size=16).digest()
+
+    def get(self, raw_token, now=None):
+        now = time.time() if now is None else now
+        key = self._key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[1]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def set(self, raw_token, token, now=None):
+        max_entries = settings.JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES
+        expires = token.get('exp')
+        if max_entries <= 0 or expires is None:
+            return
+        now = time.time() if now is None else now
+        expires = min(expires, now + settings.JWT_VERIFIED_TOKEN_CACHE_TTL)
+        with self._lock:
+            self._entries[self._key(raw_token)] = (token, expires)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+verified_token_cache = VerifiedTokenCache()
+
+
+class CachedMembershipJWTAuthentication(MembershipJWTAuthentication):
+    """``MembershipJWTAuthentication`` that decodes and verifies each distinct token once.
+
+    Clients send the same access token until it expires. Only the first request pays for
+    base64 decoding, the HMAC check and JSON parsing. Later ones get the validated token
+    from ``verified_token_cache``. Looking up the user still happens on every request.
+    """
+
+    def get_validated_token(self, raw_token):
+        if settings.JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES <= 0:
+            return super().get_validated_token(raw_token)
+        token = verified_token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_token_cache.set(raw_token, token)
+        return token
@@ -0,0 +1,10 @@
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from task.db.pool import PooledDatabaseWrapperMixin
+from task.db.sqlite import DatabaseFeatures, ImmediateTransactionMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, ImmediateTransactionMixin, SQLiteDatabaseWrapper):
+    """Pooled SQLite backend, mainly to exercise the pool locally and in tests."""
+
+    features_class = DatabaseFeatures
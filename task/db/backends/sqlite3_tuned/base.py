@@ -0,0 +1,7 @@
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from task.db.sqlite import DatabaseFeatures, ImmediateTransactionMixin
+
+
+class DatabaseWrapper(ImmediateTransactionMixin, SQLiteDatabaseWrapper):
+    features_class = DatabaseFeatures
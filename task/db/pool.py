@@ -0,0 +1,218 @@
+"""Connection pooling for Django database backends.
+
+Django 4.2 opens a new database connection per request (or keeps one per thread with
+``CONN_MAX_AGE``). The pooled backends in ``task.db.backends`` instead borrow connections
+from a process-wide pool per database and hand them back when Django closes them.
+
+Pool options are read from the ``POOL`` key of the database settings::
+
+    'POOL': {
+        'MIN_SIZE': 1,          # connections opened up front
+        'MAX_SIZE': 10,         # hard cap on open connections
+        'TIMEOUT': 5,           # seconds to wait for a free connection
+        'MAX_LIFETIME': 1800,   # recycle connections older than this (seconds)
+        'HEALTH_CHECK': True,   # ping idle connections before handing them out
+    }
+"""
+from collections import deque
+import threading
+import time
+
+from django.db.utils import OperationalError
+
+
+DEFAULTS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 5.0,
+    'MAX_LIFETIME': 1800.0,
+    'HEALTH_CHECK': True,
+}
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free within the pool's checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of raw DB-API connections with a size cap, lifetime and health checks."""
+
+    def __init__(self, min_size, max_size, timeout, max_lifetime, health_check):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+
+        self._idle = deque()
+        self._born = {}
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._filled = False
+        self.counters = dict.fromkeys(
+            ('created', 'closed', 'checkouts', 'waits', 'timeouts', 'recycled', 'health_check_failures'), 0)
+
+    @property
+    def size(self):
+        return len(self._idle) + self._in_use
+
+    def _open(self, connect):
+        conn = connect()
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self.counters['created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._born.pop(id(conn), None)
+        self.counters['closed'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, conn):
+        return self.max_lifetime and time.monotonic() - self._born.get(id(conn), 0) > self.max_lifetime
+
+    def _healthy(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self, connect):
+        """Hand out an idle connection, or one made with ``connect()`` while under ``max_size``."""
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if not self._filled:
+                    self._filled = True
+                    while self.size < self.min_size:
+                        self._idle.append(self._open(connect))
+
+                while self._idle:
+                    conn = self._idle.popleft()
+                    if not self._expired(conn):
+                        break
+                    self.counters['recycled'] += 1
+                    self._discard(conn)
+                    conn = None
+
+                if conn is None and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(f"no database connection free after {self.timeout}s (max_size={self.max_size})")
+                    self.counters['waits'] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+                # Reserve the slot now so concurrent checkouts respect max_size while we
+                # ping or connect outside the lock.
+                self._in_use += 1
+
+            if conn is not None and self.health_check and not self._healthy(conn):
+                with self._cond:
+                    self.counters['health_check_failures'] += 1
+                    self._in_use -= 1
+                    self._discard(conn)
+                    self._cond.notify()
+                continue
+
+            if conn is None:
+                try:
+                    conn = self._open(connect)
+                except BaseException:
+                    with self._cond:
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+
+            with self._cond:
+                self.counters['checkouts'] += 1
+            return conn
+
+    def checkin(self, conn):
+        with self._cond:
+            self._in_use -= 1
+            try:
+                # Never hand out a connection with a transaction left open.
+                conn.rollback()
+                reusable = not self._expired(conn)
+            except Exception:
+                reusable = False
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self.counters['recycled'] += 1
+                self._discard(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.popleft())
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self.counters,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(settings_dict, alias):
+    return (alias, str(settings_dict.get('NAME')), settings_dict.get('HOST'), settings_dict.get('PORT'), settings_dict.get('USER'))
+
+
+def get_pool(wrapper):
+    key = _pool_key(wrapper.settings_dict, wrapper.alias)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = {**DEFAULTS, **(wrapper.settings_dict.get('POOL') or {})}
+                pool = _pools[key] = ConnectionPool(
+                    min_size=options['MIN_SIZE'],
+                    max_size=options['MAX_SIZE'],
+                    timeout=options['TIMEOUT'],
+                    max_lifetime=options['MAX_LIFETIME'],
+                    health_check=options['HEALTH_CHECK'],
+                )
+    return pool
+
+
+def pool_stats():
+    """Stats of every pool in this process, keyed by database alias and name."""
+
+    return {f"{key[0]}:{key[1]}": pool.stats() for key, pool in list(_pools.items())}
+
+
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close_all()
+
+
+class PooledDatabaseWrapperMixin:
+    """Borrow raw connections from a shared ``ConnectionPool`` instead of opening new ones."""
+
+    def get_new_connection(self, conn_params):
+        return get_pool(self).checkout(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            get_pool(self).checkin(self.connection)
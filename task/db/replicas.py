@@ -0,0 +1,308 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+``ReplicaRoutingMiddleware`` decides, once per request, where that request reads from:
+
+- Safe-method API requests (GET, HEAD, OPTIONS under ``API_PATH_PREFIXES``) read from one
+  of ``DATABASE_REPLICAS``, picked at random and kept for the whole request.
+- Everything else reads from the primary: writes, the admin, requests by users who are
+  sticky, and code running outside a request (commands, shells, tests).
+
+``ReplicaRouter`` sends every write to the primary, whichever database the instance came from.
+
+A replica lags the primary, so a user who just wrote would not see their write on their
+next read. Such users are *sticky* for ``REPLICA_STICKY_SECONDS``, during which all their
+requests read from the primary. A user becomes sticky when:
+
+- a request they authenticated writes anything, or
+- their own rows change: registration, or memberships added or removed by anyone (see
+  ``task.signals``, and ``add_members`` and ``bulk_register_users`` for the bulk paths
+  that send no signals).
+
+The requesting user is read from the bearer token. ``verified_token_cache`` makes that
+check nearly free, and DRF's check of the same token later hits the cache. Sticky users are
+kept in a bounded in-process LRU (``REPLICA_STICKY_MAX_USERS``). Set
+``REPLICA_STICKY_CACHE_ALIAS`` to keep them in a Django cache, so that every instance
+shares them.
+
+Without replicas the middleware passes requests straight through and the router has no
+opinion, so a single-database deployment behaves as before.
+"""
+from collections import OrderedDict
+from contextvars import ContextVar
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_current = ContextVar('replica_routing', default=None)
+
+
+class RequestRouting:
+    """Where one request reads from, and who it acts for."""
+
+    __slots__ = ('replica', 'user_id', 'wrote')
+
+    def __init__(self, replica, user_id):
+        self.replica = replica
+        self.user_id = user_id
+        self.wrote = False
+
+
+class LocalStickyUsers:
+    """Sticky users in a bounded in-process LRU: user id -> monotonic expiry."""
+
+    shared = False
+
+    def __init__(self, max_users):
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def stick(self, user_ids, seconds):
+        until = time.monotonic() + seconds
+        with self._lock:
+            for user_id in user_ids:
+                self._users[user_id] = until
+                self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+
+    def is_sticky(self, user_id):
+        until = self._users.get(user_id)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        with self._lock:
+            if self._users.get(user_id) == until:
+                del self._users[user_id]
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self):
+        return len(self._users)
+
+
+class CacheStickyUsers:
+    """Sticky users in a Django cache, expiring with the cache entry, shared across instances."""
+
+    shared = True
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def _key(self, user_id):
+        return f"replica-sticky:{user_id}"
+
+    def stick(self, user_ids, seconds):
+        caches[self.alias].set_many({self._key(user_id): 1 for user_id in user_ids}, timeout=seconds)
+
+    def is_sticky(self, user_id):
+        return caches[self.alias].get(self._key(user_id)) is not None
+
+    def clear(self):
+        # The cache may hold other data; shared entries are left to expire.
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class ReplicaRouting:
+    """Per-request replica choice and the sticky users behind it."""
+
+    def __init__(self):
+        self._sticky = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.replica_requests = self.primary_requests = self.sticky_requests = 0
+
+    @property
+    def sticky(self):
+        if self._sticky is None:
+            with self._lock:
+                if self._sticky is None:
+                    alias = settings.REPLICA_STICKY_CACHE_ALIAS
+                    if alias:
+                        self._sticky = CacheStickyUsers(alias)
+                    else:
+                        self._sticky = LocalStickyUsers(max(1, settings.REPLICA_STICKY_MAX_USERS))
+        return self._sticky
+
+    def stick(self, user_ids):
+        """Make ``user_ids`` read from the primary for the next ``REPLICA_STICKY_SECONDS``."""
+
+        user_ids = [str(user_id) for user_id in user_ids if user_id is not None]
+        if user_ids and settings.DATABASE_REPLICAS:
+            self.sticky.stick(user_ids, settings.REPLICA_STICKY_SECONDS)
+
+    def is_sticky(self, user_id):
+        return self.sticky.is_sticky(str(user_id))
+
+    def route(self, request):
+        """The routing for ``request``, or ``None`` when there are no replicas."""
+
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        user_id = request_user_id(request)
+        replica = None
+        # task.middleware.is_api_request, without importing the session middleware next to it.
+        if request.method in SAFE_METHODS and request.path_info.startswith(settings.API_PATH_PREFIXES):
+            if user_id is not None and self.is_sticky(user_id):
+                with self._stats_lock:
+                    self.sticky_requests += 1
+            else:
+                replica = random.choice(replicas)
+        with self._stats_lock:
+            if replica is None:
+                self.primary_requests += 1
+            else:
+                self.replica_requests += 1
+        return RequestRouting(replica, user_id)
+
+    async def aroute(self, request):
+        # Only a shared store does I/O; the local one is a dict lookup.
+        if settings.DATABASE_REPLICAS and self.sticky.shared:
+            return await sync_to_async(self.route)(request)
+        return self.route(request)
+
+    def clear(self):
+        """Forget the local sticky users and the store choice, e.g. after settings change in tests."""
+
+        with self._lock:
+            if self._sticky is not None:
+                self._sticky.clear()
+            self._sticky = None
+
+    def stats(self):
+        sticky = self._sticky
+        return {
+            'replica_requests': self.replica_requests,
+            'primary_requests': self.primary_requests,
+            'sticky_requests': self.sticky_requests,
+            'sticky_users': len(sticky) if sticky is not None else 0,
+            'evictions': getattr(sticky, 'evictions', 0),
+        }
+
+
+replica_routing = ReplicaRouting()
+
+
+def request_user_id(request):
+    """Id of the user the request's bearer token names, or ``None``."""
+
+    from ..authentication import CachedMembershipJWTAuthentication
+
+    authenticator = CachedMembershipJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return authenticator.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # DRF turns the same token away with a 401.
+        return None
+
+
+class ReplicaRouter:
+    """Reads go where the current request's routing says; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is None or routing.replica is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its writes.
+            return DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None and not routing.wrote:
+            routing.wrote = True
+            replica_routing.stick([routing.user_id])
+        # Instances read from a replica would otherwise be saved back to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Pick the request's read database before anything queries, see the module docstring."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = replica_routing.route(request)
+        if routing is None:
+            return self.get_response(request)
+        token = _current.set(routing)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        routing = await replica_routing.aroute(request)
+        if routing is None:
+            return await self.get_response(request)
+        token = _current.set(routing)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+
+def copy_sqlite_database(source_alias, target_alias):
+    """Overwrite the SQLite database ``target_alias`` with a snapshot of ``source_alias``.
+
+    Stands in for replication when replicas are local SQLite files.
+    """
+
+    import sqlite3
+
+    source, target = connections[source_alias], connections[target_alias]
+    if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+        raise ValueError("Only SQLite databases can be copied.")
+    target.close()
+    source.ensure_connection()
+    destination = sqlite3.connect(str(target.settings_dict['NAME']))
+    try:
+        source.connection.backup(destination)
+    finally:
+        destination.close()
@@ -0,0 +1,58 @@
+"""
+SQLite tuning for file databases that take concurrent writes.
+
+A database whose settings carry ``PRAGMAS`` gets them, on top of ``DEFAULT_PRAGMAS``, applied to every new connection
+(``connection_created``). ``TRANSACTION_MODE: 'IMMEDIATE'`` makes ``atomic()`` open its
+transaction with ``BEGIN IMMEDIATE``. The write lock is then taken up front, so a writer
+waits on ``busy_timeout``. A deferred transaction that upgrades from read to write fails at
+once with "database is locked".
+"""
+import sqlite3
+
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3.features import DatabaseFeatures as SQLiteDatabaseFeatures
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB rather than pages.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+@receiver(connection_created, dispatch_uid='task.db.sqlite.apply_pragmas')
+def apply_pragmas(sender, connection, **kwargs):
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or pragmas is None:
+        return
+    with connection.cursor() as cursor:
+        for name, value in {**DEFAULT_PRAGMAS, **pragmas}.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class ImmediateTransactionMixin:
+    """Start ``atomic()`` blocks with the transaction mode named in ``TRANSACTION_MODE``."""
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {mode}')
+
+
+class DatabaseFeatures(SQLiteDatabaseFeatures):
+    @cached_property
+    def max_query_params(self):
+        # Django 4.2 assumes SQLite's historical limit of 999 bound parameters, which caps
+        # bulk_create at a few dozen rows per INSERT. SQLite 3.32+ allows 32766 by default.
+        self.connection.ensure_connection()
+        try:
+            return self.connection.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        except AttributeError:
+            # Python < 3.11.
+            return super().max_query_params
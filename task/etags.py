@@ -0,0 +1,27 @@
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Opaque strong ETag for a response determined by ``parts``."""
+
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return quote_etag(digest)
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match already names ``etag``."""
+
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match uses weak comparison.
+    return '*' in etags or any(candidate.removeprefix('W/') == etag for candidate in etags)
+
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
@@ -0,0 +1,192 @@
+"""
+Seed synthetic users, organisations and memberships for load testing.
+
+    python manage.py seed --users 1000000 --processes 4
+    python manage.py seed --users 100000 --memberships uniform --mean-memberships 5 --tag run2
+
+User ``n`` gets the email ``<tag><n>@example.com``, the name ``<Tag><n>``, the shared
+``--password`` (hashed once) and a default organisation, as registration would. Every user
+then joins a number of further organisations drawn from ``--memberships``. Which
+organisations they join is skewed towards a popular few by ``--skew``.
+
+Work is split into chunks of users spread over ``--processes`` forked workers. Each worker
+builds its rows and writes them with ``bulk_create`` over its own connection. SQLite has a
+single writer, so there the workers only build rows and this process writes them, in order.
+Primary keys are derived from the tag and the row number, so a worker can add memberships
+pointing at any organisation without coordinating. Re-seeding needs a new ``--tag``.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+import random
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from task.users.models import User, Organisation
+from task.users.registration import default_organisation_name
+
+
+DISTRIBUTIONS = ('none', 'fixed', 'uniform', 'geometric')
+
+
+def seeded_uuid(tag, kind, number):
+    """Random-looking but reproducible primary key of row ``number``."""
+
+    digest = hashlib.blake2b(f'{tag}:{kind}:{number}'.encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def membership_count(rng, distribution, mean, maximum):
+    """Number of organisations a user joins besides their own."""
+
+    if distribution == 'none':
+        count = 0
+    elif distribution == 'fixed':
+        count = round(mean)
+    elif distribution == 'uniform':
+        count = rng.randint(0, round(2 * mean))
+    else:
+        # Geometric on 0, 1, 2, ... with the given mean.
+        count = 0
+        while rng.random() < mean / (mean + 1):
+            count += 1
+    return min(count, maximum)
+
+
+def user_rows(options, start, stop):
+    """Users ``start`` to ``stop``, their default organisations and memberships, as plain tuples.
+
+    Tuples are much cheaper than model instances to send back from a worker.
+    """
+
+    tag = options['tag']
+    users, organisations, memberships = [], [], []
+    for number in range(start, stop):
+        user_id, org_id = seeded_uuid(tag, 'user', number), seeded_uuid(tag, 'org', number)
+        first_name = f'{tag.title()}{number}'
+        users.append((user_id, f'{tag}{number}@example.com', first_name))
+        organisations.append((org_id, default_organisation_name(first_name)))
+        memberships.append((user_id, org_id))
+    return users, organisations, memberships
+
+
+def membership_rows(options, start, stop):
+    """The extra memberships of users ``start`` to ``stop``."""
+
+    tag, total = options['tag'], options['users']
+    rng = random.Random(f"{options['seed']}:{start}")
+    memberships = []
+    for number in range(start, stop):
+        user_id = seeded_uuid(tag, 'user', number)
+        count = membership_count(rng, options['memberships'], options['mean_memberships'],
+                                 min(options['max_memberships'], total - 1))
+        joined = set()
+        while len(joined) < count:
+            # Raising to a power > 1 favours the low, popular organisation numbers.
+            other = int(total * rng.random() ** options['skew'])
+            if other != number:
+                joined.add(other)
+        memberships += [(user_id, seeded_uuid(tag, 'org', other)) for other in joined]
+    return [], [], memberships
+
+
+def insert_rows(rows, password, batch_size):
+    """Write one chunk of generated rows in a single transaction; returns the row count."""
+
+    users, organisations, memberships = rows
+    Membership = User.organisations.through
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(userId=user_id, email=email, firstName=first_name, lastName='Seed',
+                  phone='1234567890', password=password) for user_id, email, first_name in users],
+            batch_size=batch_size)
+        Organisation.objects.bulk_create(
+            [Organisation(orgId=org_id, name=name, description='') for org_id, name in organisations],
+            batch_size=batch_size)
+        Membership.objects.bulk_create(
+            [Membership(user_id=user_id, organisation_id=org_id) for user_id, org_id in memberships],
+            batch_size=batch_size)
+    return len(users) + len(organisations) + len(memberships)
+
+
+def seed_chunk(generate, options, password, start, stop):
+    return insert_rows(generate(options, start, stop), password, options['batch_size'])
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic users, organisations and memberships with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--tag', default='seed', help="prefix of emails and names; change it to seed again")
+        parser.add_argument('--password', default='seed-password', help="password shared by every user")
+        parser.add_argument('--memberships', choices=DISTRIBUTIONS, default='geometric',
+                            help="distribution of extra organisations per user")
+        parser.add_argument('--mean-memberships', type=float, default=2.0)
+        parser.add_argument('--max-memberships', type=int, default=50)
+        parser.add_argument('--skew', type=float, default=3.0,
+                            help="popularity skew of joined organisations; 1 is uniform")
+        parser.add_argument('--batch-size', type=int, default=5000, help="rows per INSERT")
+        parser.add_argument('--chunk-size', type=int, default=20000, help="users per transaction and task")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--seed', type=int, default=0, help="random seed for the memberships")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        processes = options['processes']
+        if processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            self.stderr.write("Worker processes need the fork start method; seeding in this process.")
+            processes = 1
+        if processes > 1 and connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.stderr.write("In-memory SQLite cannot be shared between processes; seeding in this process.")
+            processes = 1
+
+        password = make_password(options['password'])
+        chunks = [(start, min(options['users'], start + options['chunk_size']))
+                  for start in range(0, options['users'], options['chunk_size'])]
+
+        started = time.perf_counter()
+        rows = self.seed(processes, user_rows, options, password, chunks, "users and organisations")
+        # Second pass, once every organisation a membership can point at exists.
+        rows += self.seed(processes, membership_rows, options, password, chunks, "memberships")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s) with {processes} process(es)."))
+
+    def seed(self, processes, generate, options, password, chunks, label):
+        started = time.perf_counter()
+        if processes == 1:
+            rows = sum(seed_chunk(generate, options, password, *chunk) for chunk in chunks)
+        else:
+            # Forked workers open their own connections, as long as none is open when they fork.
+            connections.close_all()
+            with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('fork')) as pool:
+                if connection.vendor == 'sqlite':
+                    rows = sum(insert_rows(generated, password, options['batch_size'])
+                               for generated in self.generated(pool, processes, generate, options, chunks))
+                else:
+                    rows = sum(pool.map(seed_chunk, *zip(*((generate, options, password, *chunk)
+                                                           for chunk in chunks))))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"  {label}: {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+        return rows
+
+    def generated(self, pool, processes, generate, options, chunks):
+        """Rows of each chunk, in order, with at most two chunks per worker in flight."""
+
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(generate, options, *chunk))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,27 @@
+"""
+Copy the SQLite primary into every replica file, standing in for replication locally.
+
+    DB_REPLICAS=replica1.sqlite3,replica2.sqlite3 python manage.py sync_replicas
+
+Between runs the replicas lag the primary, which is what read-your-writes stickiness
+(task.db.replicas) has to cover for.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from task.db.replicas import copy_sqlite_database
+
+
+class Command(BaseCommand):
+    help = "Copy the SQLite primary database into each SQLite replica in DATABASE_REPLICAS."
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured; set DB_REPLICAS.")
+        for alias in settings.DATABASE_REPLICAS:
+            try:
+                copy_sqlite_database(DEFAULT_DB_ALIAS, alias)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"{alias}: copied from {DEFAULT_DB_ALIAS}")
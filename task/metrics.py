@@ -0,0 +1,268 @@
+"""
+Per-view request instrumentation.
+
+``MetricsMiddleware`` opens a ``RequestTimings`` for every request.
+Database time and query count come from an execute wrapper installed on every connection
+as it is created. It reports to the request in the current context, so queries that run in
+``sync_to_async`` threads are counted too. Other phases are added by wrapping code in
+``timed('serialize')`` or ``timed('hash')``. When the
+request finishes, each measurement is put into an in-process histogram labelled with the
+view's URL name, and with ``SERVER_TIMING`` a ``Server-Timing`` header is added to the response. ``/metrics``
+serves the histograms in the Prometheus text format.
+
+The histograms are per process. Scrape every worker, or sum the workers in Prometheus.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Histogram name -> (help text, buckets).
+HISTOGRAMS = {
+    'task_request_duration_seconds': ("Total time spent handling the request.", LATENCY_BUCKETS),
+    'task_db_query_duration_seconds': ("Time spent in database queries per request.", LATENCY_BUCKETS),
+    'task_db_queries': ("Database queries per request.", COUNT_BUCKETS),
+    'task_serialize_duration_seconds': ("Time spent serializing and rendering per request.", LATENCY_BUCKETS),
+    'task_hash_duration_seconds': ("Time spent waiting on password hashing per request.", LATENCY_BUCKETS),
+}
+
+# Server-Timing metric name -> histogram fed from that phase.
+PHASES = {
+    'db': 'task_db_query_duration_seconds',
+    'serialize': 'task_serialize_duration_seconds',
+    'hash': 'task_hash_duration_seconds',
+}
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Time spent per phase by one request, and its query count."""
+
+    def __init__(self):
+        self.queries = 0
+        self.phases = defaultdict(float)
+        self._active = set()
+
+    @contextmanager
+    def track(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.phases['db'] += time.perf_counter() - start
+
+
+@receiver(connection_created, dispatch_uid='task.metrics.install_query_recorder')
+def install_query_recorder(sender, connection, **kwargs):
+    # The list outlives reconnects; the equivalent of a permanent connection.execute_wrapper().
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request, if any.
+
+    Nested blocks of the same phase are only counted once.
+    """
+
+    timings = _current.get()
+    if timings is None or phase in timings._active:
+        yield
+        return
+    timings._active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[phase] += time.perf_counter() - start
+        timings._active.discard(phase)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and view."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, name, view, value):
+        with self._lock:
+            histogram = self._histograms.get((name, view))
+            if histogram is None:
+                histogram = self._histograms[name, view] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def record(self, view, timings, duration):
+        self.observe('task_request_duration_seconds', view, duration)
+        self.observe('task_db_queries', view, timings.queries)
+        for phase, name in PHASES.items():
+            self.observe(name, view, timings.phases.get(phase, 0.0))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """``{name: {view: (bucket counts, sum, count)}}`` with cumulative bucket counts."""
+
+        result = defaultdict(dict)
+        with self._lock:
+            for (name, view), histogram in self._histograms.items():
+                cumulative, total = [], 0
+                for count in histogram.counts:
+                    total += count
+                    cumulative.append(total)
+                result[name][view] = (cumulative, histogram.sum, histogram.count)
+        return result
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(timings, duration):
+    """``Server-Timing`` header value for one request, durations in milliseconds."""
+
+    entries = [f'db;dur={timings.phases.get("db", 0.0) * 1000:.2f};desc="{timings.queries} queries"']
+    entries += [f'{phase};dur={timings.phases[phase] * 1000:.2f}' for phase in ('serialize', 'hash')
+                if phase in timings.phases]
+    entries.append(f'total;dur={duration * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def _label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _gauges():
+    from .authentication import verified_token_cache
+    from .db.pool import pool_stats
+    from .db.replicas import replica_routing
+    from .response_cache import organisation_responses
+    from .throttling import login_throttle
+    from .users.membership import membership_cache
+
+    yield 'task_membership_cache', "Membership cache counters and size.", {
+        (): membership_cache.stats(),
+    }
+    yield 'task_verified_token_cache', "Verified access token cache counters and size.", {
+        (): verified_token_cache.stats(),
+    }
+    yield 'task_organisation_response_cache', "Organisation detail response cache counters and hit ratio.", {
+        (): organisation_responses.stats(),
+    }
+    yield 'task_db_pool', "Connection pool state and counters.", {
+        (('pool', pool),): stats for pool, stats in pool_stats().items()
+    }
+    yield 'task_login_throttle', "Login throttle decisions and counter keys.", {
+        (): login_throttle.stats(),
+    }
+    yield 'task_replica_routing', "Requests by read database, and sticky users.", {
+        (): replica_routing.stats(),
+    }
+
+
+def render_prometheus():
+    """All histograms and cache/pool/throttle stats in the Prometheus text exposition format."""
+
+    lines = []
+    snapshot = registry.snapshot()
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for view, (cumulative, total, count) in sorted(snapshot.get(name, {}).items()):
+            view = _label(view)
+            for bound, value in zip((*buckets, float('inf')), cumulative):
+                lines.append(f'{name}_bucket{{view="{view}",le="{_format_bound(bound)}"}} {value}')
+            lines.append(f'{name}_sum{{view="{view}"}} {total}')
+            lines.append(f'{name}_count{{view="{view}"}} {count}')
+
+    for prefix, help_text, series in _gauges():
+        rendered = defaultdict(list)
+        for labels, stats in series.items():
+            label_text = ','.join(f'{key}="{_label(value)}"' for key, value in labels)
+            for key, value in stats.items():
+                rendered[key].append(f'{prefix}_{key}{{{label_text}}} {float(value)}' if label_text
+                                     else f'{prefix}_{key} {float(value)}')
+        for key, samples in rendered.items():
+            lines += [f'# HELP {prefix}_{key} {help_text}', f'# TYPE {prefix}_{key} gauge', *samples]
+
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Record per-view latency, database, serialization and hashing time, and send ``Server-Timing`` if enabled.
+
+    Goes first in ``MIDDLEWARE`` so the total includes the rest of the stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        start = time.perf_counter()
+        with timings.track():
+            response = self.get_response(request)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        start = time.perf_counter()
+        with timings.track():
+            response = await self.get_response(request)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, timings, duration):
+        match = getattr(request, 'resolver_match', None)
+        registry.record(match.url_name or match.view_name if match else '<unresolved>', timings, duration)
+        if settings.SERVER_TIMING:
+            response.headers['Server-Timing'] = server_timing(timings, duration)
+        return response
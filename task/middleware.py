@@ -0,0 +1,52 @@
+"""
+Browser-only middleware scoped away from the JSON API.
+
+Sessions, CSRF, session authentication, messages and X-Frame-Options only matter to the
+admin. API requests authenticate with a bearer token, so each class below hands requests
+under ``API_PATH_PREFIXES`` straight to the next handler and behaves exactly like the Django
+middleware it extends everywhere else. Subclassing keeps the admin's system checks satisfied.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIXES)
+
+
+class BrowserOnlyMixin:
+    """Skip the wrapped middleware entirely for API requests."""
+
+    def __call__(self, request):
+        if is_api_request(request):
+            # A coroutine under ASGI, which the handler awaits like any other.
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class BrowserSessionMiddleware(BrowserOnlyMixin, SessionMiddleware):
+    pass
+
+
+class BrowserCsrfViewMiddleware(BrowserOnlyMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # The handler calls view middleware directly, outside __call__.
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class BrowserAuthenticationMiddleware(BrowserOnlyMixin, AuthenticationMiddleware):
+    pass
+
+
+class BrowserMessageMiddleware(BrowserOnlyMixin, MessageMiddleware):
+    pass
+
+
+class BrowserXFrameOptionsMiddleware(BrowserOnlyMixin, XFrameOptionsMiddleware):
+    pass
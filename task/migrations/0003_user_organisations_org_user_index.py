@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0002_user_membershipversion'),
+    ]
+
+    # The auto-created through table only has the unique (user_id, organisation_id) index;
+    # co-membership checks probe it by organisation first.
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX task_user_organisations_org_user_idx ON task_user_organisations (organisation_id, user_id);',
+            reverse_sql='DROP INDEX task_user_organisations_org_user_idx;',
+        ),
+    ]
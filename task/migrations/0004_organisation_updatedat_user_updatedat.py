@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0003_user_organisations_org_user_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organisation',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+# Substring search needs a trigram index, which every backend spells differently. The
+# SQLite one is an external-content FTS5 table kept in step with task_organisation by
+# triggers; PostgreSQL gets a pg_trgm GIN index on lower(name). Other backends scan.
+SQLITE_TRIGRAM = [
+    "CREATE VIRTUAL TABLE task_organisation_trigram USING fts5("
+    "name, content='task_organisation', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER task_organisation_trigram_ai AFTER INSERT ON task_organisation BEGIN "
+    "INSERT INTO task_organisation_trigram(rowid, name) VALUES (new.rowid, new.name); END",
+    "CREATE TRIGGER task_organisation_trigram_ad AFTER DELETE ON task_organisation BEGIN "
+    "INSERT INTO task_organisation_trigram(task_organisation_trigram, rowid, name) "
+    "VALUES ('delete', old.rowid, old.name); END",
+    "CREATE TRIGGER task_organisation_trigram_au AFTER UPDATE OF name ON task_organisation BEGIN "
+    "INSERT INTO task_organisation_trigram(task_organisation_trigram, rowid, name) "
+    "VALUES ('delete', old.rowid, old.name); "
+    "INSERT INTO task_organisation_trigram(rowid, name) VALUES (new.rowid, new.name); END",
+    "INSERT INTO task_organisation_trigram(task_organisation_trigram) VALUES ('rebuild')",
+]
+SQLITE_TRIGRAM_REVERSE = [
+    "DROP TRIGGER IF EXISTS task_organisation_trigram_au",
+    "DROP TRIGGER IF EXISTS task_organisation_trigram_ad",
+    "DROP TRIGGER IF EXISTS task_organisation_trigram_ai",
+    "DROP TABLE IF EXISTS task_organisation_trigram",
+]
+POSTGRESQL_TRIGRAM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX organisation_search_trgm_idx ON task_organisation USING gin (lower(name) gin_trgm_ops)",
+]
+POSTGRESQL_TRIGRAM_REVERSE = [
+    "DROP INDEX IF EXISTS organisation_search_trgm_idx",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0004_organisation_updatedat_user_updatedat'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organisation',
+            index=models.Index(django.db.models.functions.text.Lower('name'), models.F('orgId'),
+                               name='organisation_search_name_idx'),
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_TRIGRAM, 'postgresql': POSTGRESQL_TRIGRAM}),
+            _run({'sqlite': SQLITE_TRIGRAM_REVERSE, 'postgresql': POSTGRESQL_TRIGRAM_REVERSE}),
+        ),
+    ]
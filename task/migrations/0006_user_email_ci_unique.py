@@ -0,0 +1,35 @@
+# Generated by Django 4.2.9 on 2026-10-18 01:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+import django.db.models.functions.text
+
+
+def check_case_duplicates(apps, schema_editor):
+    # Emails registered before this migration may differ only in case. Which account to
+    # keep is not something a migration can decide, so stop with the list instead.
+    User = apps.get_model('task', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .values(email_key=Lower('email')).annotate(count=Count('pk')).filter(count__gt=1)
+        .values_list('email_key', flat=True)[:20])
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make emails unique ignoring case; merge or rename the users with these emails "
+            "first: " + ", ".join(duplicates))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0005_organisation_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_ci_unique'),
+        ),
+    ]
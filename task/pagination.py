@@ -0,0 +1,126 @@
+from bisect import bisect_right
+import json
+import uuid
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _query_params(request):
+    # DRF requests expose query_params, plain Django (async) requests GET.
+    return getattr(request, 'query_params', request.GET)
+
+
+def page_params(request):
+    """Read ``cursor`` and ``limit`` query parameters; raises ``ValueError`` when malformed."""
+
+    cursor = _query_params(request).get('cursor')
+    cursor = uuid.UUID(cursor) if cursor else None
+    limit = int(_query_params(request).get('limit', settings.ORGANISATIONS_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return cursor, min(limit, settings.ORGANISATIONS_MAX_PAGE_SIZE)
+
+
+def wants_stream(request):
+    return _query_params(request).get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def paginate_queryset(queryset, cursor, limit, key='pk', cursor_of=None):
+    """Keyset page of ``queryset`` ordered by ``key``, starting after ``cursor``.
+
+    Returns the rows and the cursor of the next page (``None`` on the last page).
+    ``cursor_of`` reads the key from a row when rows are not model instances.
+    """
+
+    queryset = queryset.order_by(key)
+    if cursor is not None:
+        queryset = queryset.filter(**{f'{key}__gt': cursor})
+    rows = list(queryset[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, str(cursor_of(rows[-1]) if cursor_of else getattr(rows[-1], key))
+    return rows, None
+
+
+async def apaginate_queryset(queryset, cursor, limit, key='pk', cursor_of=None):
+    """Async counterpart of ``paginate_queryset``."""
+
+    queryset = queryset.order_by(key)
+    if cursor is not None:
+        queryset = queryset.filter(**{f'{key}__gt': cursor})
+    rows = [row async for row in queryset[:limit + 1]]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, str(cursor_of(rows[-1]) if cursor_of else getattr(rows[-1], key))
+    return rows, None
+
+
+def paginate_ids(ids, cursor, limit):
+    """Keyset page over an in-memory set of ids, same contract as ``paginate_queryset``."""
+
+    ordered = sorted(ids)
+    start = bisect_right(ordered, cursor) if cursor is not None else 0
+    page = ordered[start:start + limit + 1]
+    if len(page) > limit:
+        page = page[:limit]
+        return page, str(page[-1])
+    return page, None
+
+
+def _envelope_parts(envelope, list_key):
+    head = JSONEncoder().encode({**envelope, "data": {list_key: []}})
+    # Split the rendered envelope around the empty list and write rows in between.
+    prefix, suffix = head.rsplit('[]', 1)
+    return prefix + '[', ']' + suffix
+
+
+def stream_list_response(envelope, list_key, queryset, serialize, chunk_size=None):
+    """Stream ``envelope`` with ``data[list_key]`` filled from ``queryset`` one row at a time.
+
+    Rows are read with ``queryset.iterator()`` and written as they are serialized, so memory
+    stays flat however many rows there are.
+    """
+
+    chunk_size = chunk_size or settings.ORGANISATIONS_STREAM_CHUNK_SIZE
+    prefix, suffix = _envelope_parts(envelope, list_key)
+
+    def rows():
+        yield prefix
+        buffer = []
+        first = True
+        for row in queryset.iterator(chunk_size=chunk_size):
+            buffer.append(('' if first else ',') + json.dumps(serialize(row), cls=JSONEncoder))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+        yield suffix
+
+    return StreamingHttpResponse(rows(), content_type='application/json')
+
+
+def astream_list_response(envelope, list_key, queryset, serialize, chunk_size=None):
+    """``stream_list_response`` fed by async iteration, for async views under ASGI."""
+
+    chunk_size = chunk_size or settings.ORGANISATIONS_STREAM_CHUNK_SIZE
+    prefix, suffix = _envelope_parts(envelope, list_key)
+
+    async def rows():
+        yield prefix
+        buffer = []
+        first = True
+        async for row in queryset.aiterator(chunk_size=chunk_size):
+            buffer.append(('' if first else ',') + json.dumps(serialize(row), cls=JSONEncoder))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+        yield suffix
+
+    return StreamingHttpResponse(rows(), content_type='application/json')
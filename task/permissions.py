@@ -0,0 +1,18 @@
+from rest_framework.permissions import BasePermission
+
+from .users.models import User
+
+
+class IsStaffUser(BasePermission):
+    """``IsAdminUser`` that also holds for membership-claim token users.
+
+    Claim tokens carry no staff flag, so for them the flag is read from the user row.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if not isinstance(user, User):
+            user = User.objects.filter(pk=user.pk).only('is_active', 'is_staff').first()
+        return user is not None and user.is_active and user.is_staff
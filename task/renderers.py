@@ -0,0 +1,11 @@
+from rest_framework import renderers
+
+from .metrics import timed
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """DRF's JSON renderer, timed as part of the request's serialization phase."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,205 @@
+"""
+Cached organisation detail responses.
+
+GET /api/organisations/<orgId> returns a body that only changes when the organisation
+does. ``organisation_responses`` keeps that body in the Django cache named by
+``ORGANISATION_RESPONSE_CACHE_ALIAS``. It stores the rendered JSON bytes with their ETag, so
+a hit costs one cache read, with no query, serializer or renderer work. Saving or deleting
+an organisation drops its entry (``task.signals``). The entry is dropped again once the
+transaction commits, in case a concurrent request cached the old row meanwhile.
+
+Entries are fresh for ``ORGANISATION_RESPONSE_CACHE_TIMEOUT`` seconds and kept
+``ORGANISATION_RESPONSE_CACHE_GRACE`` seconds longer. When a hot entry goes stale, the
+first request to take the refresh lock rebuilds it, and everyone else keeps getting the
+stale copy until it is done. When an entry is missing altogether, the requests in a
+process wait for the one that is already building it. A request in another process
+holding the lock is waited for up to ``ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT``. So an
+expiring entry costs one rebuild, not one per concurrent request.
+
+Invalidation only reaches the cache it is sent to. With a process-local backend
+(``LocMemCache``, which is what ``default`` is unless ``CACHES`` says otherwise) other
+workers never hear of an edit. There, entries are fresh for at most
+``ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT`` seconds, which bounds how long another worker
+serves an old body or answers 304 for an old ETag. Point
+``ORGANISATION_RESPONSE_CACHE_ALIAS`` at a shared backend to get the full timeout.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .etags import make_etag
+from .renderers import JSONRenderer
+
+# How often a request polls for an entry another process is building.
+LOCK_POLL_INTERVAL = 0.01
+
+
+def render_organisation(org_id):
+    """``(etag, body)`` of the organisation detail response, or ``None`` if there is no such organisation.
+
+    Reads the primary: what is rendered here is cached for longer than a replica lags, and
+    an edit's invalidation must not be refilled from a replica that has not seen it yet.
+    """
+
+    from .serializers import OrganisationSerializer
+    from .users.models import Organisation
+
+    try:
+        organisation = Organisation.objects.using(DEFAULT_DB_ALIAS).get(pk=org_id)
+    except Organisation.DoesNotExist:
+        return None
+    etag = make_etag('organisation', organisation.pk, organisation.updatedAt.isoformat())
+    body = JSONRenderer().render({
+        "status": "success",
+        "message": "Organisation Found",
+        "data": OrganisationSerializer(organisation).data
+    })
+    return etag, body
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'ok')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.ok = False
+
+
+class OrganisationResponseCache:
+    """Rendered organisation detail responses in a Django cache, rebuilt one request at a time."""
+
+    def __init__(self, render=render_organisation):
+        self.render = render
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = self.stale_hits = self.misses = self.coalesced = self.rebuilds = self.invalidations = 0
+
+    @property
+    def cache(self):
+        return caches[settings.ORGANISATION_RESPONSE_CACHE_ALIAS]
+
+    def fresh_seconds(self):
+        """How long a new entry is fresh; short when other processes cannot see invalidations."""
+
+        fresh = settings.ORGANISATION_RESPONSE_CACHE_TIMEOUT
+        if isinstance(self.cache, LocMemCache):
+            fresh = min(fresh, settings.ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT)
+        return fresh
+
+    def _key(self, org_id):
+        return f"organisation-response:{org_id.hex}"
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, org_id):
+        """``(etag, body)`` for ``org_id``, or ``None`` if there is no such organisation.
+
+        Raises ``ValueError`` for ids that are not UUIDs.
+        """
+
+        org_id = org_id if isinstance(org_id, uuid.UUID) else uuid.UUID(str(org_id))
+        if not settings.ORGANISATION_RESPONSE_CACHE:
+            return self.render(org_id)
+
+        key = self._key(org_id)
+        entry = self.cache.get(key)
+        if entry is not None:
+            fresh_until, etag, body = entry
+            if time.time() < fresh_until:
+                self._count('hits')
+                return etag, body
+            if not self.cache.add(key + ':lock', 1, settings.ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT):
+                # Someone is already refreshing it.
+                self._count('stale_hits')
+                return etag, body
+            try:
+                return self._rebuild(org_id, key)
+            finally:
+                self.cache.delete(key + ':lock')
+
+        self._count('misses')
+        return self._single_flight(org_id, key)
+
+    def _single_flight(self, org_id, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            if flight.done.wait(settings.ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT) and flight.ok:
+                self._count('coalesced')
+                return flight.result
+            # The build failed or is taking too long.
+            return self.render(org_id)
+
+        try:
+            flight.result = self._build_once(org_id, key)
+            flight.ok = True
+            return flight.result
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _build_once(self, org_id, key):
+        cache, lock_key = self.cache, key + ':lock'
+        timeout = settings.ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT
+        if not cache.add(lock_key, 1, timeout):
+            # Another process is building it; use theirs unless it takes too long.
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    self._count('coalesced')
+                    return entry[1:]
+            return self._rebuild(org_id, key)
+        try:
+            return self._rebuild(org_id, key)
+        finally:
+            cache.delete(lock_key)
+
+    def _rebuild(self, org_id, key):
+        self._count('rebuilds')
+        result = self.render(org_id)
+        if result is not None:
+            fresh = self.fresh_seconds()
+            self.cache.set(key, (time.time() + fresh, *result), fresh + settings.ORGANISATION_RESPONSE_CACHE_GRACE)
+        return result
+
+    def invalidate(self, org_ids):
+        keys = [self._key(org_id if isinstance(org_id, uuid.UUID) else uuid.UUID(str(org_id))) for org_id in org_ids]
+        if not keys:
+            return
+        cache = self.cache
+        cache.delete_many(keys)
+        if transaction.get_connection().in_atomic_block:
+            # A request that read the row before this transaction commits may cache it again.
+            transaction.on_commit(lambda: cache.delete_many(keys))
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "rebuilds": self.rebuilds,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+
+organisation_responses = OrganisationResponseCache()
@@ -1,14 +1,25 @@
 # serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from .users.models import Organisation
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import IntegrityError
+from django.utils.functional import cached_property
+from .metrics import timed
+from .users.registration import default_organisation_name
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedRepresentationMixin:
+    """Count ``to_representation`` towards the request's serialization time."""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     # userId = serializers.UUIDField(source='userId')
 
     class Meta:
@@ -22,23 +33,39 @@ class RegisterSerializer(serializers.ModelSerializer):
         extra_kwargs = {'password': {'write_only': True},
                         'firstName': {'error_messages': {'blank': 'must not be null.'}},
                         'lastName': {'error_messages': {'blank': 'must not be null.'}},
-                        'email': {'error_messages': {'blank': 'must be unique and must not be null.'}},
+                        'email': {'validators': [], 'error_messages': {'blank': 'must be unique and must not be null.'}},
                         'password': {'error_messages': {'blank': 'must not be null.'}},
                         }
 
+    def validate_email(self, value):
+        # The model field's own validator matches case-sensitively.
+        if User.objects.with_email(value).exists():
+            raise serializers.ValidationError('user with this email already exists.')
+        return value
 
     def create(self, validated_data):
-        user = User.objects.create(
+        return User.objects.create(
             firstName=validated_data['firstName'],
             lastName=validated_data['lastName'],
             email=validated_data['email'],
-            phone=validated_data['phone']
+            phone=validated_data.get('phone'),
+            password=make_password(validated_data['password'])
         )
-        user.set_password(validated_data['password'])
-        user.save()
-        return user
-        
-class OrganisationSerializer(serializers.ModelSerializer):
+
+
+class BulkRegisterItemSerializer(RegisterSerializer):
+    """Validates one item of a bulk registration; email uniqueness is checked for the whole batch."""
+
+    class Meta(RegisterSerializer.Meta):
+        extra_kwargs = {
+            **RegisterSerializer.Meta.extra_kwargs,
+            'email': {'validators': [], 'error_messages': {'blank': 'must be unique and must not be null.'}},
+        }
+
+    def validate_email(self, value):
+        return value
+
+class OrganisationSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Organisation
@@ -56,15 +83,69 @@ class CreateOrganisationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         try:
-            name = f"{validated_data['name'].title()}'s Organisation"
+            name = default_organisation_name(validated_data['name'])
             organisation = Organisation.objects.create(
                 name=name,
                 description=validated_data['description']
             )
-            organisation.save()
         except IntegrityError as e:
             raise serializers.ValidationError(str(e))
         
         return organisation
-    
-    
+
+
+def _fast_converter(field):
+    """Cheapest callable giving the same output as ``field.to_representation`` for database values."""
+
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, serializers.CharField):
+        # Text columns already come back from the database as str.
+        return None
+    return field.to_representation
+
+
+class ValuesReadSerializer:
+    """Read-only fast path for a ``ModelSerializer``.
+
+    Selects only the serializer's declared fields with ``values_list()`` and builds plain
+    dicts with per-field converters worked out once, instead of instantiating models and
+    walking field objects for every row. The rendered output matches the wrapped serializer.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def _compiled(self):
+        fields = [field for field in self.serializer_class().fields.values() if not field.write_only]
+        return (
+            tuple(field.field_name for field in fields),
+            tuple(field.source for field in fields),
+            tuple(_fast_converter(field) for field in fields),
+        )
+
+    @property
+    def fields(self):
+        return self._compiled[1]
+
+    def values(self, queryset):
+        return queryset.values_list(*self.fields)
+
+    def row(self, row):
+        names, _, converters = self._compiled
+        return {
+            name: value if convert is None or value is None else convert(value)
+            for name, convert, value in zip(names, converters, row)
+        }
+
+    def many(self, queryset):
+        row = self.row
+        rows = list(self.values(queryset))
+        with timed('serialize'):
+            return [row(values) for values in rows]
+
+
+user_reader = ValuesReadSerializer(UserSerializer)
+organisation_reader = ValuesReadSerializer(OrganisationSerializer)
+
@@ -0,0 +1,67 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .db.replicas import replica_routing
+from .response_cache import organisation_responses
+from .users.membership import bump_membership_version, membership_cache
+from .users.models import User, Organisation
+
+
+@receiver(m2m_changed, sender=User.organisations.through)
+def organisations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump the membership version and drop cached memberships of every user whose organisations changed."""
+
+    if action == 'pre_clear' and reverse:
+        # org.users.clear() only tells us which users were affected before the rows go.
+        instance._cleared_user_ids = list(instance.users.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_user_ids', []) if reverse else [instance.pk]
+    else:
+        user_ids = pk_set if reverse else ([instance.pk] if pk_set else [])
+    bump_membership_version(user_ids)
+    membership_cache.invalidate(user_ids)
+    # Their next listing must not come from a replica that hasn't caught up.
+    replica_routing.stick(user_ids)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        # A new user's first requests would 401 against a replica without their row.
+        replica_routing.stick([instance.pk])
+    elif (update_fields is None or 'is_active' in update_fields) and not instance.is_active:
+        # Membership-claim tokens skip the user lookup, and with it the is_active check;
+        # a new version sends them back to the database. QuerySet.update() sends no signal.
+        bump_membership_version([instance.pk])
+
+
+def _member_ids(organisation):
+    return list(organisation.users.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Organisation)
+def organisation_saved(sender, instance, created, **kwargs):
+    """Members see organisation details in their listings, so an edit counts as a membership change."""
+
+    organisation_responses.invalidate([instance.pk])
+    if not created:
+        bump_membership_version(_member_ids(instance))
+
+
+@receiver(pre_delete, sender=Organisation)
+def organisation_deleting(sender, instance, **kwargs):
+    # Deleting cascades the membership rows without firing m2m_changed.
+    instance._deleted_user_ids = _member_ids(instance)
+
+
+@receiver(post_delete, sender=Organisation)
+def organisation_deleted(sender, instance, **kwargs):
+    organisation_responses.invalidate([instance.pk])
+    user_ids = getattr(instance, '_deleted_user_ids', [])
+    bump_membership_version(user_ids)
+    membership_cache.invalidate(user_ids)
+    replica_routing.stick(user_ids)
@@ -0,0 +1,80 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from task.users.membership import membership_cache, membership_version
+from task.users.models import Organisation
+import uuid
+
+User = get_user_model()
+
+
+class AddUsersBatchTests(APITestCase):
+    def setUp(self):
+        membership_cache.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+        self.url = reverse('add_user', kwargs={'orgId': self.organisation.orgId})
+
+    def make_users(self, count):
+        return User.objects.bulk_create(
+            User(email=f'member{n}@example.com', firstName='Member', lastName=str(n), password='!')
+            for n in range(count))
+
+    def test_adds_all_users(self):
+        users = self.make_users(3)
+        response = self.client.post(self.url, {'userIds': [str(u.userId) for u in users]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['added'], 3)
+        self.assertEqual(set(self.organisation.users.all()), {self.user, *users})
+
+    def test_reports_per_id(self):
+        new_user, member = self.make_users(2)
+        member.organisations.add(self.organisation)
+        missing = str(uuid.uuid4())
+        user_ids = [str(new_user.userId), str(member.userId), missing, 'not-a-uuid', str(new_user.userId)]
+
+        response = self.client.post(self.url, {'userIds': user_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['data']['results'], [
+            {'userId': str(new_user.userId), 'status': 'added'},
+            {'userId': str(member.userId), 'status': 'already_member'},
+            {'userId': missing, 'status': 'not_found'},
+            {'userId': 'not-a-uuid', 'status': 'invalid'},
+        ])
+        self.assertEqual(response.data['data']['failed'], 2)
+
+    def test_nothing_added(self):
+        response = self.client.post(self.url, {'userIds': [str(uuid.uuid4())]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        users = self.make_users(200)
+        # Organisation, users IN (with membership), then savepoint, INSERT, version UPDATE, release.
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, {'userIds': [str(u.userId) for u in users]}, format='json')
+        self.assertEqual(response.data['data']['added'], 200)
+
+    def test_bumps_versions_and_invalidates_cache(self):
+        other, = self.make_users(1)
+        self.assertEqual(membership_cache.get(other.pk), frozenset())
+        version = membership_version(other.pk)
+
+        self.client.post(self.url, {'userIds': [str(other.userId)]}, format='json')
+
+        self.assertEqual(membership_cache.get(other.pk), {self.organisation.pk})
+        self.assertEqual(membership_version(other.pk), version + 1)
+
+    @override_settings(ADD_USERS_MAX_ITEMS=2)
+    def test_rejects_oversized_and_malformed_batches(self):
+        for user_ids in ([str(uuid.uuid4()) for _ in range(3)], [], 'abc'):
+            response = self.client.post(self.url, {'userIds': user_ids}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
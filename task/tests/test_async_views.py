@@ -0,0 +1,81 @@
+from django.test import override_settings
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from task.users.models import Organisation
+
+User = get_user_model()
+
+# The routing task2/urls.py uses under ASGI.
+urlpatterns = [
+    path('', include('task.async_urls')),
+    path('', include('task.urls')),
+]
+
+
+class AsyncReadViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.other_user = User.objects.create_user(
+            email='otheruser@example.com', password='testpassword123', firstName='Other', lastName='User')
+        self.third_user = User.objects.create_user(
+            email='thirduser@example.com', password='testpassword123', firstName='Third', lastName='User')
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+        self.other_user.organisations.add(self.organisation)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def get_both(self, url, **extra):
+        sync_response = self.client.get(url, **extra)
+        with override_settings(ROOT_URLCONF=__name__):
+            async_response = self.client.get(url, **extra)
+        return sync_response, async_response
+
+    def assertSameResponse(self, url, **extra):
+        sync_response, async_response = self.get_both(url, **extra)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        return async_response
+
+    def test_user_record(self):
+        response = self.assertSameResponse(reverse('get_user_record', kwargs={'id': self.other_user.userId}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.assertSameResponse(reverse('get_user_record', kwargs={'id': self.other_user.userId}),
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_user_record_forbidden(self):
+        response = self.assertSameResponse(reverse('get_user_record', kwargs={'id': self.third_user.userId}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_organisations(self):
+        response = self.assertSameResponse(reverse('get_or_create_organisations'))
+        self.assertEqual(len(response.json()['data']['organisations']), 1)
+        self.assertSameResponse(reverse('get_organisation', kwargs={'orgId': self.organisation.orgId}))
+
+    def test_unauthenticated(self):
+        self.client.credentials()
+        response = self.assertSameResponse(reverse('get_or_create_organisations'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer nonsense')
+        response = self.assertSameResponse(reverse('get_or_create_organisations'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_create_falls_through_to_sync_view(self):
+        response = self.client.post(reverse('get_or_create_organisations'), {'name': 'new', 'description': ''}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.user.organisations.count(), 2)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsgiAuthRoutingTests(APITestCase):
+    def test_login_and_register_accept_form_bodies(self):
+        data = {'email': 'form@example.com', 'password': 'testpassword123', 'firstName': 'Form', 'lastName': 'User'}
+        self.assertEqual(self.client.post('/auth/register', data).status_code, status.HTTP_201_CREATED)
+        response = self.client.post('/auth/login', {'email': data['email'], 'password': data['password']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,81 @@
+import os
+import re
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from task.serializers import user_reader
+from task.signals import _member_ids
+from task.users.membership import annotate_co_membership
+from task.users.models import Organisation
+
+User = get_user_model()
+
+# Plans are checked over 10k memberships; set COMEMBERSHIP_EXPLAIN_ROWS=1000000 to check
+# them at production size (that seeding takes over a minute).
+MEMBERSHIP_ROWS = int(os.getenv('COMEMBERSHIP_EXPLAIN_ROWS', '10000'))
+ORGS_PER_USER = 10
+
+
+class CoMembershipQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = [User(email=f'user{n}@example.com', firstName='User', lastName=str(n), password='!')
+                 for n in range(MEMBERSHIP_ROWS // ORGS_PER_USER)]
+        User.objects.bulk_create(users, batch_size=5000)
+        organisations = [Organisation(name=f'Org {n}') for n in range(max(ORGS_PER_USER, len(users) // 10))]
+        Organisation.objects.bulk_create(organisations, batch_size=5000)
+
+        # Raw inserts: the ORM would take minutes for a million through rows.
+        table = User.organisations.through._meta.db_table
+        org_count = len(organisations)
+        rows = (
+            (user.pk.hex, organisations[(n + k * (org_count // ORGS_PER_USER)) % org_count].pk.hex)
+            for n, user in enumerate(users) for k in range(ORGS_PER_USER)
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {table} (user_id, organisation_id) VALUES (%s, %s)', rows)
+            cursor.execute('ANALYZE')
+
+        cls.requester, cls.target = users[0], users[1]
+        cls.stranger = User.objects.create(email='stranger@example.com', firstName='S', lastName='S', password='!')
+        shared = organisations[0]
+        User.organisations.through.objects.bulk_create([
+            User.organisations.through(user_id=cls.requester.pk, organisation_id=shared.pk),
+            User.organisations.through(user_id=cls.target.pk, organisation_id=shared.pk),
+        ], ignore_conflicts=True)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            target = annotate_co_membership(User.objects.all(), self.requester).get(pk=self.target.pk)
+        self.assertTrue(target.shares_organisation)
+        stranger = annotate_co_membership(User.objects.all(), self.requester).get(pk=self.stranger.pk)
+        self.assertFalse(stranger.shares_organisation)
+
+    def assertNoFullScan(self, plan):
+        # sqlite reports "SCAN <table>", postgres "Seq Scan on <table>"
+        self.assertIsNone(re.search(r'(^|\s)SCAN\s|Seq Scan', plan), plan)
+
+    def user_record_plan(self, user):
+        # The query get_user_record runs.
+        return annotate_co_membership(
+            User.objects.only(*user_reader.fields, 'updatedAt'), user).filter(pk=self.target.pk).explain()
+
+    def test_explain_user_record_is_index_only(self):
+        claims_user = SimpleNamespace(pk=self.requester.pk, organisation_ids=frozenset(
+            self.requester.organisations.values_list('pk', flat=True)))
+        for user in (self.requester, claims_user):
+            self.assertNoFullScan(self.user_record_plan(user))
+        # Without claims every probe is equality on user_id (and organisation_id), which the
+        # unique (user_id, organisation_id) index answers; the reverse index does not serve it.
+        self.assertNotIn('task_user_organisations_org_user_idx', self.user_record_plan(self.requester))
+
+    def test_explain_member_lookup_uses_reverse_index(self):
+        # Organisation saves and deletes list the members (task.signals); that is what the
+        # covering (organisation_id, user_id) index is for.
+        organisation = self.requester.organisations.first()
+        plan = organisation.users.values_list('pk', flat=True).explain()
+        self.assertIn('task_user_organisations_org_user_idx', plan)
+        self.assertNoFullScan(plan)
+        self.assertIn(self.requester.pk, _member_ids(organisation))
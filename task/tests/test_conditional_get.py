@@ -0,0 +1,75 @@
+from django.db.models import F
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.other_user = User.objects.create_user(
+            email='otheruser@example.com', password='testpassword123', firstName='Other', lastName='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+
+    def assertRevalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def test_user_record(self):
+        url = reverse('get_user_record', kwargs={'id': self.user.userId})
+        etag = self.assertRevalidates(url)
+        self.user.phone = '555'
+        self.user.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_forbidden_user_record_is_not_revalidated(self):
+        url = reverse('get_user_record', kwargs={'id': self.other_user.userId})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_organisation(self):
+        url = reverse('get_organisation', kwargs={'orgId': self.organisation.orgId})
+        etag = self.assertRevalidates(url)
+        self.organisation.name = 'Renamed'
+        self.organisation.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_organisation_list(self):
+        url = reverse('get_or_create_organisations')
+        etag = self.assertRevalidates(url)
+
+        self.organisation.description = 'changed'
+        self.organisation.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        self.client.post(url, {'name': 'second', 'description': ''}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['organisations']), 2)
+
+    def test_organisation_list_after_a_change_in_another_process(self):
+        url = reverse('get_or_create_organisations')
+        etag = self.assertRevalidates(url)
+
+        # Another worker adds a membership: this process's caches never hear of it.
+        second = Organisation.objects.create(name='Second')
+        User.organisations.through.objects.create(user=self.user, organisation=second)
+        User.objects.filter(pk=self.user.pk).update(membershipVersion=F('membershipVersion') + 1)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['organisations']), 2)
@@ -0,0 +1,97 @@
+import tempfile
+import threading
+from pathlib import Path
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from task.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def cursor(self):
+        if not self.healthy:
+            raise RuntimeError("server closed the connection")
+        return self
+
+    def execute(self, sql):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    return ConnectionPool(**{'min_size': 0, 'max_size': 2, 'timeout': 0.05, 'max_lifetime': 0, 'health_check': True, **options})
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_connections(self):
+        pool = make_pool()
+        conn = pool.checkout(FakeConnection)
+        pool.checkin(conn)
+        self.assertIs(pool.checkout(FakeConnection), conn)
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_max_size_and_timeout(self):
+        pool = make_pool()
+        first, second = pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+        threading.Timer(0.01, pool.checkin, [first]).start()
+        self.assertIs(pool.checkout(FakeConnection), first)
+        pool.checkin(second)
+
+    def test_health_check_discards_broken_connections(self):
+        pool = make_pool()
+        conn = pool.checkout(FakeConnection)
+        pool.checkin(conn)
+        conn.healthy = False
+        replacement = pool.checkout(FakeConnection)
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_max_lifetime_recycles(self):
+        pool = make_pool(max_lifetime=0.01)
+        conn = pool.checkout(FakeConnection)
+        threading.Event().wait(0.02)
+        pool.checkin(conn)
+        self.assertIsNot(pool.checkout(FakeConnection), conn)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+    def test_min_size_prefills(self):
+        pool = make_pool(min_size=2)
+        pool.checkout(FakeConnection)
+        self.assertEqual(pool.stats()['size'], 2)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def test_sqlite_backend_returns_connections_to_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            handler = ConnectionHandler({'default': {
+                'ENGINE': 'task.db.backends.sqlite3',
+                'NAME': str(Path(tmp) / 'pool.sqlite3'),
+                'POOL': {'MIN_SIZE': 0, 'MAX_SIZE': 1},
+            }})
+            wrapper = handler['default']
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            raw = wrapper.connection
+            wrapper.close()
+
+            pool = get_pool(wrapper)
+            self.assertEqual(pool.stats()['idle'], 1)
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            self.assertIs(wrapper.connection, raw)
+            wrapper.close()
+            pool.close_all()
@@ -0,0 +1,54 @@
+from django.contrib.auth import authenticate, get_user_model
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class EmailIdentityTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='Jane.Doe@Example.com', password='testpassword123', firstName='Jane', lastName='Doe')
+
+    def test_login_ignores_case(self):
+        for name in ('login', 'async_login'):
+            response = self.client.post(reverse(name), {'email': 'jane.doe@EXAMPLE.COM', 'password': 'testpassword123'},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['data']['user']['userId'], str(self.user.pk))
+
+    def test_model_backend_ignores_case(self):
+        self.assertEqual(authenticate(email='JANE.DOE@example.com', password='testpassword123'), self.user)
+
+    def test_register_rejects_case_variant(self):
+        data = {'email': 'jane.doe@example.com', 'password': 'testpassword123', 'firstName': 'Jane', 'lastName': 'Doe'}
+        for name in ('register', 'async_register'):
+            response = self.client.post(reverse(name), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+            self.assertEqual(response.json()['errors'][0],
+                             {'field': 'email', 'message': 'user with this email already exists.'})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_register_bulk_rejects_case_variants(self):
+        def registration(email):
+            return {'email': email, 'password': 'bulkpassword123', 'firstName': 'Bulk', 'lastName': 'User'}
+
+        payload = [registration('JANE.DOE@example.com'), registration('New@example.com'), registration('new@EXAMPLE.com')]
+        self.client.force_authenticate(user=User.objects.create_superuser(
+            email='admin@example.com', password='adminpassword123', firstName='Admin', lastName='User'))
+        response = self.client.post(reverse('register_bulk'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in response.data['data']['results']], ['error', 'success', 'error'])
+
+    def test_database_rejects_case_variant(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(email='jane.doe@example.com', firstName='Jane', lastName='Doe')
+
+    def test_explain_lookup_uses_index(self):
+        for queryset in (User.objects.with_email('jane.doe@example.com'),
+                         User.objects.with_email('jane.doe@example.com', 'new@example.com')):
+            plan = queryset.explain()
+            self.assertIn('user_email_ci_unique', plan)
+            self.assertNotIn('SCAN', plan)
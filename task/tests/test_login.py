@@ -0,0 +1,86 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.signals import user_login_failed
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from task.throttling import login_throttle
+from task.users import hashing
+
+User = get_user_model()
+
+
+class LoginTests(APITestCase):
+    def setUp(self):
+        login_throttle.clear()
+        self.addCleanup(login_throttle.clear)
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+
+    def test_login(self):
+        for name in ('login', 'async_login'):
+            response = self.client.post(reverse(name), {'email': 'user@example.com', 'password': 'testpassword123'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('accessToken', response.json()['data'])
+
+    def test_login_wrong_password(self):
+        for name in ('login', 'async_login'):
+            response = self.client.post(reverse(name), {'email': 'user@example.com', 'password': 'wrong'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_unknown_email(self):
+        for name in ('login', 'async_login'):
+            response = self.client.post(reverse(name), {'email': 'nobody@example.com', 'password': 'wrong'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_upgrades_outdated_hash(self):
+        for name in ('login', 'async_login'):
+            self.user.password = PBKDF2PasswordHasher().encode('testpassword123', 'oldsalt', iterations=1000)
+            self.user.save(update_fields=['password'])
+            response = self.client.post(reverse(name), {'email': 'user@example.com', 'password': 'testpassword123'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertEqual(self.user.password.split('$')[1], str(PBKDF2PasswordHasher.iterations))
+            self.assertTrue(self.user.check_password('testpassword123'))
+
+    def test_failed_login_sends_signal(self):
+        failures = []
+
+        def receiver(sender, credentials, request, **kwargs):
+            failures.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        for name in ('login', 'async_login'):
+            for email in ('user@example.com', 'nobody@example.com'):
+                self.client.post(reverse(name), {'email': email, 'password': 'wrong'}, format='json')
+        self.assertEqual([credentials['email'] for credentials in failures], ['user@example.com', 'nobody@example.com'] * 2)
+        self.assertNotIn('wrong', {credentials['password'] for credentials in failures})
+
+    @override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend',
+                                                'django.contrib.auth.backends.RemoteUserBackend'])
+    def test_login_uses_configured_backends(self):
+        with mock.patch('django.contrib.auth.backends.RemoteUserBackend.authenticate', return_value=None) as backend:
+            for name in ('login', 'async_login'):
+                response = self.client.post(reverse(name), {'email': 'user@example.com', 'password': 'wrong'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(backend.call_count, 2)
+
+    def test_async_register(self):
+        data = {'email': 'async@example.com', 'password': 'asyncpassword123', 'firstName': 'Async', 'lastName': 'User'}
+        response = self.client.post(reverse('async_register'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(User.objects.get(email='async@example.com').organisations.exists())
+
+    def test_overloaded_hashing_is_shed(self):
+        full = (hashing._get_executor()[0], threading.BoundedSemaphore(1))
+        full[1].acquire()
+        with mock.patch.object(hashing, '_get_executor', return_value=full):
+            for name in ('login', 'async_login'):
+                response = self.client.post(reverse(name), {'email': 'user@example.com', 'password': 'testpassword123'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+                self.assertEqual(response['Retry-After'], '1')
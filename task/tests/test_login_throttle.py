@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from task import async_views, views
+from task.throttling import LocalBackend, login_throttle
+
+User = get_user_model()
+
+LIMITS = dict(LOGIN_THROTTLE=True, LOGIN_THROTTLE_WINDOW=60, LOGIN_THROTTLE_EMAIL_LIMIT=3,
+              LOGIN_THROTTLE_IP_LIMIT=5, LOGIN_THROTTLE_CACHE_ALIAS=None)
+
+
+@override_settings(**LIMITS)
+class LoginThrottleTests(SimpleTestCase):
+    def setUp(self):
+        login_throttle.clear()
+        self.addCleanup(login_throttle.clear)
+
+    def test_email_limit(self):
+        for _ in range(3):
+            self.assertIsNone(login_throttle.check('victim@example.com', '10.0.0.1', now=0))
+        # Case and whitespace do not make a new key.
+        self.assertEqual(login_throttle.check(' Victim@Example.com', '10.0.0.2', now=1), 59)
+        self.assertIsNone(login_throttle.check('other@example.com', '10.0.0.1', now=1))
+
+    def test_ip_limit(self):
+        for n in range(5):
+            self.assertIsNone(login_throttle.check(f'user{n}@example.com', '10.0.0.1', now=0))
+        self.assertIsNotNone(login_throttle.check('user9@example.com', '10.0.0.1', now=0))
+        self.assertIsNone(login_throttle.check('user9@example.com', '10.0.0.2', now=0))
+
+    def test_rejected_attempts_do_not_count(self):
+        for n in range(3):
+            login_throttle.check('victim@example.com', f'10.0.0.{n}', now=0)
+        for _ in range(10):
+            self.assertIsNotNone(login_throttle.check('victim@example.com', '10.0.1.1', now=0))
+        # The IP was given its attempts back, so it still has all five.
+        for n in range(5):
+            self.assertIsNone(login_throttle.check(f'user{n}@example.com', '10.0.1.1', now=0))
+
+    def test_window_slides(self):
+        for _ in range(3):
+            login_throttle.check('victim@example.com', None, now=59)
+        # Half a window later, three previous attempts weigh 1.5.
+        self.assertIsNone(login_throttle.check('victim@example.com', None, now=90))
+        self.assertIsNotNone(login_throttle.check('victim@example.com', None, now=90))
+        # Two windows later, nothing is left.
+        for _ in range(3):
+            self.assertIsNone(login_throttle.check('victim@example.com', None, now=180))
+
+    @override_settings(LOGIN_THROTTLE=False)
+    def test_disabled(self):
+        for _ in range(10):
+            self.assertIsNone(login_throttle.check('victim@example.com', '10.0.0.1', now=0))
+
+    def test_local_backend_is_bounded(self):
+        backend = LocalBackend(max_keys=100)
+        for n in range(1000):
+            backend.hit(f'ip:{n}', 5, 60, 0)
+        self.assertEqual(len(backend), 100)
+        self.assertEqual(backend.evictions, 900)
+
+    @override_settings(LOGIN_THROTTLE_CACHE_ALIAS='throttle', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+    })
+    def test_cache_backend(self):
+        login_throttle.clear()
+        self.addCleanup(caches['throttle'].clear)
+        self.assertTrue(login_throttle.backend.shared)
+        for _ in range(3):
+            self.assertIsNone(login_throttle.check('victim@example.com', '10.0.0.1', now=0))
+        self.assertEqual(login_throttle.check('victim@example.com', '10.0.0.1', now=30), 30)
+        self.assertIsNone(login_throttle.check('victim@example.com', '10.0.0.1', now=150))
+        self.assertEqual(login_throttle.stats()['rejected'], 1)
+
+
+@override_settings(**LIMITS)
+class LoginThrottleViewTests(APITestCase):
+    def setUp(self):
+        login_throttle.clear()
+        self.addCleanup(login_throttle.clear)
+        User.objects.create_user(email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+
+    def test_rejects_before_authenticating(self):
+        for name, module in (('login', views), ('async_login', async_views)):
+            login_throttle.clear()
+            data = {'email': 'user@example.com', 'password': 'wrong'}
+            for _ in range(3):
+                self.assertEqual(self.client.post(reverse(name), data, format='json').status_code,
+                                 status.HTTP_401_UNAUTHORIZED)
+
+            authenticate = 'authenticate_user' if module is views else 'aauthenticate_user'
+            with mock.patch.object(module, authenticate) as authenticate:
+                response = self.client.post(reverse(name), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response.json()['statusCode'], 429)
+            self.assertGreaterEqual(int(response['Retry-After']), 1)
+            authenticate.assert_not_called()
@@ -0,0 +1,89 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from task.users.membership import membership_cache, membership_version
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class MembershipCacheTests(APITestCase):
+    def setUp(self):
+        membership_cache.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.other_user = User.objects.create_user(
+            email='otheruser@example.com', password='testpassword123', firstName='Other', lastName='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+
+    def test_hits_and_misses(self):
+        before = membership_cache.stats()
+        self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk})
+        with self.assertNumQueries(0):
+            self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk})
+        after = membership_cache.stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_add_user_invalidates(self):
+        url = reverse('get_user_record', kwargs={'id': self.other_user.userId})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.post(reverse('add_user', kwargs={'orgId': self.organisation.orgId}),
+                                    {'userId': str(self.other_user.userId)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_create_organisation_invalidates(self):
+        url = reverse('get_or_create_organisations')
+        self.assertEqual(len(self.client.get(url).data['data']['organisations']), 1)
+        self.client.post(url, {'name': 'second', 'description': ''}, format='json')
+        self.assertEqual(len(self.client.get(url).data['data']['organisations']), 2)
+
+    @override_settings(MEMBERSHIP_CACHE_MAX_ENTRIES=1)
+    def test_lru_is_bounded(self):
+        membership_cache.get(self.user.pk)
+        membership_cache.get(self.other_user.pk)
+        self.assertEqual(membership_cache.stats()['size'], 1)
+        with self.assertNumQueries(1):
+            membership_cache.get(self.user.pk)
+
+    def test_local_entries_expire(self):
+        membership_cache.get(self.user.pk)
+        # Another process adds the membership; this one never hears of it.
+        new_org = Organisation.objects.create(name='New Organisation')
+        User.organisations.through.objects.create(user=self.user, organisation=new_org)
+        self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk})
+        with mock.patch('task.users.membership.time.monotonic', return_value=time.monotonic() + 6):
+            self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk, new_org.pk})
+
+    @override_settings(MEMBERSHIP_CACHE_ALIAS='default')
+    def test_invalidated_again_on_commit(self):
+        self.addCleanup(cache.clear)
+        new_org = Organisation.objects.create(name='New Organisation')
+        old_version = membership_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.organisations.add(new_org)
+            # A concurrent request that read before the commit caches what it saw.
+            membership_cache._remember(self.user.pk, frozenset({self.organisation.pk}))
+            cache.set(f'memberships:{self.user.pk}', frozenset({self.organisation.pk}))
+            cache.set(f'membership-version:{self.user.pk}', old_version)
+        self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk, new_org.pk})
+        self.assertEqual(membership_version(self.user.pk), old_version + 1)
+
+    @override_settings(MEMBERSHIP_CACHE_MAX_ENTRIES=0, MEMBERSHIP_CACHE_ALIAS='default')
+    def test_shared_backend(self):
+        membership_cache.get(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(membership_cache.get(self.user.pk), {self.organisation.pk})
+        self.user.organisations.remove(self.organisation)
+        self.assertEqual(membership_cache.get(self.user.pk), frozenset())
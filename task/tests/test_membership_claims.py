@@ -0,0 +1,89 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from task.users.membership import bump_membership_version
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+@override_settings(JWT_MEMBERSHIP_CLAIMS=True)
+class MembershipClaimsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.other_user = User.objects.create_user(
+            email='otheruser@example.com', password='testpassword123', firstName='Other', lastName='User')
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+        self.other_user.organisations.add(self.organisation)
+
+        response = self.client.post(reverse('login'), {'email': 'user@example.com', 'password': 'testpassword123'}, format='json')
+        self.token = response.data['data']['accessToken']
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_token_carries_memberships(self):
+        token = AccessToken(self.token)
+        self.assertEqual(token['orgs'], [self.organisation.orgId.hex])
+        self.assertEqual(token['mv'], User.objects.get(pk=self.user.pk).membershipVersion)
+
+    def test_permission_check_skips_user_lookup(self):
+        url = reverse('get_user_record', kwargs={'id': self.other_user.userId})
+        self.client.get(url)  # warm the membership version and membership caches
+        # only the target user; the requesting user is never loaded
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stale_memberships_fall_back_to_database(self):
+        url = reverse('get_user_record', kwargs={'id': self.user.userId})
+        self.client.get(url)
+        new_org = Organisation.objects.create(name='New Organisation')
+        self.user.organisations.add(new_org)
+
+        with self.assertNumQueries(3):  # version reload, user lookup, target user
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('get_or_create_organisations'))
+        self.assertEqual(len(response.data['data']['organisations']), 2)
+
+    def test_deactivated_user_is_rejected(self):
+        url = reverse('get_or_create_organisations')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class MembershipVersionSaveTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+
+    def test_saving_a_loaded_user_keeps_a_later_bump(self):
+        stale = User.objects.get(pk=self.user.pk)
+        bump_membership_version([self.user.pk])
+        stale.firstName = 'Renamed'
+        stale.save()
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.firstName, self.user.membershipVersion), ('Renamed', 1))
+
+    def test_save_semantics_are_unchanged(self):
+        partial = User.objects.only('firstName').get(pk=self.user.pk)
+        partial.firstName = 'Partial'
+        with self.assertNumQueries(1):
+            partial.save()
+
+        loaded = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=self.user.pk).delete()
+        loaded.save()
+        self.assertTrue(User.objects.filter(pk=self.user.pk, firstName='Partial').exists())
+
+        new = User(email='new@example.com', firstName='New', lastName='User')
+        new.save(force_insert=True)
+        self.assertTrue(User.objects.filter(pk=new.pk).exists())
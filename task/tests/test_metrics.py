@@ -0,0 +1,98 @@
+import re
+
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from task.metrics import registry
+from task.users.models import Organisation
+
+User = get_user_model()
+
+# The routing task2/urls.py uses under ASGI.
+urlpatterns = [
+    path('', include('task.async_urls')),
+    path('', include('task.urls')),
+]
+
+
+def timing(response, name):
+    match = re.search(rf'(?:^|, ){name};dur=([\d.]+)(?:;desc="(\d+) queries")?', response.headers['Server-Timing'])
+    return match and (float(match.group(1)), match.group(2))
+
+
+@override_settings(SERVER_TIMING=True)
+class MetricsTests(APITestCase):
+    def setUp(self):
+        registry.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.organisation = Organisation.objects.create(name='Test Organisation', description='Test description')
+        self.user.organisations.add(self.organisation)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_server_timing_breaks_down_login(self):
+        response = self.client.post(reverse('login'), {'email': 'user@example.com', 'password': 'testpassword123'},
+                                    format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for name in ('db', 'serialize', 'hash', 'total'):
+            self.assertIsNotNone(timing(response, name), name)
+        self.assertGreater(timing(response, 'total')[0], timing(response, 'hash')[0])
+
+    def test_counts_queries_per_request(self):
+        url = reverse('get_user_record', kwargs={'id': self.user.userId})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(timing(response, 'db')[1], str(len(queries)))
+        cumulative, _, count = registry.snapshot()['task_db_queries']['get_user_record']
+        self.assertEqual(count, 1)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_async_views_are_instrumented(self):
+        response = await AsyncClient().get(
+            '/api/organisations', headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(timing(response, 'db')[1], '0')
+        self.assertIn('get_or_create_organisations', registry.snapshot()['task_request_duration_seconds'])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        response = self.client.get(reverse('get_or_create_organisations'))
+
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertIn('get_or_create_organisations', registry.snapshot()['task_request_duration_seconds'])
+
+
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        registry.clear()
+
+    def test_disabled_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_requires_token(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_prometheus_text(self):
+        self.client.post(reverse('login'), {'email': 'nobody@example.com', 'password': 'x'}, format='json')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE task_request_duration_seconds histogram', body)
+        self.assertIn('task_request_duration_seconds_bucket{view="login",le="+Inf"} 1', body)
+        self.assertIn('task_hash_duration_seconds_count{view="login"} 1', body)
+        self.assertIn('task_membership_cache_hit_ratio ', body)
@@ -0,0 +1,49 @@
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+# The routing task2/urls.py uses under ASGI.
+urlpatterns = [
+    path('', include('task.async_urls')),
+    path('', include('task.urls')),
+]
+
+
+class ApiMiddlewareScopeTests(APITestCase):
+    def setUp(self):
+        User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+
+    def test_api_requests_skip_browser_middleware(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post('/auth/login', {'email': 'user@example.com', 'password': 'testpassword123'},
+                               content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Frame-Options', response.headers)
+        self.assertNotIn('Cookie', response.headers.get('Vary', ''))
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+
+    def test_admin_keeps_browser_middleware(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+
+        response = client.post('/admin/login/', {'username': 'user@example.com', 'password': 'testpassword123'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_async_api_requests_skip_browser_middleware(self):
+        response = await AsyncClient().get('/api/organisations')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertNotIn('X-Frame-Options', response.headers)
+        self.assertFalse(hasattr(response.asgi_request, 'session'))
@@ -0,0 +1,178 @@
+import tempfile
+import threading
+import time
+import uuid
+from unittest import mock
+
+from django.conf import settings
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from task.metrics import render_prometheus
+from task.response_cache import OrganisationResponseCache, organisation_responses
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class OrganisationResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.client.force_authenticate(user=self.user)
+        self.organisation = Organisation.objects.create(name='Acme', description='Anvils')
+        self.url = reverse('get_organisation', args=[self.organisation.pk])
+
+    def test_hit_serves_the_same_bytes_without_queries(self):
+        with override_settings(ORGANISATION_RESPONSE_CACHE=False):
+            uncached = self.client.get(self.url)
+        first = self.client.get(self.url)
+        before = organisation_responses.stats()
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, uncached.content)
+        self.assertEqual(second.content, uncached.content)
+        self.assertEqual(second['ETag'], uncached['ETag'])
+        self.assertEqual(second.json()['data']['name'], 'Acme')
+        self.assertEqual(organisation_responses.stats()['hits'] - before['hits'], 1)
+
+    def test_conditional_get_from_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_save_and_delete_invalidate(self):
+        etag = self.client.get(self.url)['ETag']
+        self.organisation.name = 'Acme Renamed'
+        self.organisation.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['data']['name'], 'Acme Renamed')
+        self.assertNotEqual(response['ETag'], etag)
+
+        self.organisation.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_view_shares_the_cache(self):
+        sync_body = self.client.get(self.url).content
+        self.client.force_authenticate(user=None)
+        token = self.client.post(reverse('login'), {'email': 'user@example.com', 'password': 'testpassword123'},
+                                 format='json').json()['data']['accessToken']
+        with override_settings(ROOT_URLCONF='task.async_urls'):
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, sync_body)
+
+    def test_local_backend_entries_are_fresh_briefly(self):
+        self.client.get(self.url)
+        # Another worker renames it; this process's cache never hears of it.
+        Organisation.objects.filter(pk=self.organisation.pk).update(name='Renamed Elsewhere')
+        self.assertEqual(self.client.get(self.url).json()['data']['name'], 'Acme')
+        with mock.patch('task.response_cache.time.time', return_value=time.time() + 6):
+            self.assertEqual(self.client.get(self.url).json()['data']['name'], 'Renamed Elsewhere')
+
+    def test_shared_backend_keeps_the_full_timeout(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(
+                CACHES={**settings.CACHES, 'shared': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}},
+                ORGANISATION_RESPONSE_CACHE_ALIAS='shared'):
+            self.assertEqual(organisation_responses.fresh_seconds(), settings.ORGANISATION_RESPONSE_CACHE_TIMEOUT)
+        self.assertEqual(organisation_responses.fresh_seconds(), settings.ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT)
+
+    def test_hit_ratio_is_exported(self):
+        self.client.get(self.url)
+        self.assertIn('task_organisation_response_cache_hit_ratio', render_prometheus())
+
+
+@override_settings(ORGANISATION_RESPONSE_CACHE_TIMEOUT=300, ORGANISATION_RESPONSE_CACHE_GRACE=60)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.renders = 0
+        self.delay = 0
+        self.responses = OrganisationResponseCache(render=self.render)
+        self.org_id = uuid.uuid4()
+
+    def render(self, org_id):
+        self.renders += 1
+        time.sleep(self.delay)
+        return 'etag', f'body {self.renders}'.encode()
+
+    def concurrently(self, count):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def get():
+            barrier.wait()
+            results.append(self.responses.get(self.org_id))
+
+        threads = [threading.Thread(target=get) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_missing_entry_is_built_once(self):
+        self.delay = 0.1
+        results = self.concurrently(8)
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(set(results), {('etag', b'body 1')})
+        stats = self.responses.stats()
+        self.assertEqual((stats['misses'], stats['coalesced'], stats['rebuilds']), (8, 7, 1))
+
+    def test_stale_entry_is_refreshed_once_while_others_get_the_stale_copy(self):
+        with override_settings(ORGANISATION_RESPONSE_CACHE_TIMEOUT=0):
+            self.responses.get(self.org_id)
+        self.delay = 0.1
+        results = self.concurrently(6)
+        self.assertEqual(self.renders, 2)
+        self.assertEqual(results.count(('etag', b'body 2')), 1)
+        self.assertEqual(results.count(('etag', b'body 1')), 5)
+        self.assertEqual(self.responses.stats()['stale_hits'], 5)
+        self.assertEqual(self.responses.get(self.org_id), ('etag', b'body 2'))
+
+    def test_waits_for_another_process_building_the_entry(self):
+        key = self.responses._key(self.org_id)
+        cache.add(key + ':lock', 1)
+        # Stands in for the process holding the lock finishing its build.
+        threading.Timer(0.05, cache.set, (key, (time.time() + 300, 'etag', b'theirs'))).start()
+        self.assertEqual(self.responses.get(self.org_id), ('etag', b'theirs'))
+        self.assertEqual(self.renders, 0)
+
+    def test_failed_build_is_not_shared(self):
+        def fail(org_id):
+            self.renders += 1
+            time.sleep(0.05)
+            if self.renders == 1:
+                raise RuntimeError('database went away')
+            return 'etag', b'body'
+
+        self.responses.render = fail
+        barrier = threading.Barrier(2)
+        results, errors = [], []
+
+        def get():
+            barrier.wait()
+            try:
+                results.append(self.responses.get(self.org_id))
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=get) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(results, [('etag', b'body')])
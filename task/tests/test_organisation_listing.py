@@ -0,0 +1,61 @@
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory, force_authenticate
+from django.contrib.auth import get_user_model
+from task import views
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class OrganisationListingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.organisations = [Organisation.objects.create(name=f'Org {n}') for n in range(5)]
+        self.user.organisations.add(*self.organisations)
+        Organisation.objects.create(name='Not mine')
+        self.expected = sorted(str(org.orgId) for org in self.organisations)
+
+    def test_keyset_pages(self):
+        url = reverse('get_or_create_organisations')
+        seen, cursor = [], None
+        for _ in range(3):
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).data['data']
+            seen += [org['orgId'] for org in data['organisations']]
+            cursor = data['nextCursor']
+        self.assertIsNone(cursor)
+        self.assertEqual(seen, self.expected)
+
+    def test_stream(self):
+        response = self.client.get(reverse('get_or_create_organisations'), {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(body['status'], 'success')
+        self.assertEqual([org['orgId'] for org in body['data']['organisations']], self.expected)
+
+    def test_stream_empty(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='empty@example.com', password='testpassword123', firstName='Empty', lastName='User'))
+        response = self.client.get(reverse('get_or_create_organisations'), {'stream': '1'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['data']['organisations'], [])
+
+    def test_bad_cursor(self):
+        response = self.client.get(reverse('get_or_create_organisations'), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_all_organisations_branch(self):
+        request = APIRequestFactory().get('/api/organisations', {'limit': 4})
+        force_authenticate(request, user=self.user)
+        response = views.get_organisation(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['organisations']), 4)
+        self.assertIn('name', response.data['data']['organisations'][0])
+        self.assertIsNotNone(response.data['data']['nextCursor'])
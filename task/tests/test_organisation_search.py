@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from task.users.models import Organisation
+from task.users import search
+from task.users.search import search_queryset
+
+User = get_user_model()
+
+
+class OrganisationSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('search_organisations')
+        names = ["Alice's Organisation", "alpha Labs", "Alpine Club", "Bob's Organisation", "Zed Alpaca Farm"]
+        self.mine = [Organisation.objects.create(name=name, description='') for name in names]
+        self.user.organisations.add(*self.mine)
+        self.others = [Organisation.objects.create(name=name, description='') for name in ("Alps Corp", "Beta Org")]
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        return response, [org['name'] for org in response.data.get('data', {}).get('organisations', [])]
+
+    def test_prefix_is_case_insensitive_and_scoped(self):
+        response, names = self.search(q='ALP')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(names, ["alpha Labs", "Alpine Club"])
+        self.assertIsNone(response.data['data']['nextCursor'])
+
+    def test_substring(self):
+        _, names = self.search(q='alp', match='substring')
+        self.assertEqual(names, ["alpha Labs", "Alpine Club", "Zed Alpaca Farm"])
+        _, names = self.search(q="s organ", match='substring')
+        self.assertEqual(names, ["Alice's Organisation", "Bob's Organisation"])
+
+    def test_keyset_pagination(self):
+        # Same names break ties on orgId.
+        twins = [Organisation.objects.create(name="Alpine Club", description='') for _ in range(3)]
+        self.user.organisations.add(*twins)
+        expected = sorted([(org.name.lower(), str(org.pk)) for org in [*self.mine, *twins]
+                           if org.name.lower().startswith('al')])
+
+        seen, cursor = [], None
+        while True:
+            params = {'q': 'al', 'limit': 2, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(self.url, params)
+            page = response.data['data']['organisations']
+            self.assertLessEqual(len(page), 2)
+            seen += [(org['name'].lower(), org['orgId']) for org in page]
+            cursor = response.data['data']['nextCursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_all_scope_needs_permission(self):
+        response, _ = self.search(q='alp', scope='all')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(user=self.user)
+        response, names = self.search(q='alp', scope='all')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(names, ["alpha Labs", "Alpine Club", "Alps Corp"])
+
+    def test_bad_requests(self):
+        for params in ({}, {'q': ' '}, {'q': 'x' * 65}, {'q': 'al', 'match': 'fuzzy'},
+                       {'q': 'al', 'match': 'substring'}, {'q': 'al', 'scope': 'everyone'},
+                       {'q': 'al', 'cursor': 'nope'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_substring_index_follows_renames_and_deletes(self):
+        organisation = self.mine[0]
+        organisation.name = 'Renamed Widget'
+        organisation.save()
+        self.mine[1].delete()
+
+        _, names = self.search(q='widget', match='substring')
+        self.assertEqual(names, ['Renamed Widget'])
+        _, names = self.search(q="alice", match='substring')
+        self.assertEqual(names, [])
+        _, names = self.search(q="lab", match='substring')
+        self.assertEqual(names, [])
+
+    def test_explain_prefix_walks_index_in_order(self):
+        plan = search_queryset(Organisation.objects.all(), 'al', 'prefix')[:21].explain()
+        self.assertIn('organisation_search_name_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+        page = search_queryset(Organisation.objects.all(), 'al', 'prefix', cursor=self.mine[1].pk)
+        self.assertIn('organisation_search_name_idx', page[:21].explain())
+
+    def test_explain_substring_uses_trigram_index(self):
+        plan = search_queryset(Organisation.objects.all(), 'alp', 'substring')[:21].explain()
+        self.assertIn('task_organisation_trigram', plan)
+
+    def test_explain_common_substring_walks_index_in_order(self):
+        with mock.patch.object(search, 'COMMON_SUBSTRING_MATCHES', 2):
+            queryset = search_queryset(Organisation.objects.all(), 'org', 'substring')
+            plan = queryset[:21].explain()
+            names = list(queryset.values_list('name', flat=True))
+        self.assertNotIn('task_organisation_trigram', plan)
+        self.assertIn('organisation_search_name_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(names, sorted(
+            Organisation.objects.filter(name__icontains='org').values_list('name', flat=True), key=str.lower))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from task.serializers import UserSerializer, OrganisationSerializer, user_reader, organisation_reader
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class ValuesReadSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(email='user@example.com', password='testpassword123', firstName='Test', lastName='User', phone='123')
+        User.objects.create_user(email='nophone@example.com', password='testpassword123', firstName='No', lastName='Phone')
+        Organisation.objects.create(name="Test's Organisation", description='Ünïcode "quoted"')
+        Organisation.objects.create(name='No description', description=None)
+
+    def assertSameRendering(self, serializer_class, reader, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(reader.many(queryset)), expected)
+
+    def test_user_output_matches(self):
+        self.assertSameRendering(UserSerializer, user_reader, User.objects.order_by('email'))
+
+    def test_organisation_output_matches(self):
+        self.assertSameRendering(OrganisationSerializer, organisation_reader, Organisation.objects.order_by('name'))
+
+    def test_selects_declared_fields_only(self):
+        sql = str(user_reader.values(User.objects.all()).query)
+        self.assertNotIn('password', sql)
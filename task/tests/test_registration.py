@@ -0,0 +1,98 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from task.tokens import access_token_for
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+def registration(n, **overrides):
+    data = {
+        'email': f'bulk{n}@example.com',
+        'password': 'bulkpassword123',
+        'firstName': f'bulk{n}',
+        'lastName': 'user',
+        'phone': '1234567890'
+    }
+    data.update(overrides)
+    return data
+
+
+class BulkRegistrationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com', password='adminpassword123', firstName='Admin', lastName='User')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_register_bulk(self):
+        url = reverse('register_bulk')
+        response = self.client.post(url, [registration(n) for n in range(3)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], 3)
+
+        user = User.objects.get(email='bulk1@example.com')
+        self.assertTrue(user.check_password('bulkpassword123'))
+        self.assertEqual(list(user.organisations.values_list('name', flat=True)), ["Bulk1's Organisation"])
+        self.assertEqual(Organisation.objects.count(), 3)
+
+    def test_register_bulk_reports_per_item(self):
+        User.objects.create_user(email='taken@example.com', password='testpassword123', firstName='Taken', lastName='User')
+        url = reverse('register_bulk')
+        payload = [
+            registration(0),
+            registration(1, email='taken@example.com'),
+            registration(2, firstName=''),
+            registration(3, email='bulk0@example.com'),
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+        results = response.data['data']['results']
+        self.assertEqual([r['status'] for r in results], ['success', 'error', 'error', 'error'])
+        self.assertEqual(results[1]['errors'][0]['field'], 'email')
+        self.assertEqual(results[2]['errors'][0]['field'], 'firstName')
+        self.assertEqual(results[3]['errors'][0]['field'], 'email')
+        self.assertEqual(User.objects.filter(email='bulk0@example.com').count(), 1)
+
+    def test_register_bulk_rejects_non_list(self):
+        response = self.client.post(reverse('register_bulk'), registration(0), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_register_bulk_is_staff_only(self):
+        url = reverse('register_bulk')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.post(url, [registration(0)], format='json').status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+        member = User.objects.create_user(
+            email='member@example.com', password='testpassword123', firstName='Member', lastName='User')
+        self.client.force_authenticate(user=member)
+        self.assertEqual(self.client.post(url, [registration(0)], format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(email='bulk0@example.com').exists())
+
+    @override_settings(JWT_MEMBERSHIP_CLAIMS=True)
+    def test_register_bulk_accepts_staff_claims_token(self):
+        self.client.force_authenticate(user=None)
+        token = access_token_for(self.admin)
+        self.assertIn('orgs', AccessToken(token))
+        response = self.client.post(reverse('register_bulk'), [registration(0)], format='json',
+                                    HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class RegistrationQueryBudgetTests(APITestCase):
+    def test_register_query_budget(self):
+        # email uniqueness check, then user, organisation and membership INSERTs
+        # (the remaining two are the savepoint around them inside the test transaction)
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('register'), registration(0), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        user = User.objects.get(email='bulk0@example.com')
+        self.assertTrue(user.check_password('bulkpassword123'))
+        self.assertEqual(list(user.organisations.values_list('name', flat=True)), ["Bulk0's Organisation"])
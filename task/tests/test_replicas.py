@@ -0,0 +1,174 @@
+from io import StringIO
+from pathlib import Path
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from django.contrib.auth import get_user_model
+from task.db.replicas import LocalStickyUsers, ReplicaRouter, replica_routing
+from task.tokens import access_token_for
+from task.users.models import Organisation
+
+User = get_user_model()
+
+
+class ReplicaRoutingTests(APITransactionTestCase):
+    """A SQLite file stands in for the replica; it only catches up on ``sync_replicas``."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict, 'NAME': str(Path(tmp.name) / 'replica.sqlite3')}
+        self.addCleanup(self.drop_replica)
+        settings = self.settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=60)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        replica_routing.clear()
+        self.addCleanup(replica_routing.clear)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.owner = self.user('owner@example.com')
+        self.member = self.user('member@example.com')
+        self.shared = Organisation.objects.create(name='Shared', description='')
+        self.owner.organisations.add(self.shared)
+        self.sync()
+
+    def drop_replica(self):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+
+    def user(self, email):
+        return User.objects.create_user(email=email, password='testpassword123', firstName='Test', lastName='User')
+
+    def sync(self):
+        call_command('sync_replicas', stdout=StringIO())
+        # Writes made while setting up are not what these tests are about.
+        replica_routing.clear()
+
+    def token(self, user):
+        user.refresh_from_db()
+        return access_token_for(user)
+
+    def record_status(self, token, user):
+        # 200 once the reader's membership in Shared is visible, 403 before.
+        return self.client.get(reverse('get_user_record', args=[user.pk]),
+                               HTTP_AUTHORIZATION=f'Bearer {token}').status_code
+
+    def test_safe_requests_read_a_replica(self):
+        token = self.token(self.owner)
+        self.member.organisations.add(self.shared)
+        replica_routing.clear()
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            self.assertEqual(self.record_status(token, self.member), status.HTTP_403_FORBIDDEN)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+        with override_settings(ROOT_URLCONF='task.async_urls'):
+            self.assertEqual(self.record_status(token, self.member), status.HTTP_403_FORBIDDEN)
+
+    def test_listing_is_read_from_the_primary(self):
+        # Its ETag must not revalidate a listing the replica has not caught up with.
+        token = self.token(self.member)
+        self.member.organisations.add(self.shared)
+        replica_routing.clear()
+        response = self.client.get(reverse('get_or_create_organisations'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual([org['name'] for org in response.json()['data']['organisations']], ['Shared'])
+
+    def test_writes_go_to_the_primary_and_stick(self):
+        token = self.token(self.owner)
+        response = self.client.post(reverse('get_or_create_organisations'), {'name': 'New', 'description': ''},
+                                    HTTP_AUTHORIZATION=f'Bearer {token}', format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Organisation.objects.using('replica').filter(name="New's Organisation").count(), 0)
+        self.assertTrue(replica_routing.is_sticky(self.owner.pk))
+
+    def test_added_user_reads_their_membership(self):
+        token = self.token(self.member)
+        url = reverse('add_user', args=[self.shared.pk])
+        response = self.client.post(url, {'userId': str(self.member.pk)}, format='json',
+                                    HTTP_AUTHORIZATION=f'Bearer {self.token(self.owner)}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The replica has not caught up yet; both users read from the primary.
+        self.assertEqual(self.record_status(token, self.owner), status.HTTP_200_OK)
+        self.assertTrue(replica_routing.is_sticky(self.owner.pk))
+
+        # Once the window is over the member reads the stale replica again.
+        replica_routing.clear()
+        self.assertEqual(self.record_status(token, self.owner), status.HTTP_403_FORBIDDEN)
+
+    def test_batch_added_users_read_their_membership(self):
+        token = self.token(self.member)
+        response = self.client.post(reverse('add_user', args=[self.shared.pk]), {'userIds': [str(self.member.pk)]},
+                                    format='json', HTTP_AUTHORIZATION=f'Bearer {self.token(self.owner)}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(replica_routing.is_sticky(self.member.pk))
+        self.assertEqual(self.record_status(token, self.owner), status.HTTP_200_OK)
+
+    def test_bulk_registered_users_read_their_record(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password='testpassword123',
+                                              firstName='Admin', lastName='User')
+        self.sync()
+        data = [{'email': 'new@example.com', 'password': 'testpassword123', 'firstName': 'New', 'lastName': 'User'}]
+        response = self.client.post(reverse('register_bulk'), data, format='json',
+                                    HTTP_AUTHORIZATION=f'Bearer {self.token(admin)}')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(email='new@example.com')
+        self.assertFalse(User.objects.using('replica').filter(pk=user.pk).exists())
+
+        response = self.client.get(reverse('get_user_record', args=[user.pk]),
+                                   HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_registered_user_reads_their_record(self):
+        data = {'email': 'new@example.com', 'password': 'testpassword123', 'firstName': 'New', 'lastName': 'User'}
+        response = self.client.post(reverse('register'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = response.json()['data']['user']
+        response = self.client.get(reverse('get_user_record', args=[user['userId']]),
+                                   HTTP_AUTHORIZATION=f"Bearer {response.json()['data']['accessToken']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(User.objects.using('replica').filter(pk=user['userId']).exists())
+
+    def test_organisation_cache_is_rebuilt_from_the_primary(self):
+        token = self.token(self.member)
+        self.member.organisations.add(self.shared)
+        self.sync()
+        url = reverse('get_organisation', args=[self.shared.pk])
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}').json()['data']['name'], 'Shared')
+
+        self.shared.name = 'Renamed'
+        self.shared.save()
+        # The member is not sticky and the replica still has the old name; the rebuilt
+        # entry must not be.
+        self.assertFalse(replica_routing.is_sticky(self.member.pk))
+        for _ in range(2):
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response.json()['data']['name'], 'Renamed')
+        self.assertEqual(Organisation.objects.using('replica').get(pk=self.shared.pk).name, 'Shared')
+
+    def test_outside_requests_use_the_primary(self):
+        self.assertEqual(User.objects.all().db, 'default')
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(User, instance=User.objects.using('replica').first()), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'task'))
+
+    def test_sticky_users_expire(self):
+        sticky = LocalStickyUsers(max_users=2)
+        sticky.stick(['a'], seconds=60)
+        sticky.stick(['b'], seconds=0)
+        self.assertTrue(sticky.is_sticky('a'))
+        self.assertFalse(sticky.is_sticky('b'))
+        sticky.stick(['c', 'd'], seconds=60)
+        self.assertFalse(sticky.is_sticky('a'))
+        self.assertEqual(sticky.evictions, 1)
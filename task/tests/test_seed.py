@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from task.management.commands.seed import seeded_uuid
+from task.users.models import User, Organisation
+
+
+class SeedCommandTests(TestCase):
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed', processes=1, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_seeds_users_organisations_and_memberships(self):
+        output = self.seed(users=50, memberships='fixed', mean_memberships=2, chunk_size=20, batch_size=7)
+
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Organisation.objects.count(), 50)
+        self.assertEqual(User.organisations.through.objects.count(), 150)
+        self.assertIn('rows/s', output)
+
+        user = User.objects.get(email='seed7@example.com')
+        self.assertEqual(user.pk, seeded_uuid('seed', 'user', 7))
+        self.assertTrue(user.check_password('seed-password'))
+        self.assertIn(seeded_uuid('seed', 'org', 7), set(user.organisations.values_list('pk', flat=True)))
+
+    def test_password_is_hashed_once(self):
+        self.seed(users=10, memberships='none', password='shared')
+
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
+        self.assertEqual(User.organisations.through.objects.count(), 10)
+
+    def test_memberships_are_reproducible(self):
+        self.seed(users=40, tag='first', seed=3)
+        self.seed(users=40, tag='second', seed=3)
+
+        def joined(tag):
+            return sorted((user.firstName[len(tag):], count) for user, count in (
+                (user, user.organisations.count()) for user in User.objects.filter(email__startswith=tag)))
+
+        self.assertEqual(joined('first'), joined('second'))
+
+    def test_rejects_empty_dataset(self):
+        with self.assertRaises(CommandError):
+            self.seed(users=0)
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+# Boots the API-only profile in a fresh interpreter and serves one request through WSGI.
+CHILD = r"""
+import io, json, sys
+from task2.wsgi import application
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr,
+}
+statuses = []
+body = b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+print(json.dumps({
+    'status': statuses[0],
+    'body': body.decode(),
+    'sessions': sorted(m for m in sys.modules if m.startswith('django.contrib.sessions')),
+}))
+"""
+
+
+class ApiSettingsProfileTests(SimpleTestCase):
+    def serve(self, path):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='task2.settings_api', SECRET_KEY='test-secret-key')
+        result = subprocess.run([sys.executable, '-c', CHILD, path], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_api_routes_are_served(self):
+        response = self.serve('/api/organisations')
+
+        self.assertEqual(response['status'], '401 Unauthorized')
+        self.assertIn('credentials were not provided', response['body'])
+
+    def test_admin_is_not_routed_and_sessions_are_not_loaded(self):
+        response = self.serve('/admin/')
+
+        self.assertEqual(response['status'], '404 Not Found')
+        self.assertEqual(response['sessions'], [])
+
+    def test_replica_routing_is_kept(self):
+        from task2 import settings_api
+
+        self.assertEqual(settings_api.MIDDLEWARE[:2], settings.MIDDLEWARE[:2])
+        self.assertEqual(settings_api.MIDDLEWARE[1], 'task.db.replicas.ReplicaRoutingMiddleware')
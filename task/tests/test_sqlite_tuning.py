@@ -0,0 +1,51 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / 'tuned.sqlite3')
+
+    def connect(self, **settings_dict):
+        handler = ConnectionHandler({'default': {'NAME': self.path, **settings_dict}})
+        wrapper = handler['default']
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        wrapper = self.connect(ENGINE='task.db.backends.sqlite3_tuned', PRAGMAS={'busy_timeout': 250})
+
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 250)
+
+    def test_untuned_database_keeps_sqlite_defaults(self):
+        wrapper = self.connect(ENGINE='django.db.backends.sqlite3')
+
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+
+    def test_atomic_takes_the_write_lock_up_front(self):
+        wrapper = self.connect(ENGINE='task.db.backends.sqlite3_tuned', PRAGMAS={}, TRANSACTION_MODE='IMMEDIATE')
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+
+        # What atomic() does on entry; nothing has been read or written yet.
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.addCleanup(wrapper.set_autocommit, True)
+        self.addCleanup(wrapper.rollback)
+
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
@@ -0,0 +1,77 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from task.authentication import verified_token_cache
+from task.tokens import access_token_for
+
+User = get_user_model()
+
+
+class VerifiedTokenCacheTests(APITestCase):
+    def setUp(self):
+        verified_token_cache.clear()
+        self.addCleanup(verified_token_cache.clear)
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+        self.url = reverse('get_user_record', kwargs={'id': self.user.pk})
+
+    def get(self, token):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_repeated_token_is_verified_once(self):
+        token = access_token_for(self.user)
+        before = verified_token_cache.stats()
+        for _ in range(3):
+            self.assertEqual(self.get(token).status_code, status.HTTP_200_OK)
+
+        stats = verified_token_cache.stats()
+        self.assertEqual(stats['misses'] - before['misses'], 1)
+        self.assertEqual(stats['hits'] - before['hits'], 2)
+
+    def test_invalid_token_is_not_cached(self):
+        token = access_token_for(self.user)
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        for _ in range(2):
+            self.assertEqual(self.get(tampered).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(verified_token_cache.stats()['size'], 0)
+
+    def test_entry_expires_with_token(self):
+        raw = access_token_for(self.user).encode()
+        token = AccessToken(raw)
+        verified_token_cache.set(raw, token, now=token['exp'] - 10)
+
+        self.assertIs(verified_token_cache.get(raw, now=token['exp'] - 1), token)
+        self.assertIsNone(verified_token_cache.get(raw, now=token['exp']))
+
+    @override_settings(JWT_VERIFIED_TOKEN_CACHE_TTL=60)
+    def test_entry_lifetime_is_capped(self):
+        raw = access_token_for(self.user).encode()
+        token = AccessToken(raw)
+        verified_token_cache.set(raw, token, now=0)
+
+        self.assertIsNotNone(verified_token_cache.get(raw, now=59))
+        self.assertIsNone(verified_token_cache.get(raw, now=60))
+
+    @override_settings(JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES=2)
+    def test_bounded(self):
+        for _ in range(3):
+            self.assertEqual(self.get(access_token_for(self.user)).status_code, status.HTTP_200_OK)
+        self.assertEqual(verified_token_cache.stats()['size'], 2)
+
+    @override_settings(JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES=0)
+    def test_disabled(self):
+        token = access_token_for(self.user)
+        for _ in range(2):
+            self.assertEqual(self.get(token).status_code, status.HTTP_200_OK)
+        self.assertEqual(verified_token_cache.stats()['size'], 0)
+
+    @override_settings(ROOT_URLCONF='task.async_urls')
+    def test_async_view_uses_cache(self):
+        token = access_token_for(self.user)
+        before = verified_token_cache.stats()['hits']
+        for _ in range(2):
+            self.assertEqual(self.get(token).status_code, status.HTTP_200_OK)
+        self.assertEqual(verified_token_cache.stats()['hits'] - before, 1)
@@ -0,0 +1,48 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from django.contrib.auth import get_user_model
+from task.throttling import login_throttle
+from task.tokens import issue_tokens
+
+User = get_user_model()
+
+
+class TokenIssuerTests(APITestCase):
+    def setUp(self):
+        login_throttle.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', password='testpassword123', firstName='Test', lastName='User')
+
+    def test_access_token_matches_simplejwt_claims(self):
+        token = AccessToken(issue_tokens(self.user)['accessToken'])
+        expected = AccessToken.for_user(self.user)
+
+        self.assertEqual(set(token.payload), set(expected.payload))
+        self.assertEqual(token['user_id'], str(self.user.pk))
+        self.assertAlmostEqual(token['exp'] - token['iat'], expected['exp'] - expected['iat'], delta=1)
+
+    def test_refresh_token_on_request(self):
+        tokens = issue_tokens(self.user, refresh=True)
+        refresh = RefreshToken(tokens['refreshToken'])
+
+        self.assertEqual(refresh['user_id'], str(self.user.pk))
+        self.assertNotEqual(refresh['jti'], AccessToken(tokens['accessToken'])['jti'])
+        self.assertNotIn('refreshToken', issue_tokens(self.user))
+
+    def test_minted_token_authenticates(self):
+        access = issue_tokens(self.user)['accessToken']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.get(reverse('get_user_record', kwargs={'id': self.user.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_login_returns_refresh_token_when_asked(self):
+        credentials = {'email': 'user@example.com', 'password': 'testpassword123'}
+        for name in ('login', 'async_login'):
+            data = self.client.post(reverse(name), credentials, format='json').json()['data']
+            self.assertNotIn('refreshToken', data)
+
+            data = self.client.post(reverse(name) + '?refresh=true', credentials, format='json').json()['data']
+            self.assertEqual(RefreshToken(data['refreshToken'])['user_id'], str(self.user.pk))
+            AccessToken(data['accessToken'])
@@ -0,0 +1,235 @@
+"""
+Login brute-force throttle.
+
+Every login attempt counts against the email it names and the client IP it comes from.
+An attempt over either limit is turned away before the user lookup or the password hash,
+so a credential-stuffing burst costs a counter update per request instead of a PBKDF2 run.
+
+Counts use the two-window approximation of a sliding window: one counter for the current
+fixed window and one for the previous. The previous count is weighted by how much of it
+still overlaps the sliding window. That is two integers per key, and it allows at most
+``limit`` attempts in any window. Only accepted attempts are counted, so a client that
+keeps hammering gets back in once its accepted rate drops, not when it stops trying.
+
+The counters live in a bounded in-process LRU (``LOGIN_THROTTLE_MAX_KEYS``), or in the
+Django cache named by ``LOGIN_THROTTLE_CACHE_ALIAS`` so every instance shares them. When
+the LRU is full, the least recently used key is evicted and its count starts again. The IP
+limit still caps a client that rotates through emails to push a victim's count out.
+"""
+from collections import OrderedDict
+import hashlib
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def _window(now, window):
+    """Index of the fixed window ``now`` falls in, and the fraction of it already elapsed."""
+
+    index, offset = divmod(now, window)
+    return int(index), offset / window
+
+
+def _estimate(previous, current, elapsed):
+    return previous * (1 - elapsed) + current
+
+
+def _retry_after(previous, current, elapsed, limit, window):
+    """Seconds until one more attempt fits under ``limit``."""
+
+    room = limit - current - 1
+    if room < 0 or not previous:
+        return max(1, math.ceil((1 - elapsed) * window))
+    # previous * (1 - elapsed') + current + 1 <= limit  <=>  elapsed' >= 1 - room / previous
+    return max(1, math.ceil((1 - room / previous - elapsed) * window))
+
+
+class LocalBackend:
+    """Window counters in a bounded in-process LRU: key -> [window index, previous, current]."""
+
+    shared = False
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _counter(self, key, index):
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [index, 0, 0]
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != index:
+                # Roll forward; anything older than the previous window no longer counts.
+                counter[1] = counter[2] if counter[0] == index - 1 else 0
+                counter[2] = 0
+                counter[0] = index
+        return counter
+
+    def hit(self, key, limit, window, now):
+        index, elapsed = _window(now, window)
+        with self._lock:
+            counter = self._counter(key, index)
+            if _estimate(counter[1], counter[2] + 1, elapsed) > limit:
+                return _retry_after(counter[1], counter[2], elapsed, limit, window)
+            counter[2] += 1
+        return None
+
+    def undo(self, key, window, now):
+        index, _ = _window(now, window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == index and counter[2]:
+                counter[2] -= 1
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class CacheBackend:
+    """Window counters in a Django cache, one entry per key and window, shared across instances."""
+
+    shared = True
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, key, index):
+        return f"login-throttle:{key}:{index}"
+
+    def hit(self, key, limit, window, now):
+        index, elapsed = _window(now, window)
+        cache = self.cache
+        current_key = self._key(key, index)
+        # Kept long enough to serve as the previous window of the next one.
+        cache.add(current_key, 0, timeout=math.ceil(2 * window))
+        current = cache.incr(current_key)
+        previous = cache.get(self._key(key, index - 1), 0)
+        if _estimate(previous, current, elapsed) > limit:
+            # Give the attempt back: only accepted attempts count.
+            cache.decr(current_key)
+            return _retry_after(previous, current - 1, elapsed, limit, window)
+        return None
+
+    def undo(self, key, window, now):
+        index, _ = _window(now, window)
+        try:
+            self.cache.decr(self._key(key, index))
+        except ValueError:
+            # Expired in between.
+            pass
+
+    def clear(self):
+        # The cache may hold other data; shared counters are left to expire.
+        pass
+
+    def __len__(self):
+        return 0
+
+
+def email_key(email):
+    # Hashed so cache keys stay short and valid, and no addresses sit in the cache.
+    return 'email:' + hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
+
+
+class LoginThrottle:
+    """Per-email and per-IP sliding-window limits on login attempts."""
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.allowed = self.rejected = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    alias = settings.LOGIN_THROTTLE_CACHE_ALIAS
+                    if alias:
+                        self._backend = CacheBackend(alias)
+                    else:
+                        self._backend = LocalBackend(max(1, settings.LOGIN_THROTTLE_MAX_KEYS))
+        return self._backend
+
+    def rules(self, email, ip):
+        if isinstance(email, str) and email.strip():
+            yield email_key(email), settings.LOGIN_THROTTLE_EMAIL_LIMIT
+        if ip:
+            yield f'ip:{ip}', settings.LOGIN_THROTTLE_IP_LIMIT
+
+    def check(self, email, ip, now=None):
+        """Count one attempt; returns ``None`` when it may go ahead, else seconds to wait.
+
+        A rejected attempt leaves every counter as it was.
+        """
+
+        if not settings.LOGIN_THROTTLE:
+            return None
+        backend, window = self.backend, settings.LOGIN_THROTTLE_WINDOW
+        now = time.time() if now is None else now
+        counted = []
+        for key, limit in self.rules(email, ip):
+            retry_after = backend.hit(key, limit, window, now)
+            if retry_after is not None:
+                for earlier in counted:
+                    backend.undo(earlier, window, now)
+                with self._stats_lock:
+                    self.rejected += 1
+                return retry_after
+            counted.append(key)
+        with self._stats_lock:
+            self.allowed += 1
+        return None
+
+    async def acheck(self, email, ip, now=None):
+        # Only a shared backend does I/O; the local one is a few dict operations.
+        if self.backend.shared:
+            return await sync_to_async(self.check)(email, ip, now)
+        return self.check(email, ip, now)
+
+    def clear(self):
+        """Forget the local counters and the backend choice, e.g. after settings change in tests."""
+
+        with self._lock:
+            if self._backend is not None:
+                self._backend.clear()
+            self._backend = None
+            self.allowed = self.rejected = 0
+
+    def stats(self):
+        backend = self._backend
+        return {
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'keys': len(backend) if backend is not None else 0,
+            'evictions': getattr(backend, 'evictions', 0),
+        }
+
+
+login_throttle = LoginThrottle()
+
+
+def client_ip(request):
+    """Client address, honouring ``REST_FRAMEWORK['NUM_PROXIES']`` like DRF's throttles."""
+
+    return BaseThrottle().get_ident(request)
@@ -0,0 +1,128 @@
+"""
+Tokens returned by register and login.
+
+``RefreshToken.for_user(user).access_token`` builds and signs a refresh token only to
+derive the access token from it, and every ``str(token)`` goes through ``jwt.encode``,
+which looks up the algorithm and prepares the signing key each time. ``token_issuer``
+builds payloads with the same claims simplejwt would and signs them with a key and
+header prepared once, so a response only pays for the tokens it returns. The refresh
+token is minted when the client asks for it (``?refresh=true``).
+"""
+import json
+import threading
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_encode
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+ORGANISATIONS_CLAIM = 'orgs'
+MEMBERSHIP_VERSION_CLAIM = 'mv'
+
+
+def add_membership_claims(token, user):
+    """Embed the user's organisation ids and membership version so requests can skip the database.
+
+    Users in more than ``JWT_MEMBERSHIP_CLAIMS_MAX_ORGS`` organisations get a plain token.
+    """
+
+    limit = settings.JWT_MEMBERSHIP_CLAIMS_MAX_ORGS
+    org_ids = list(user.organisations.values_list('pk', flat=True)[:limit + 1])
+    if len(org_ids) > limit:
+        return token
+    token[ORGANISATIONS_CLAIM] = [org_id.hex for org_id in org_ids]
+    token[MEMBERSHIP_VERSION_CLAIM] = user.membershipVersion
+    return token
+
+
+class TokenIssuer:
+    """Signs access and refresh tokens for users with simplejwt's backend settings."""
+
+    def __init__(self):
+        self._prepared = None
+        self._lock = threading.Lock()
+
+    def _signer(self):
+        """``(algorithm, key, encoded header)`` for the current token backend, prepared once."""
+
+        identity = (token_backend.algorithm, token_backend.signing_key)
+        prepared = self._prepared
+        if prepared is None or prepared[0] != identity:
+            with self._lock:
+                algorithm = get_default_algorithms()[token_backend.algorithm]
+                header = json.dumps({'alg': token_backend.algorithm, 'typ': 'JWT'}, separators=(',', ':'),
+                                    sort_keys=True).encode()
+                prepared = self._prepared = (
+                    identity, algorithm, algorithm.prepare_key(token_backend.signing_key), base64url_encode(header))
+        return prepared[1:]
+
+    def payload(self, user, token_type, lifetime, now):
+        """Claims of a new token, as ``Token.for_user`` and ``TokenBackend.encode`` would set them."""
+
+        user_id = getattr(user, api_settings.USER_ID_FIELD)
+        payload = {
+            api_settings.TOKEN_TYPE_CLAIM: token_type,
+            'exp': now + int(lifetime.total_seconds()),
+            'iat': now,
+            api_settings.JTI_CLAIM: uuid.uuid4().hex,
+            api_settings.USER_ID_CLAIM: user_id if isinstance(user_id, int) else str(user_id),
+        }
+        if api_settings.CHECK_REVOKE_TOKEN:
+            payload[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(user.password)
+        if token_backend.audience is not None:
+            payload['aud'] = token_backend.audience
+        if token_backend.issuer is not None:
+            payload['iss'] = token_backend.issuer
+        return payload
+
+    def sign(self, payload):
+        algorithm, key, header = self._signer()
+        body = json.dumps(payload, separators=(',', ':'), cls=token_backend.json_encoder).encode()
+        signing_input = header + b'.' + base64url_encode(body)
+        return (signing_input + b'.' + base64url_encode(algorithm.sign(signing_input, key))).decode()
+
+    def access(self, user, now=None):
+        now = int(time.time()) if now is None else now
+        payload = self.payload(user, 'access', api_settings.ACCESS_TOKEN_LIFETIME, now)
+        if settings.JWT_MEMBERSHIP_CLAIMS:
+            add_membership_claims(payload, user)
+        return self.sign(payload)
+
+    def refresh(self, user, now=None):
+        if apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            # Refresh tokens must be recorded as outstanding to be blacklisted later.
+            from rest_framework_simplejwt.tokens import RefreshToken
+
+            return str(RefreshToken.for_user(user))
+        now = int(time.time()) if now is None else now
+        return self.sign(self.payload(user, 'refresh', api_settings.REFRESH_TOKEN_LIFETIME, now))
+
+
+token_issuer = TokenIssuer()
+
+
+def access_token_for(user):
+    """Mint the access token returned by register and login."""
+
+    return token_issuer.access(user)
+
+
+def wants_refresh_token(request):
+    # DRF requests expose query_params, plain Django (async) requests GET.
+    params = getattr(request, 'query_params', request.GET)
+    return params.get('refresh', '').lower() in ('1', 'true', 'yes')
+
+
+def issue_tokens(user, refresh=False):
+    """Response tokens for ``user``: ``accessToken``, plus ``refreshToken`` when asked for."""
+
+    now = int(time.time())
+    tokens = {"accessToken": token_issuer.access(user, now)}
+    if refresh:
+        tokens["refreshToken"] = token_issuer.refresh(user, now)
+    return tokens
@@ -1,14 +1,19 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 
 urlpatterns = [
     path('', views.welcome, name='welcome'),
     path('auth/register', views.register, name='register'),
+    path('auth/register/bulk', views.register_bulk, name='register_bulk'),
     path('auth/login', views.login, name='login'),
+    path('auth/async/register', async_views.register, name='async_register'),
+    path('auth/async/login', async_views.login, name='async_login'),
     path('api/users/<str:id>', views.get_user_record, name='get_user_record'),
     path('api/organisations', views.get_or_create_organisations, name='get_or_create_organisations'),
+    path('api/organisations/search', views.search_organisations, name='search_organisations'),
     path('api/organisations/<str:orgId>', views.get_organisation, name='get_organisation'),
     
     path('api/organisations/<str:orgId>/users', views.add_user, name='add_user'),
+    path('metrics', views.metrics, name='metrics'),
 ]
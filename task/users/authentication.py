@@ -0,0 +1,86 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import _clean_credentials, authenticate
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+
+from .hashing import run_hash_job, arun_hash_job
+from .models import User
+
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def _uses_model_backend():
+    return list(settings.AUTHENTICATION_BACKENDS) == [MODEL_BACKEND]
+
+
+def _get_user(email):
+    try:
+        return User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        return None
+
+
+def _check(encoded, password):
+    """``(matches, upgraded)``, where ``upgraded`` is a fresh hash when ``encoded`` uses outdated hasher settings."""
+
+    upgraded = []
+    matches = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return matches, upgraded[0] if upgraded else None
+
+
+def _verified(user, matches, upgraded):
+    if not matches:
+        return None
+    if upgraded is not None:
+        # What AbstractBaseUser.check_password's setter saves, hashed on the executor already.
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return user if user.is_active else None
+
+
+def _login_failed(email, password, request):
+    user_login_failed.send(
+        sender='django.contrib.auth',
+        credentials=_clean_credentials({'email': email, 'password': password}),
+        request=request,
+    )
+
+
+def authenticate_user(email, password, request=None):
+    """Check credentials the way ``ModelBackend`` does, hashing on the bounded hashing executor.
+
+    Outdated hashes are upgraded and ``user_login_failed`` is sent as ``authenticate()`` would.
+    With any other ``AUTHENTICATION_BACKENDS`` this is ``authenticate()`` itself.
+    Raises ``HashingOverloaded`` when the executor is saturated.
+    """
+
+    if not _uses_model_backend():
+        return authenticate(request, email=email, password=password)
+
+    user = _get_user(email) if email else None
+    if user is None:
+        # Hash anyway so unknown emails take as long as wrong passwords.
+        run_hash_job(make_password, password)
+    else:
+        user = _verified(user, *run_hash_job(_check, user.password, password))
+    if user is None:
+        _login_failed(email, password, request)
+    return user
+
+
+async def aauthenticate_user(email, password, request=None):
+    """Async counterpart of ``authenticate_user``; the event loop never runs the hash itself."""
+
+    if not _uses_model_backend():
+        return await sync_to_async(authenticate)(request, email=email, password=password)
+
+    user = await sync_to_async(_get_user)(email) if email else None
+    if user is None:
+        await arun_hash_job(make_password, password)
+    else:
+        matches, upgraded = await arun_hash_job(_check, user.password, password)
+        user = await sync_to_async(_verified)(user, matches, upgraded) if upgraded else _verified(user, matches, None)
+    if user is None:
+        await sync_to_async(_login_failed)(email, password, request)
+    return user
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+from ..metrics import timed
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+class HashingOverloaded(Exception):
+    """Raised when every password hashing slot is taken and the job is shed instead of queued."""
+
+
+def _hash_workers():
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def get_hash_pool():
+    """Return the shared process pool used to hash passwords in bulk."""
+
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Imported here: multiprocessing is only needed for bulk registration.
+                from concurrent.futures import ProcessPoolExecutor
+
+                _pool = ProcessPoolExecutor(max_workers=_hash_workers())
+    return _pool
+
+
+def hash_passwords(passwords):
+    """Hash a list of raw passwords, spreading the work across processes when it pays off."""
+
+    passwords = list(passwords)
+    with timed('hash'):
+        if len(passwords) < getattr(settings, 'PASSWORD_HASH_POOL_THRESHOLD', 2) or _hash_workers() < 2:
+            return [make_password(password) for password in passwords]
+
+        chunksize = max(1, len(passwords) // (_hash_workers() * 4))
+        return list(get_hash_pool().map(make_password, passwords, chunksize=chunksize))
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                concurrency = settings.PASSWORD_HASH_CONCURRENCY or os.cpu_count() or 1
+                _slots = threading.BoundedSemaphore(concurrency + settings.PASSWORD_HASH_QUEUE_SIZE)
+                _executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='password-hash')
+    return _executor, _slots
+
+
+def submit_hash_job(fn, *args, **kwargs):
+    """Run a hashing call on the bounded hashing executor and return its future.
+
+    At most ``PASSWORD_HASH_CONCURRENCY`` jobs run at once and ``PASSWORD_HASH_QUEUE_SIZE``
+    more may wait; anything beyond that raises ``HashingOverloaded`` immediately.
+    """
+
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        raise HashingOverloaded()
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def run_hash_job(fn, *args, **kwargs):
+    with timed('hash'):
+        return submit_hash_job(fn, *args, **kwargs).result()
+
+
+async def arun_hash_job(fn, *args, **kwargs):
+    with timed('hash'):
+        return await asyncio.wrap_future(submit_hash_job(fn, *args, **kwargs))
@@ -1,10 +1,24 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 
 class CustomUserManager(BaseUserManager):
     """"Custom user model where email is the unique identifiers for authentication instead of usernames."""
 
+    def with_email(self, *emails):
+        """Users whose email is one of ``emails``, ignoring case.
+
+        Compares ``LOWER(email)`` with ``LOWER(%s)`` so the ``user_email_ci_unique`` index
+        answers it; ``email__iexact`` would scan the table.
+        """
+
+        return self.alias(email_key=Lower('email')).filter(email_key__in=[Lower(Value(email)) for email in emails])
+
+    def get_by_natural_key(self, email):
+        return self.with_email(email).get()
+
     def create_user(self, email, password, **extra_fields):
         """Create and save a User with the given email and password."""
 
@@ -0,0 +1,249 @@
+from collections import OrderedDict
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, F, OuterRef
+
+from ..db.replicas import replica_routing
+from .models import User, Organisation
+
+
+def _version_key(user_id):
+    return f"membership-version:{user_id}"
+
+
+def membership_version(user_id):
+    """Current membership version of a user, served from the cache when possible.
+
+    Returns ``None`` for unknown users.
+    """
+
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('membershipVersion', flat=True).first()
+        if version is not None:
+            cache.set(key, version, settings.MEMBERSHIP_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def current_membership_version(user_id):
+    """Membership version of ``user_id`` read from the primary, past the version cache.
+
+    For listing ETags: the cache is per process, so another worker's change may not have
+    reached it yet, and a cached version would answer 304 for an out-of-date listing.
+    """
+
+    return User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values_list('membershipVersion', flat=True).first()
+
+
+def current_organisation_ids(user_id):
+    """Organisation ids of ``user_id`` read from the primary, past the membership cache.
+
+    A listing tagged with ``current_membership_version`` must not be built from older ids.
+    """
+
+    return frozenset(User.organisations.through.objects.using(DEFAULT_DB_ALIAS).filter(
+        user_id=user_id).values_list('organisation_id', flat=True))
+
+
+def bump_membership_version(user_ids):
+    """Invalidate membership claims issued to the given users."""
+
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    User.objects.filter(pk__in=user_ids).update(membershipVersion=F('membershipVersion') + 1)
+    keys = [_version_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        # A request that read the old version before this transaction commits may cache it again.
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class MembershipCache:
+    """Per-user sets of organisation ids.
+
+    Entries live in a bounded in-process LRU (``MEMBERSHIP_CACHE_MAX_ENTRIES``) and, when
+    ``MEMBERSHIP_CACHE_ALIAS`` names a Django cache, in that backend as well so several
+    instances can share them. Entries are dropped from ``m2m_changed`` (see ``task.signals``).
+    Local entries are only invalidated in the process that made the change, so they expire
+    after ``MEMBERSHIP_CACHE_LOCAL_TIMEOUT`` seconds; that bounds how long other processes
+    show old memberships. Set ``MEMBERSHIP_CACHE_MAX_ENTRIES`` to 0 to use only the shared backend.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.shared_hits = self.misses = self.invalidations = self.evictions = 0
+
+    def _key(self, user_id):
+        return f"memberships:{user_id}"
+
+    def _shared(self):
+        alias = settings.MEMBERSHIP_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def _remember(self, user_id, org_ids):
+        max_entries = settings.MEMBERSHIP_CACHE_MAX_ENTRIES
+        if max_entries <= 0:
+            return
+        expires = time.monotonic() + settings.MEMBERSHIP_CACHE_LOCAL_TIMEOUT
+        with self._lock:
+            self._entries[str(user_id)] = (org_ids, expires)
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, user_id):
+        """Organisation ids of ``user_id`` as a frozenset."""
+
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is not None:
+                if time.monotonic() < entry[1]:
+                    self._entries.move_to_end(str(user_id))
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[str(user_id)]
+
+        shared = self._shared()
+        if shared is not None:
+            org_ids = shared.get(self._key(user_id))
+            if org_ids is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                self._remember(user_id, org_ids)
+                return org_ids
+
+        with self._lock:
+            self.misses += 1
+        org_ids = frozenset(
+            User.organisations.through.objects.filter(user_id=user_id).values_list('organisation_id', flat=True)
+        )
+        if shared is not None:
+            shared.set(self._key(user_id), org_ids, settings.MEMBERSHIP_CACHE_TIMEOUT)
+        self._remember(user_id, org_ids)
+        return org_ids
+
+    def invalidate(self, user_ids):
+        user_ids = [str(user_id) for user_id in user_ids]
+        if not user_ids:
+            return
+        self._drop(user_ids)
+        with self._lock:
+            self.invalidations += len(user_ids)
+        if transaction.get_connection().in_atomic_block:
+            # m2m_changed fires inside the add/remove transaction; a request that reads the
+            # memberships before it commits may cache the old set again.
+            transaction.on_commit(lambda: self._drop(user_ids))
+
+    def _drop(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+        shared = self._shared()
+        if shared is not None:
+            shared.delete_many([self._key(user_id) for user_id in user_ids])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_ratio": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            }
+
+
+membership_cache = MembershipCache()
+
+
+def claimed_organisation_ids(user):
+    """Organisation ids carried by a membership-claim token user, or ``None`` for a database user."""
+
+    return getattr(user, 'organisation_ids', None)
+
+
+def organisation_ids(user):
+    """Organisation ids ``user`` belongs to, from token claims or the membership cache."""
+
+    claimed = claimed_organisation_ids(user)
+    if claimed is not None:
+        return claimed
+    return membership_cache.get(user.pk)
+
+
+def user_organisations(user):
+    """Organisations ``user`` belongs to as a queryset, without loading the user row.
+
+    Unlike ``organisation_ids`` this stays in the database, for result sets too large to
+    hold in memory.
+    """
+
+    claimed = claimed_organisation_ids(user)
+    if claimed is not None:
+        return Organisation.objects.filter(pk__in=claimed)
+    return Organisation.objects.filter(users__pk=user.pk)
+
+
+def add_members(organisation, user_ids):
+    """Add many users to ``organisation`` with one lookup and one bulk insert.
+
+    ``user_ids`` are UUIDs. Returns the sets ``(added, already_members, not_found)``.
+    ``bulk_create`` sends no ``m2m_changed``, so versions, the cache and replica stickiness
+    are handled here.
+    """
+
+    Membership = User.organisations.through
+    user_ids = set(user_ids)
+    found = dict(User.objects.filter(pk__in=user_ids).annotate(is_member=Exists(
+        Membership.objects.filter(user_id=OuterRef('pk'), organisation_id=organisation.pk)
+    )).values_list('pk', 'is_member'))
+    added = {user_id for user_id, is_member in found.items() if not is_member}
+
+    with transaction.atomic():
+        # A concurrent add of the same user is not an error.
+        Membership.objects.bulk_create(
+            [Membership(user_id=user_id, organisation_id=organisation.pk) for user_id in added],
+            ignore_conflicts=True)
+        bump_membership_version(added)
+    membership_cache.invalidate(added)
+    replica_routing.stick(added)
+
+    return added, set(found) - added, user_ids - set(found)
+
+
+def is_same_user(user, target_user):
+    return str(user.pk) == str(target_user.pk)
+
+
+def annotate_co_membership(queryset, user):
+    """Annotate a user queryset with ``shares_organisation`` relative to ``user``.
+
+    The flag is a single EXISTS over the membership table joined to itself on
+    organisation, so the target users and the permission check come back in one query.
+    Both sides of the join are index lookups on the membership table.
+    """
+
+    Membership = User.organisations.through
+    claimed = claimed_organisation_ids(user)
+    if claimed is not None:
+        shared = Membership.objects.filter(user_id=OuterRef('pk'), organisation_id__in=claimed)
+    else:
+        shared = Membership.objects.filter(user_id=OuterRef('pk')).filter(Exists(
+            Membership.objects.filter(organisation_id=OuterRef('organisation_id'), user_id=user.pk)
+        ))
+    return queryset.annotate(shares_organisation=Exists(shared))
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 import uuid
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.utils.translation import gettext_lazy as _
@@ -14,6 +16,9 @@ class User(AbstractUser):
     # last_name = None
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # Bumped whenever the user's organisations change; embedded in membership-claim tokens.
+    membershipVersion = models.PositiveIntegerField(default=0, editable=False)
+    updatedAt = models.DateTimeField(auto_now=True)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -23,14 +28,33 @@ class User(AbstractUser):
     
     organisations = models.ManyToManyField('Organisation', related_name='users')
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails are unique ignoring case; lookups by email go through this index
+            # (see CustomUserManager.with_email).
+            models.UniqueConstraint(Lower('email'), name='user_email_ci_unique'),
+        ]
 
     def __str__(self):
         return self.email
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # membershipVersion is only ever bumped with QuerySet.update(); writing back the value
+        # this instance was loaded with would re-validate tokens issued before a later bump.
+        values = [value for value in values if value[0].attname != 'membershipVersion']
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
 class Organisation(models.Model):
     orgId = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=64, blank=False, null=False, )
     description = models.CharField(max_length=64, null=True, blank=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Prefix search walks this in order (see task.users.search).
+            models.Index(Lower('name'), F('orgId'), name='organisation_search_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,82 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from ..db.replicas import replica_routing
+from .hashing import hash_passwords, run_hash_job, arun_hash_job
+from .models import User, Organisation
+
+
+def default_organisation_name(first_name):
+    """Name of the organisation every user gets on registration."""
+
+    return f"{first_name.title()}'s Organisation"
+
+
+def create_registered_user(validated_data, password):
+    """Create a user with their default organisation and membership in one transaction.
+
+    ``password`` is already hashed so the transaction only holds three INSERTs.
+    """
+
+    with transaction.atomic():
+        user = User.objects.create(
+            firstName=validated_data['firstName'],
+            lastName=validated_data['lastName'],
+            email=validated_data['email'],
+            phone=validated_data.get('phone'),
+            password=password,
+        )
+        organisation = Organisation.objects.create(
+            name=default_organisation_name(validated_data['firstName']),
+            description=''
+        )
+        User.organisations.through.objects.create(user=user, organisation=organisation)
+
+    return user
+
+
+def register_user(validated_data):
+    """Hash the password on the hashing executor, then create the user and default organisation."""
+
+    password = run_hash_job(make_password, validated_data['password'])
+    return create_registered_user(validated_data, password)
+
+
+async def aregister_user(validated_data):
+    password = await arun_hash_job(make_password, validated_data['password'])
+    return await sync_to_async(create_registered_user)(validated_data, password)
+
+
+def bulk_register_users(validated_items):
+    """Create users, their default organisations and memberships in a single transaction.
+
+    ``validated_items`` are ``RegisterSerializer`` validated payloads. Passwords are hashed
+    up front so every row is written once with ``bulk_create``, which sends no ``post_save``,
+    so the new users are made sticky to the primary here.
+    """
+
+    passwords = hash_passwords(item['password'] for item in validated_items)
+    Membership = User.organisations.through
+
+    users, organisations, memberships = [], [], []
+    for data, password in zip(validated_items, passwords):
+        user = User(
+            firstName=data['firstName'],
+            lastName=data['lastName'],
+            email=data['email'],
+            phone=data.get('phone'),
+            password=password,
+        )
+        organisation = Organisation(name=default_organisation_name(data['firstName']), description='')
+        users.append(user)
+        organisations.append(organisation)
+        memberships.append(Membership(user_id=user.pk, organisation_id=organisation.pk))
+
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        Organisation.objects.bulk_create(organisations)
+        Membership.objects.bulk_create(memberships)
+    replica_routing.stick([user.pk for user in users])
+
+    return users
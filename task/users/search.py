@@ -0,0 +1,119 @@
+"""
+Organisation search by name.
+
+Results are ordered by lower-cased name, then orgId, and paginated by keyset: the cursor is
+the orgId of the last row, and the next page starts right after that row's (name, orgId).
+
+A prefix search is a range scan of the ``organisation_search_name_idx`` index on
+(lower(name), orgId). Rows come out already in result order, so a page costs about
+``limit`` index entries however many organisations match.
+
+A substring search narrows candidates with the trigram index from migration 0005 and
+sorts the matches. That index is FTS5 on SQLite, pg_trgm on PostgreSQL, and a scan
+elsewhere. A common term ("organisation") would make that sort most of the table, so
+on SQLite, terms with at least ``COMMON_SUBSTRING_MATCHES`` candidates walk the name
+index in order instead and stop once a page matches. PostgreSQL's planner makes that
+choice from its own statistics.
+Terms are lower-cased in Python. On SQLite ``LOWER()`` only folds ASCII, so a prefix
+search with non-ASCII capitals may miss rows there. Substring search is unaffected.
+"""
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from .models import User
+
+MATCHES = ('prefix', 'substring')
+
+# Trigram indexes cannot answer shorter substrings.
+MIN_SUBSTRING_LENGTH = 3
+
+# Substrings in at least this many names skip the trigram index on SQLite (see below).
+COMMON_SUBSTRING_MATCHES = 5000
+
+
+def can_search_all(user):
+    """Staff and superusers may search every organisation; everyone else only their own."""
+
+    if not isinstance(user, User):
+        # Token users only carry claims; the flags live on the user row.
+        user = User.objects.filter(pk=user.pk).first()
+    return user is not None and user.is_active and (user.is_staff or user.is_superuser)
+
+
+def _prefix_upper_bound(term):
+    # The smallest string above every string starting with ``term``.
+    last = ord(term[-1])
+    return term[:-1] + chr(last + 1) if last < 0x10FFFF else None
+
+
+def _trigram_candidates(queryset, term):
+    if connection.vendor == 'sqlite':
+        phrase = '"' + term.replace('"', '""') + '"'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM (SELECT rowid FROM task_organisation_trigram '
+                'WHERE task_organisation_trigram MATCH %s LIMIT %s)', (phrase, COMMON_SUBSTRING_MATCHES))
+            if cursor.fetchone()[0] >= COMMON_SUBSTRING_MATCHES:
+                return queryset
+        return queryset.filter(RawSQL(
+            '"task_organisation".rowid IN (SELECT rowid FROM task_organisation_trigram '
+            'WHERE task_organisation_trigram MATCH %s)', (phrase,), output_field=BooleanField()))
+    # On PostgreSQL the LIKE below is what the pg_trgm index answers.
+    return queryset
+
+
+def _ordered(queryset, cursor):
+    """``queryset`` in result order, starting after ``cursor``; ``None`` if the cursor is gone."""
+
+    queryset = queryset.alias(search=Lower('name'))
+    if cursor is not None:
+        after = queryset.model.objects.filter(pk=cursor).values_list(Lower('name'), flat=True).first()
+        if after is None:
+            return None
+        queryset = queryset.filter(search__gte=after).exclude(Q(search=after) & Q(orgId__lte=cursor))
+    return queryset.order_by('search', 'orgId')
+
+
+def search_queryset(queryset, term, match, cursor=None):
+    """``queryset`` narrowed to names matching ``term`` after ``cursor``, in result order.
+
+    Returns ``None`` when the cursor's organisation no longer exists.
+    """
+
+    term = term.lower()
+    queryset = _ordered(queryset, cursor)
+    if queryset is None:
+        return None
+    if match == 'prefix':
+        queryset = queryset.filter(search__gte=term)
+        upper = _prefix_upper_bound(term)
+        if upper is not None:
+            queryset = queryset.filter(search__lt=upper)
+        # The range is what the index serves; this keeps results exact under any collation.
+        return queryset.filter(search__startswith=term)
+    return _trigram_candidates(queryset, term).filter(search__contains=term)
+
+
+def _page(queryset, limit):
+    from ..serializers import organisation_reader
+
+    rows = list(organisation_reader.values(queryset)[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, str(rows[-1][0])
+    return rows, None
+
+
+def find_organisations(queryset, term, match, cursor=None, limit=100):
+    """One page of ``queryset`` organisations whose name matches ``term``.
+
+    Returns the rows (``organisation_reader`` values) and the next cursor, or ``None`` on
+    the last page. ``queryset`` sets the scope, e.g. the caller's organisations.
+    """
+
+    queryset = search_queryset(queryset, term, match, cursor)
+    if queryset is None:
+        return [], None
+    return _page(queryset, limit)
@@ -1,14 +1,52 @@
+import hmac
+import uuid
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
-from django.contrib.auth import authenticate
+from django.db import IntegrityError
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from .users.models import User, Organisation
-from .serializers import UserSerializer, RegisterSerializer, CreateOrganisationSerializer, OrganisationSerializer
+from .serializers import UserSerializer, RegisterSerializer, CreateOrganisationSerializer, OrganisationSerializer, BulkRegisterItemSerializer
+from .serializers import user_reader, organisation_reader
+from .tokens import issue_tokens, wants_refresh_token
+from .users.authentication import authenticate_user
+from .users.hashing import HashingOverloaded
+from .users.membership import (
+    add_members, annotate_co_membership, current_membership_version, current_organisation_ids, is_same_user,
+    user_organisations,
+)
+from .etags import make_etag, etag_matches, not_modified
+from .metrics import render_prometheus
+from .permissions import IsStaffUser
+from .response_cache import organisation_responses
+from .throttling import client_ip, login_throttle
+from .pagination import page_params, wants_stream, paginate_ids, paginate_queryset, stream_list_response
+from .users.registration import register_user, bulk_register_users
+from .users.search import MATCHES, MIN_SUBSTRING_LENGTH, can_search_all, find_organisations
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 
 
+OVERLOADED_RESPONSE = {
+    "status": "Service unavailable",
+    "message": "Too many authentication requests, retry shortly.",
+    "statusCode": 503
+}
+
+THROTTLED_RESPONSE = {
+    "status": "Too many requests",
+    "message": "Too many login attempts, retry later.",
+    "statusCode": 429
+}
+
+def _overloaded():
+    return Response(OVERLOADED_RESPONSE, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
+
+def _throttled(retry_after):
+    return Response(THROTTLED_RESPONSE, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": str(retry_after)})
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def welcome(request):
@@ -25,40 +63,26 @@ def register(request):
 
         if serializer.is_valid():
             
-            user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-            user_data = UserSerializer(user).data
- 
+            try:
+                user = register_user(serializer.validated_data)
+            except IntegrityError:
+                return Response({
+                    "errors": [{"field": "email", "message": "user with this email already exists."}]
+                }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            except HashingOverloaded:
+                return _overloaded()
 
-            # Create an organization using the validated user data
-            orga_creation_data = {
-                "name": user_data["firstName"],
-                "description": ''
-            }
-            orga_serializer = CreateOrganisationSerializer(data=orga_creation_data)
-            
-            if orga_serializer.is_valid():
-                save_org = orga_serializer.save()
-                user = User.objects.get(pk=user_data["userId"])
-                user.organisations.add(save_org)
+            tokens = issue_tokens(user, refresh=wants_refresh_token(request))
+            user_data = UserSerializer(user).data
 
-                return Response({
-                    "status": "success",
-                    "message": "Registration successful",
-                    "data": {
-                        "accessToken": access_token,
-                        "user": user_data
-                        }
-                    }, status=status.HTTP_201_CREATED)
-            else:
-                return Response({
-                    "status": "Bad request",
-                    "message": "Registration unsuccessful",
-                    "statusCode": 400,
-                    "errors": orga_serializer.errors
-                    }, status=status.HTTP_400_BAD_REQUEST)
-        
+            return Response({
+                "status": "success",
+                "message": "Registration successful",
+                "data": {
+                    **tokens,
+                    "user": user_data
+                    }
+                }, status=status.HTTP_201_CREATED)
         
         resp = {
                 "errors": [
@@ -77,6 +101,84 @@ def register(request):
                     "statusCode": 400
                 }, status=status.HTTP_400_BAD_REQUEST)
     
+def _bad_page_params():
+    return Response({
+        "status": "Bad Request",
+        "message": "cursor must be an orgId and limit a positive integer.",
+        "statusCode": 400
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+def _first_error(errors):
+    field = list(errors.keys())[0]
+    return {"field": field, "message": errors[field][0]}
+
+@api_view(['POST'])
+@permission_classes([IsStaffUser])
+def register_bulk(request):
+    """Registers a batch of users, each with a default organisation, and reports per item.
+
+    Staff only: a batch hashes up to ``BULK_REGISTER_MAX_ITEMS`` passwords across every core.
+    """
+
+    items = request.data
+    if not isinstance(items, list) or not items or len(items) > settings.BULK_REGISTER_MAX_ITEMS:
+        return Response({
+            "status": "Bad request",
+            "message": f"Expected a list of 1 to {settings.BULK_REGISTER_MAX_ITEMS} registrations.",
+            "statusCode": 400
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    item_serializers = [BulkRegisterItemSerializer(data=item) for item in items]
+    valid = [s.is_valid() for s in item_serializers]
+    emails = [s.validated_data['email'] for s, ok in zip(item_serializers, valid) if ok]
+    taken = {email.lower() for email in User.objects.with_email(*emails).values_list('email', flat=True)}
+
+    results = []
+    to_create = []
+    for index, (serializer, ok) in enumerate(zip(item_serializers, valid)):
+        if not ok:
+            results.append({"index": index, "status": "error", "errors": [_first_error(serializer.errors)]})
+            continue
+        email = serializer.validated_data['email'].lower()
+        if email in taken:
+            results.append({"index": index, "status": "error",
+                            "errors": [{"field": "email", "message": "user with this email already exists."}]})
+            continue
+        taken.add(email)
+        results.append(None)
+        to_create.append((index, serializer.validated_data))
+
+    if to_create:
+        try:
+            users = bulk_register_users([data for _, data in to_create])
+        except IntegrityError:
+            return Response({
+                "status": "Conflict",
+                "message": "Bulk registration unsuccessful, retry the batch.",
+                "statusCode": 409
+            }, status=status.HTTP_409_CONFLICT)
+
+        for (index, _), user in zip(to_create, users):
+            results[index] = {"index": index, "status": "success", "data": UserSerializer(user).data}
+
+    created = len(to_create)
+    if created == len(items):
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    return Response({
+        "status": "success" if created else "error",
+        "message": f"{created} of {len(items)} registrations successful",
+        "data": {
+            "created": created,
+            "failed": len(items) - created,
+            "results": results
+        }
+    }, status=response_status)
+
 @api_view(['GET','POST'])
 @permission_classes([AllowAny])
 def login(request):
@@ -86,17 +188,24 @@ def login(request):
         email = request.data.get('email')
         password = request.data.get('password')
 
-        user = authenticate(request, email=email, password=password)
+        retry_after = login_throttle.check(email, client_ip(request))
+        if retry_after is not None:
+            return _throttled(retry_after)
+
+        try:
+            user = authenticate_user(email, password, request)
+        except HashingOverloaded:
+            return _overloaded()
+
         if user is not None:
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
+            tokens = issue_tokens(user, refresh=wants_refresh_token(request))
             user_data = UserSerializer(user).data
 
             return Response({
                 "status": "success",
                 "message": "Login successful",
                 "data": {
-                    "accessToken": access_token,
+                    **tokens,
                     "user": user_data
                 }
             }, status=status.HTTP_200_OK)
@@ -123,21 +232,25 @@ def get_user_record(request, id:str = None):
         user = request.user
 
         try:
-            target_user = User.objects.get(pk=id)
+            target_user = annotate_co_membership(User.objects.only(*user_reader.fields, 'updatedAt'), user).get(pk=id)
         except UnboundLocalError or ValueError:
             return Response("Error 404!! Not found.", status=status.HTTP_400_BAD_REQUEST)
         except User.DoesNotExist:
             return Response("Error 404!! Not found.", status=status.HTTP_404_NOT_FOUND)
         
          # Check if the user is requesting their own record or a record in their organizations
-        if target_user == user or user.organisations.filter(pk__in=target_user.organisations.values_list('pk', flat=True)).exists():
+        if is_same_user(user, target_user) or target_user.shares_organisation:
+            etag = make_etag('user', target_user.pk, target_user.updatedAt.isoformat())
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
             serializer = UserSerializer(target_user, many=False)
             response_data = {
                 "status": "success",
                 "message": "User record found",
                 "data": serializer.data
             }
-            return Response(response_data, status=status.HTTP_200_OK)
+            return Response(response_data, status=status.HTTP_200_OK, headers={'ETag': etag})
         else:
             return Response({"status": "error", "message": "You do not have permission to view this user."}, status=status.HTTP_403_FORBIDDEN)
         
@@ -155,19 +268,37 @@ def get_or_create_organisations(request):
     """get all user belongings organisations or create a new organisation."""
 
     if request.method == 'GET':
-        organisations = request.user.organisations.all()
-
-        # organisations = 
-        serializer = OrganisationSerializer(organisations, many=True)
+        try:
+            cursor, limit = page_params(request)
+        except ValueError:
+            return _bad_page_params()
+
+        if wants_stream(request):
+            organisations = user_organisations(request.user)
+            if cursor is not None:
+                organisations = organisations.filter(pk__gt=cursor)
+            return stream_list_response(
+                {"status": "success", "message": "User organisations"}, "organisations",
+                organisation_reader.values(organisations.order_by('orgId')), organisation_reader.row)
+
+        # Organisation edits bump their members' membership version too, so it covers the whole page.
+        # Both come from the primary: another worker's change may not have reached this one's caches.
+        etag = make_etag('organisations', request.user.pk, current_membership_version(request.user.pk), cursor, limit)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        page_ids, next_cursor = paginate_ids(current_organisation_ids(request.user.pk), cursor, limit)
+        organisations = Organisation.objects.filter(pk__in=page_ids).order_by('orgId')
         response_data = {
                 "status": "success",
                 "message": "User organisations",
                 "data": {
-                "organisations": serializer.data
+                "organisations": organisation_reader.many(organisations),
+                "nextCursor": next_cursor
                 }
             }
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(response_data, status=status.HTTP_200_OK, headers={'ETag': etag})
     elif request.method == 'POST':
         
         new_org_data = {
@@ -179,7 +310,7 @@ def get_or_create_organisations(request):
         if new_org_serializer.is_valid():
             new_org = new_org_serializer.save()  
 
-            request.user.organisations.add(new_org)
+            new_org.users.add(request.user.pk)
 
             response_data = {
                 "status": "success",
@@ -203,12 +334,29 @@ def get_organisation(request, orgId:str = None):
 
     if request.method == 'GET':
         if orgId:
+            if request.accepted_renderer.format == 'json':
+                try:
+                    cached = organisation_responses.get(orgId)
+                except ValueError:
+                    cached = False
+                if cached is None:
+                    return Response("Error 404!! Not found.", status=status.HTTP_404_NOT_FOUND)
+                if cached:
+                    etag, body = cached
+                    if etag_matches(request, etag):
+                        return not_modified(etag)
+                    return HttpResponse(body, content_type='application/json', headers={'ETag': etag})
+
             try:
                 organisation = Organisation.objects.get(pk=orgId)
             except UnboundLocalError or ValueError:
                 return Response("Error 404!! Not found.", status=status.HTTP_400_BAD_REQUEST)
             except Organisation.DoesNotExist:
                 return Response("Error 404!! Not found.", status=status.HTTP_404_NOT_FOUND)
+
+            etag = make_etag('organisation', organisation.pk, organisation.updatedAt.isoformat())
+            if etag_matches(request, etag):
+                return not_modified(etag)
             
             serializer = OrganisationSerializer(organisation, many=False)
 
@@ -216,16 +364,30 @@ def get_organisation(request, orgId:str = None):
                     "status": "success",
                     "message": "Organisation Found",
                     "data": serializer.data
-                }, status=status.HTTP_200_OK)
+                }, status=status.HTTP_200_OK, headers={'ETag': etag})
         else:
-
-            organisations = Organisation.objects.all()
-            serializer = UserSerializer(organisations, many=True)
+            try:
+                cursor, limit = page_params(request)
+            except ValueError:
+                return _bad_page_params()
+
+            if wants_stream(request):
+                organisations = Organisation.objects.order_by('orgId')
+                if cursor is not None:
+                    organisations = organisations.filter(pk__gt=cursor)
+                return stream_list_response(
+                    {"status": "success", "message": "Organisations"}, "organisations",
+                    organisation_reader.values(organisations), organisation_reader.row)
+
+            rows, next_cursor = paginate_queryset(
+                organisation_reader.values(Organisation.objects.all()), cursor, limit,
+                key='orgId', cursor_of=lambda row: row[0])
             return Response({
                     "status": "success",
-                    "message": "<message>",
+                    "message": "Organisations",
                     "data": {
-                    "organisations": serializer.data
+                    "organisations": [organisation_reader.row(row) for row in rows],
+                    "nextCursor": next_cursor
                     }
                 }, status=status.HTTP_200_OK)
             
@@ -257,6 +419,107 @@ def get_organisation(request, orgId:str = None):
         }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+@api_view(['GET'])
+def search_organisations(request):
+    """Search organisations by name prefix or substring, within the caller's scope."""
+
+    term = request.query_params.get('q', '').strip()
+    match = request.query_params.get('match', 'prefix')
+    scope = request.query_params.get('scope', 'mine')
+    try:
+        cursor, limit = page_params(request)
+    except ValueError:
+        return _bad_page_params()
+
+    if not term or len(term) > Organisation._meta.get_field('name').max_length:
+        message = "q is required and must be at most 64 characters."
+    elif match not in MATCHES:
+        message = "match must be prefix or substring."
+    elif match == 'substring' and len(term) < MIN_SUBSTRING_LENGTH:
+        message = f"substring search needs at least {MIN_SUBSTRING_LENGTH} characters."
+    elif scope not in ('mine', 'all'):
+        message = "scope must be mine or all."
+    else:
+        message = None
+    if message:
+        return Response({
+            "status": "Bad Request",
+            "message": message,
+            "statusCode": 400
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if scope == 'all':
+        if not can_search_all(request.user):
+            return Response({"status": "error", "message": "You do not have permission to search all organisations."},
+                            status=status.HTTP_403_FORBIDDEN)
+        organisations = Organisation.objects.all()
+    else:
+        organisations = user_organisations(request.user)
+
+    rows, next_cursor = find_organisations(organisations, term, match, cursor, limit)
+    return Response({
+        "status": "success",
+        "message": "Organisations found",
+        "data": {
+            "organisations": [organisation_reader.row(row) for row in rows],
+            "nextCursor": next_cursor
+        }
+    }, status=status.HTTP_200_OK)
+
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _add_users(organisation, userIds):
+    """Add a batch of users to an organisation and report per id."""
+
+    if not isinstance(userIds, list) or not userIds or len(userIds) > settings.ADD_USERS_MAX_ITEMS:
+        return Response({
+            "status": "Bad request",
+            "message": f"userIds must be a list of 1 to {settings.ADD_USERS_MAX_ITEMS} user ids.",
+            "statusCode": 400
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Duplicates are reported once, in the order they were first given.
+    requested = list(dict.fromkeys(str(userId) for userId in userIds))
+    parsed = {userId: _parse_uuid(userId) for userId in requested}
+    added, members, _ = add_members(organisation, {pk for pk in parsed.values() if pk is not None})
+
+    results = []
+    for userId, pk in parsed.items():
+        if pk is None:
+            result = "invalid"
+        elif pk in added:
+            result = "added"
+        elif pk in members:
+            result = "already_member"
+        else:
+            result = "not_found"
+        results.append({"userId": userId, "status": result})
+
+    failed = len(requested) - len(added) - len(members)
+    if not failed:
+        response_status = status.HTTP_200_OK
+    elif failed < len(requested):
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    return Response({
+        "status": "error" if failed == len(requested) else "success",
+        "message": f"{len(added)} of {len(requested)} users added to organisation",
+        "data": {
+            "added": len(added),
+            "alreadyMembers": len(members),
+            "failed": failed,
+            "results": results
+        }
+    }, status=response_status)
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -274,6 +537,10 @@ def add_user(request, orgId: str = None):
             
             # serializer = OrganisationSerializer(organisation, many=False)
 
+            userIds = request.data.get('userIds')
+            if userIds is not None:
+                return _add_users(organisation, userIds)
+
             userId = request.data.get('userId')
 
 
@@ -303,3 +570,15 @@ def add_user(request, orgId: str = None):
             "message": "This request method is not allow.",
             "statusCode": 405
         }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+def metrics(request):
+    """Per-view histograms in the Prometheus text format, for scrapers holding METRICS_TOKEN."""
+
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404()
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
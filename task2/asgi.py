@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task2.settings')
+# Route the read endpoints to their native async implementations.
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -51,16 +51,29 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
 ]
 
+# The browser-only middleware (sessions, CSRF, session auth, messages, X-Frame-Options)
+# is skipped for requests under API_PATH_PREFIXES; the admin still gets all of it.
 MIDDLEWARE = [
+    'task.metrics.MetricsMiddleware',
+    'task.db.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'task.middleware.BrowserSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task.middleware.BrowserCsrfViewMiddleware',
+    'task.middleware.BrowserAuthenticationMiddleware',
+    'task.middleware.BrowserMessageMiddleware',
+    'task.middleware.BrowserXFrameOptionsMiddleware',
 ]
 
+API_PATH_PREFIXES = ('/auth/', '/api/', '/metrics')
+
+# Per-view timings (task.metrics): the histograms on /metrics for requests bearing
+# METRICS_TOKEN (without a token /metrics is 404), and with SERVER_TIMING=True a
+# Server-Timing header on every response. That header shows any client query counts and
+# hash timings, so it is opt-in.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 ROOT_URLCONF = 'task2.urls'
 
 TEMPLATES = [
@@ -81,6 +94,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task2.wsgi.application'
 
+ASGI_APPLICATION = 'task2.asgi.application'
+
+# Set by task2/asgi.py: serve the read endpoints from task.async_views.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -88,25 +106,79 @@ WSGI_APPLICATION = 'task2.wsgi.application'
 
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'DEVELOPMENT')
 
+# SQLITE_TUNING applies task.db.sqlite to SQLite databases: WAL, synchronous=NORMAL, mmap,
+# a larger page cache and busy_timeout on every connection, and BEGIN IMMEDIATE for atomic().
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "True") == "True"
+SQLITE_TUNED_ENGINES = {
+    'django.db.backends.sqlite3': 'task.db.backends.sqlite3_tuned',
+}
+SQLITE_TUNING_OPTIONS = {
+    # Empty means task.db.sqlite.DEFAULT_PRAGMAS.
+    'PRAGMAS': {},
+    'TRANSACTION_MODE': 'IMMEDIATE',
+}
+
 if ENVIRONMENT == 'DEVELOPMENT':
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'task.db.backends.sqlite3_tuned' if SQLITE_TUNING else 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            **(SQLITE_TUNING_OPTIONS if SQLITE_TUNING else {}),
         }
     }
 else:
+    # DB_POOL=True swaps in the pooled backend (task.db.pool); otherwise connections
+    # persist per worker thread for CONN_MAX_AGE seconds.
+    DB_POOL = os.getenv("DB_POOL", "False") == "True"
+    POOLED_ENGINES = {
+        'django.db.backends.postgresql': 'task.db.backends.postgresql',
+        'django.db.backends.sqlite3': 'task.db.backends.sqlite3',
+    }
+    ENGINE = os.getenv("ENGINE")
+    TUNE_SQLITE = SQLITE_TUNING and ENGINE == 'django.db.backends.sqlite3'
+
     DATABASES = {
         'default': {
-            'ENGINE': os.getenv("ENGINE"),
+            'ENGINE': (POOLED_ENGINES.get(ENGINE, ENGINE) if DB_POOL
+                       else SQLITE_TUNED_ENGINES.get(ENGINE, ENGINE) if TUNE_SQLITE else ENGINE),
             'HOST': os.getenv("HOST"),
             'NAME': os.getenv("NAME"),
             'USER': os.getenv("USER"),
             'PASSWORD': os.getenv("PASSWORD"),
             'PORT': os.getenv("PORT"),
+            # Pooled connections go back to the pool at the end of each request.
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': {
+                'MIN_SIZE': int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                'MAX_SIZE': int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                'TIMEOUT': float(os.getenv("DB_POOL_TIMEOUT", "5")),
+                'MAX_LIFETIME': float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+                'HEALTH_CHECK': os.getenv("DB_POOL_HEALTH_CHECK", "True") == "True",
+            },
+            **(SQLITE_TUNING_OPTIONS if TUNE_SQLITE else {}),
         }
     }
 
+# Read replicas (task.db.replicas): comma-separated SQLite files (relative to BASE_DIR) in
+# development, hosts of the primary's NAME/USER/PASSWORD otherwise. Each becomes a
+# "replicaN" database that safe-method API requests read from. Writes go to "default", and
+# a user reads from it for REPLICA_STICKY_SECONDS after they write or their memberships
+# change. Sticky users live in a bounded in-process LRU unless REPLICA_STICKY_CACHE_ALIAS
+# names a shared Django cache. `manage.py sync_replicas` copies a SQLite primary into its replicas.
+DB_REPLICAS = [replica.strip() for replica in os.getenv("DB_REPLICAS", "").split(",") if replica.strip()]
+for number, replica in enumerate(DB_REPLICAS, 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        **({'NAME': BASE_DIR / replica} if ENVIRONMENT == 'DEVELOPMENT' else {'HOST': replica}),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [f'replica{number}' for number in range(1, len(DB_REPLICAS) + 1)]
+DATABASE_ROUTERS = ['task.db.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_STICKY_MAX_USERS = int(os.getenv("REPLICA_STICKY_MAX_USERS", "100000"))
+REPLICA_STICKY_CACHE_ALIAS = os.getenv("REPLICA_STICKY_CACHE_ALIAS") or None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -157,8 +229,12 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'task.authentication.CachedMembershipJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'task.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -199,3 +275,71 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
     "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
 }
+
+
+# Registration
+
+# Processes used to hash passwords for bulk registration (defaults to the CPU count).
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None
+
+BULK_REGISTER_MAX_ITEMS = int(os.getenv("BULK_REGISTER_MAX_ITEMS", "1000"))
+
+# Largest userIds list POST /api/organisations/<orgId>/users accepts at once.
+ADD_USERS_MAX_ITEMS = int(os.getenv("ADD_USERS_MAX_ITEMS", "5000"))
+
+# Password hashing for login/register runs on a bounded executor; requests beyond
+# concurrency + queue size are rejected with 503 instead of piling up on workers.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "0")) or None
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16"))
+
+# Login attempts per email and per client IP within a sliding LOGIN_THROTTLE_WINDOW (seconds);
+# attempts over either limit get a 429 before any lookup or hashing (task.throttling).
+# Counters live in a bounded in-process LRU unless LOGIN_THROTTLE_CACHE_ALIAS names a
+# shared Django cache. Behind a proxy, set REST_FRAMEWORK['NUM_PROXIES'] so the client IP is right.
+LOGIN_THROTTLE = os.getenv("LOGIN_THROTTLE", "True") == "True"
+LOGIN_THROTTLE_WINDOW = int(os.getenv("LOGIN_THROTTLE_WINDOW", "60"))
+LOGIN_THROTTLE_EMAIL_LIMIT = int(os.getenv("LOGIN_THROTTLE_EMAIL_LIMIT", "10"))
+LOGIN_THROTTLE_IP_LIMIT = int(os.getenv("LOGIN_THROTTLE_IP_LIMIT", "100"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+LOGIN_THROTTLE_CACHE_ALIAS = os.getenv("LOGIN_THROTTLE_CACHE_ALIAS") or None
+
+# Embed organisation membership claims in access tokens so authenticated requests
+# can skip the user lookup. Claims are trusted while the user's membership version
+# (cached for MEMBERSHIP_VERSION_CACHE_TIMEOUT seconds) still matches.
+JWT_MEMBERSHIP_CLAIMS = os.getenv("JWT_MEMBERSHIP_CLAIMS", "False") == "True"
+JWT_MEMBERSHIP_CLAIMS_MAX_ORGS = int(os.getenv("JWT_MEMBERSHIP_CLAIMS_MAX_ORGS", "100"))
+MEMBERSHIP_VERSION_CACHE_TIMEOUT = int(os.getenv("MEMBERSHIP_VERSION_CACHE_TIMEOUT", "60"))
+
+# Access tokens that passed verification are remembered (task.authentication), so
+# later requests with the same token skip decoding and the signature check. Entries
+# last until the token's exp, capped at JWT_VERIFIED_TOKEN_CACHE_TTL seconds; 0 entries disables.
+JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("JWT_VERIFIED_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+JWT_VERIFIED_TOKEN_CACHE_TTL = int(os.getenv("JWT_VERIFIED_TOKEN_CACHE_TTL", "300"))
+
+# Per-user organisation membership cache: a bounded in-process LRU, optionally backed
+# by a shared Django cache alias (set MEMBERSHIP_CACHE_MAX_ENTRIES=0 to rely on it alone).
+# Other processes never hear of a change, so local entries only last
+# MEMBERSHIP_CACHE_LOCAL_TIMEOUT seconds.
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv("MEMBERSHIP_CACHE_MAX_ENTRIES", "10000"))
+MEMBERSHIP_CACHE_LOCAL_TIMEOUT = float(os.getenv("MEMBERSHIP_CACHE_LOCAL_TIMEOUT", "5"))
+MEMBERSHIP_CACHE_ALIAS = os.getenv("MEMBERSHIP_CACHE_ALIAS") or None
+MEMBERSHIP_CACHE_TIMEOUT = int(os.getenv("MEMBERSHIP_CACHE_TIMEOUT", "300"))
+
+# GET /api/organisations/<orgId> bodies, cached as rendered JSON in the
+# ORGANISATION_RESPONSE_CACHE_ALIAS cache (task.response_cache) and dropped when the organisation
+# is saved or deleted. Entries are fresh for ORGANISATION_RESPONSE_CACHE_TIMEOUT seconds, then
+# served for up to ORGANISATION_RESPONSE_CACHE_GRACE more while a single request rebuilds them.
+# Invalidation only reaches the alias's backend: in a process-local one (the default
+# LocMemCache) entries are fresh for at most ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT seconds,
+# since other workers keep theirs after an edit.
+ORGANISATION_RESPONSE_CACHE = os.getenv("ORGANISATION_RESPONSE_CACHE", "True") == "True"
+ORGANISATION_RESPONSE_CACHE_ALIAS = os.getenv("ORGANISATION_RESPONSE_CACHE_ALIAS", "default")
+ORGANISATION_RESPONSE_CACHE_TIMEOUT = int(os.getenv("ORGANISATION_RESPONSE_CACHE_TIMEOUT", "300"))
+ORGANISATION_RESPONSE_CACHE_GRACE = int(os.getenv("ORGANISATION_RESPONSE_CACHE_GRACE", "30"))
+ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT = float(os.getenv("ORGANISATION_RESPONSE_CACHE_LOCAL_TIMEOUT", "5"))
+ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT = float(os.getenv("ORGANISATION_RESPONSE_CACHE_LOCK_TIMEOUT", "5"))
+
+# Organisation listings are keyset-paginated on orgId (?cursor=&limit=) or streamed (?stream=true).
+ORGANISATIONS_PAGE_SIZE = int(os.getenv("ORGANISATIONS_PAGE_SIZE", "100"))
+ORGANISATIONS_MAX_PAGE_SIZE = int(os.getenv("ORGANISATIONS_MAX_PAGE_SIZE", "1000"))
+ORGANISATIONS_STREAM_CHUNK_SIZE = int(os.getenv("ORGANISATIONS_STREAM_CHUNK_SIZE", "2000"))
@@ -0,0 +1,37 @@
+"""
+API-only settings profile for task2.
+
+Select with DJANGO_SETTINGS_MODULE=task2.settings_api (e.g. in the Vercel project
+environment). It is the full settings minus everything a bearer-token JSON API never
+touches: the admin, sessions, messages, static files and the template engine. That keeps
+them out of every cold start.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, REST_FRAMEWORK
+
+
+BROWSER_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in BROWSER_APPS]
+
+MIDDLEWARE = [
+    'task.metrics.MetricsMiddleware',
+    'task.db.replicas.ReplicaRoutingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # The browsable API needs the template engine.
+    'DEFAULT_RENDERER_CLASSES': (
+        'task.renderers.JSONRenderer',
+    ),
+}
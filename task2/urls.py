@@ -14,11 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.apps import apps
+from django.conf import settings
 from django.urls import path, include
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path("", include("task.urls"))
-]
+urlpatterns = []
+
+# The API-only profile (task2.settings_api) leaves the admin out entirely.
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.ASYNC_VIEWS:
+    urlpatterns.append(path("", include("task.async_urls")))
+
+urlpatterns.append(path("", include("task.urls")))
 